@@ -3,5 +3,14 @@ Analysis components for PCA
 """
 
 from .pca import PCAAnalyzer
+from .pca_result import PCAResult
+from .distributed import DistributedPCABackend, spawn_local_workers
+from .scaler import StreamingStandardizer
 
-__all__ = ['PCAAnalyzer']
\ No newline at end of file
+__all__ = [
+    'PCAAnalyzer',
+    'PCAResult',
+    'DistributedPCABackend',
+    'spawn_local_workers',
+    'StreamingStandardizer',
+]
\ No newline at end of file
@@ -0,0 +1,131 @@
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from source.utils.shared_pool import map_shared
+
+
+# Number of resampled copies of the data PCA is refit on by default
+DEFAULT_BOOTSTRAP_REPLICATES = 200
+
+# Confidence level of the loading intervals, in percent
+DEFAULT_CONFIDENCE = 95.0
+
+# Rows weighted at a time when building a replicate's covariance matrix
+BOOTSTRAP_CHUNK_SIZE = 50_000
+
+
+def _replicate_components(seed, data: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """
+    Refits PCA on one resample of the rows and aligns its components with the reference
+
+    Resampling with replacement is done by weighting each row by the number of times it was
+        drawn, so the resampled data is never copied. Each replicate is standardized again
+        by its own weighted moments. Replicate components are matched to the reference
+        components they are most similar to, which fixes components that swap order, and
+        flipped to point the same way as their match.
+
+    Args:
+        seed: Seed of the resample
+        data (np.ndarray): Standardized data
+        reference (np.ndarray): The components fitted on all of the data, one per row
+
+    Return:
+        (np.ndarray): The aligned replicate components, in the shape of the reference
+    """
+    n_rows, n_cols = data.shape
+    n_components = reference.shape[0]
+    rng = np.random.default_rng(seed)
+    weights = rng.multinomial(n_rows, np.full(n_rows, 1 / n_rows)).astype(np.float64)
+
+    # Weighted cross products, built in chunks of rows
+    cross = np.zeros((n_cols, n_cols))
+    sums = np.zeros(n_cols)
+    for start in range(0, n_rows, BOOTSTRAP_CHUNK_SIZE):
+        block = data[start:start + BOOTSTRAP_CHUNK_SIZE]
+        block_weights = weights[start:start + BOOTSTRAP_CHUNK_SIZE]
+        cross += (block * block_weights[:, np.newaxis]).T @ block
+        sums += block_weights @ block
+
+    # Correlation matrix of the resample, since each replicate is standardized again
+    mean = sums / n_rows
+    covariance = (cross - n_rows * np.outer(mean, mean)) / (n_rows - 1)
+    scale = np.sqrt(np.maximum(np.diag(covariance), np.finfo(np.float64).tiny))
+    correlation = covariance / np.outer(scale, scale)
+
+    # Keeps a few extra components so reference components can match ones that moved down
+    n_candidates = min(n_cols, 2 * n_components)
+    __, eigvecs = np.linalg.eigh(correlation)
+    candidates = eigvecs[:, ::-1][:, :n_candidates].T
+
+    # Matches each reference component to one candidate, maximizing the total absolute similarity
+    similarity = reference @ candidates.T
+    rows, cols = linear_sum_assignment(-np.abs(similarity))
+    aligned = candidates[cols[np.argsort(rows)]]
+    signs = np.sign(similarity[rows, cols][np.argsort(rows)])
+    signs[signs == 0] = 1.0
+    return aligned * signs[:, np.newaxis]
+
+
+def bootstrap_loadings(
+        data: np.ndarray,
+        components: np.ndarray,
+        n_replicates: int = DEFAULT_BOOTSTRAP_REPLICATES,
+        confidence: float = DEFAULT_CONFIDENCE,
+        seed: int = 0,
+        n_jobs: Optional[int] = None,
+        progress: Optional[Callable[[float], None]] = None
+) -> Dict[str, Any]:
+    """
+    Estimates confidence intervals of PCA loadings by refitting PCA on resampled rows
+
+    Replicates run in a pool of worker processes that read the data from shared memory,
+        each with its own seed spawned from the given seed, so results are the same for any
+        number of workers. Components are aligned in order and sign with the given components
+        before the percentile intervals are taken.
+
+    Args:
+        data (np.ndarray): Standardized data with no missing values
+        components (np.ndarray): The components fitted on all of the data, one per row
+        n_replicates (int): The number of resamples to refit PCA on
+        confidence (float): The confidence level of the intervals, in percent
+        seed (int): Seed of the resamples
+        n_jobs (int): The number of worker processes. All cores if None
+        progress: Optional function called with the fraction of replicates completed
+
+    Return:
+        A dictionary with the results, each array shaped like the loadings with one row per
+            feature and one column per component
+            'lower': the lower bound of each loading,
+            'upper': the upper bound of each loading,
+            'std': the standard error of each loading,
+            'n_replicates': n_replicates,
+            'confidence': confidence
+
+    Raises:
+        ValueError: If the data has missing values or doesn't match the components
+    """
+    data = np.asarray(data, dtype=np.float64)
+    components = np.asarray(components, dtype=np.float64)
+    if data.shape[1] != components.shape[1]:
+        raise ValueError(f"Data has {data.shape[1]} features but the components have {components.shape[1]}")
+    if np.isnan(data).any():
+        raise ValueError("Missing values must be filled before bootstrapping loadings")
+
+    seeds = np.random.SeedSequence(seed).spawn(n_replicates)
+    replicates = np.array(map_shared(
+        partial(_replicate_components, reference=components), data, seeds, n_jobs, progress
+    ))
+
+    # Percentile intervals over the replicates
+    tail = (100.0 - confidence) / 2
+    lower, upper = np.percentile(replicates, [tail, 100.0 - tail], axis=0)
+    return {
+        'lower': lower.T,
+        'upper': upper.T,
+        'std': replicates.std(axis=0, ddof=1).T,
+        'n_replicates': n_replicates,
+        'confidence': confidence,
+    }
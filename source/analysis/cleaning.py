@@ -0,0 +1,114 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+FILTER_TYPES = ["None", "Equal to", "Less than", "Greater than", "Between", "Outside"]
+
+# Text columns with at most this fraction of unique values are stored as categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def filter_rows(
+        df: pd.DataFrame,
+        filter_name: str,
+        filter_type: str,
+        exact_values: Optional[List[float]] = None,
+        lower_value: float = -np.inf,
+        upper_value: float = np.inf
+) -> pd.DataFrame:
+    """
+    Filters the rows of the data by the value of one column
+
+    Args:
+        df (pd.DataFrame): Data to filter
+        filter_name (str): The name of the column to filter by
+        filter_type (str): One of FILTER_TYPES
+        exact_values (List[float]): Values to keep, within .001, for "Equal to"
+        lower_value (float): Exclusive lower bound for "Greater than", "Between" and "Outside"
+        upper_value (float): Exclusive upper bound for "Less than", "Between" and "Outside"
+
+    Return:
+        (pd.DataFrame): The rows of the data that pass the filter
+    """
+    if filter_type == FILTER_TYPES[0]:
+        return df
+    if filter_type not in FILTER_TYPES:
+        raise ValueError(f"Unknown filter type: {filter_type}")
+
+    column = df[filter_name]
+    if filter_type == FILTER_TYPES[1]:
+        values = np.asarray(exact_values, dtype=float)
+        mask = np.isclose(column.to_numpy(dtype=float)[:, np.newaxis], values, atol=0.001).any(axis=1)
+    elif filter_type == FILTER_TYPES[2]:
+        mask = column < upper_value
+    elif filter_type == FILTER_TYPES[3]:
+        mask = column > lower_value
+    elif filter_type == FILTER_TYPES[4]:
+        mask = (column > lower_value) & (column < upper_value)
+    else:
+        mask = (column < lower_value) | (column > upper_value)
+    return df[mask]
+
+
+def align_columns(df: pd.DataFrame, feature_names: List[str]) -> pd.DataFrame:
+    """
+    Selects the given features from new data using the same column names as cleaned data
+
+    Column names are stripped and lowercased, the features are put in the given order,
+        and values that can't be read as numbers or are infinite are set to NaN.
+
+    Args:
+        df (pd.DataFrame): Newly loaded data
+        feature_names (List[str]): The cleaned feature names to select
+
+    Return:
+        (pd.DataFrame): The selected features as float data
+
+    Raises:
+        ValueError: If any feature is missing from the data
+    """
+    df = df.rename(columns=lambda col: str(col).strip().lower())
+    missing_cols = [col for col in feature_names if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Columns not found in the dataset: {', '.join(missing_cols)}")
+
+    aligned = df[feature_names].apply(pd.to_numeric, errors='coerce').astype(float)
+    return aligned.replace([np.inf, -np.inf], np.nan)
+
+
+def optimize_dtypes(df: pd.DataFrame, max_unique_ratio: float = CATEGORY_MAX_UNIQUE_RATIO) -> pd.DataFrame:
+    """
+    Stores each column in the most compact type that keeps its values exactly
+
+    Text columns with few unique values become categoricals, which store each value once
+        and a small integer code per row. Integer columns are narrowed to the smallest type
+        that fits their range, and float columns become float32 when every value converts
+        without loss. All other columns are kept as they are.
+
+    Args:
+        df (pd.DataFrame): Newly loaded data
+        max_unique_ratio (float): Text columns with at most this fraction of unique values
+            per row become categoricals
+
+    Return:
+        (pd.DataFrame): The data with compact column types
+    """
+    columns = {}
+    for name, column in df.items():
+        dtype = column.dtype
+        if dtype == object or isinstance(dtype, pd.StringDtype):
+            # Finds the unique values once, and reuses their codes for the categorical
+            codes, uniques = pd.factorize(column)
+            if len(uniques) <= max_unique_ratio * len(column):
+                column = pd.Series(pd.Categorical.from_codes(codes, uniques), index=column.index)
+        elif isinstance(dtype, np.dtype) and dtype.kind in "iu":
+            column = pd.to_numeric(column, downcast='integer' if dtype.kind == "i" else 'unsigned')
+        elif isinstance(dtype, np.dtype) and dtype == np.float64:
+            narrow = column.to_numpy().astype(np.float32)
+            if np.array_equal(narrow, column.to_numpy(), equal_nan=True):
+                column = pd.Series(narrow, index=column.index)
+        columns[name] = column
+
+    return pd.DataFrame(columns, index=df.index, columns=df.columns, copy=False)
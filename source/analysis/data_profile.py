@@ -0,0 +1,98 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from source.analysis.scaler import StreamingStandardizer, DEFAULT_CHUNK_SIZE
+
+
+# Columns missing at least this percent of their values are considered degenerate
+MISSING_LIMIT_PCT = 95.0
+
+# Bit pattern all NaNs are hashed as, since NaNs can have many bit patterns
+_NAN_BITS = np.array([np.nan]).view(np.uint64)[0]
+
+
+def profile_data(df: pd.DataFrame, chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Profiles the quality of every numeric column in one pass over the rows
+
+    Each chunk of rows updates the count, mean and variance of every column, their minimum
+        and maximum, and a hash of their values. Columns with equal hashes are compared once
+        at the end to confirm they are exact duplicates.
+
+    Args:
+        df (pd.DataFrame): Data to profile. Non-numeric columns are skipped
+        chunk_size (int): The number of rows to process at a time
+
+    Return:
+        (pd.DataFrame): One row per numeric column, indexed by column name, with the columns
+            'count', 'missing_pct', 'mean', 'variance', 'min', 'max', and 'duplicate_of',
+            the name of the first earlier column with identical values or None
+    """
+    numeric = df.select_dtypes(include=[np.number])
+    n_rows, n_cols = numeric.shape
+
+    moments = StreamingStandardizer()
+    mins = np.full(n_cols, np.inf)
+    maxs = np.full(n_cols, -np.inf)
+    hashes = np.zeros(n_cols, dtype=np.uint64)
+    rng = np.random.default_rng(0)
+
+    for start in range(0, max(n_rows, 1), chunk_size):
+        chunk = numeric.iloc[start:start + chunk_size]
+        moments.partial_fit(chunk)
+        values = chunk.to_numpy(dtype=np.float64)
+
+        # Extremes, ignoring missing values
+        mins = np.fmin(mins, np.fmin.reduce(values, axis=0, initial=np.inf))
+        maxs = np.fmax(maxs, np.fmax.reduce(values, axis=0, initial=-np.inf))
+
+        # Sums the bits of each value times a random odd weight for its row, wrapping on overflow
+        bits = (values + 0.0).view(np.uint64)
+        bits[np.isnan(values)] = _NAN_BITS
+        weights = rng.integers(0, 2 ** 63, size=len(chunk), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        hashes += weights @ bits
+
+    counts = moments.n_samples_seen_ if n_cols else np.zeros(0, dtype=np.int64)
+    observed = counts > 0
+    profile = pd.DataFrame({
+        'count': counts,
+        'missing_pct': 100.0 * (n_rows - counts) / max(n_rows, 1),
+        'mean': np.where(observed, moments.mean_, np.nan) if n_cols else [],
+        'variance': moments.var_ if n_cols else [],
+        'min': np.where(observed, mins, np.nan),
+        'max': np.where(observed, maxs, np.nan),
+        'duplicate_of': None,
+    }, index=[str(col) for col in numeric.columns])
+
+    # Confirms columns with equal hashes hold identical values
+    for __, positions in pd.Series(range(n_cols)).groupby(hashes):
+        positions = positions.tolist()
+        for i, position in enumerate(positions[1:], start=1):
+            column = numeric.iloc[:, position].to_numpy(dtype=np.float64)
+            for earlier in positions[:i]:
+                if np.array_equal(column, numeric.iloc[:, earlier].to_numpy(dtype=np.float64), equal_nan=True):
+                    profile.iloc[position, profile.columns.get_loc('duplicate_of')] = profile.index[earlier]
+                    break
+
+    return profile
+
+
+def degenerate_columns(profile: pd.DataFrame, missing_limit: float = MISSING_LIMIT_PCT) -> List[str]:
+    """
+    Finds the columns of a profile that can't contribute to PCA
+
+    Args:
+        profile (pd.DataFrame): A profile from profile_data
+        missing_limit (float): Columns missing at least this percent of values are degenerate
+
+    Return:
+        (List[str]): The names of constant, mostly missing, and duplicate columns
+    """
+    degenerate = (
+        (profile['variance'] == 0)
+        | (profile['missing_pct'] >= missing_limit)
+        | profile['duplicate_of'].notna()
+    )
+    return profile.index[degenerate].tolist()
@@ -0,0 +1,100 @@
+from typing import Any, Dict
+
+import numpy as np
+from scipy import stats
+
+
+# Rows scored at a time, so memory-mapped data is read one block at a time
+DEFAULT_DIAGNOSTIC_CHUNK_SIZE = 50_000
+
+# Confidence level of the control limits
+DEFAULT_CONFIDENCE = 0.95
+
+
+def outlier_scores(
+        pca_results: Dict[str, Any],
+        confidence: float = DEFAULT_CONFIDENCE,
+        chunk_size: int = DEFAULT_DIAGNOSTIC_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Scores how unusual every row of the fitted data is with Hotelling's T² and Q residuals
+
+    Hotelling's T² measures how far a row lies from the center within the model, weighting
+        each component by its variance. The Q residual, or squared prediction error, measures
+        how far a row lies outside the model. Both are computed with matrix products over
+        blocks of rows, so the standardized data may be memory-mapped.
+
+    The T² limit uses the F distribution. The Q limit uses the Nomikos-MacGregor
+        approximation, a scaled chi-squared distribution matched to the mean and variance of
+        the Q residuals. Components with no variance, such as those of rank-deficient data,
+        are left out of T² and its limit since dividing by their variance is meaningless.
+
+    Args:
+        pca_results (Dict[str, Any]): Results from PCAAnalyzer.analyze
+        confidence (float): The confidence level of the control limits, between 0 and 1
+        chunk_size (int): The number of rows scored at a time
+
+    Return:
+        A dictionary with the diagnostics of every row
+            't2': Hotelling's T² of each row,
+            'q': the Q residual of each row,
+            't2_limit': the T² control limit, NaN if no component has variance,
+            't2_components': the number of components T² is computed over,
+            'q_limit': the Q control limit, NaN if the model keeps every component,
+            'flagged': True for rows above either limit,
+            'confidence': confidence
+
+    Raises:
+        ValueError: If confidence is not between 0 and 1
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(f"Confidence must be between 0 and 1, got {confidence}")
+
+    data = pca_results['standardized_data']
+    data = data.to_numpy() if hasattr(data, 'to_numpy') else data
+    components = np.asarray(pca_results['components'], dtype=np.float64)
+    mean = np.asarray(pca_results['mean'], dtype=np.float64)
+    eigenvalues = np.asarray(pca_results['eigenvalues'], dtype=np.float64)
+    n_rows = data.shape[0]
+
+    # Keeps the components whose variance is above rounding error of the largest variance
+    tolerance = np.finfo(np.asarray(pca_results['eigenvalues']).dtype).eps * max(data.shape)
+    kept = eigenvalues > tolerance * max(eigenvalues.max(initial=0.0), 0.0)
+    n_components = int(kept.sum())
+    inverse = np.where(kept, 1.0 / np.where(kept, eigenvalues, 1.0), 0.0)
+
+    t2 = np.empty(n_rows)
+    q = np.empty(n_rows)
+    for start in range(0, n_rows, chunk_size):
+        block = np.asarray(data[start:start + chunk_size], dtype=np.float64) - mean
+        scores = block @ components.T
+        residuals = block - scores @ components
+        t2[start:start + len(block)] = (scores ** 2) @ inverse
+        q[start:start + len(block)] = np.einsum('ij,ij->i', residuals, residuals)
+
+    # Control limits, T² has no limit without components that have variance
+    if 0 < n_components < n_rows:
+        t2_limit = n_components * (n_rows - 1) / (n_rows - n_components) * stats.f.ppf(
+            confidence, n_components, n_rows - n_components
+        )
+    else:
+        t2_limit = np.nan
+    q_mean, q_var = q.mean(), q.var()
+    if q_mean > 0 and q_var > 0:
+        q_limit = q_var / (2 * q_mean) * stats.chi2.ppf(confidence, 2 * q_mean ** 2 / q_var)
+    else:
+        q_limit = np.nan
+
+    flagged = t2 > t2_limit if not np.isnan(t2_limit) else np.zeros(n_rows, dtype=bool)
+    if not np.isnan(q_limit):
+        flagged |= q > q_limit
+
+    return {
+        't2': t2,
+        'q': q,
+        't2_limit': float(t2_limit),
+        't2_components': n_components,
+        'q_limit': float(q_limit),
+        'flagged': flagged,
+        'confidence': confidence,
+    }
@@ -0,0 +1,356 @@
+import functools
+import secrets
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import linalg
+
+from source.analysis.scaler import StreamingStandardizer
+
+
+# Bytes in the keys generated for local workers
+AUTHKEY_BYTES = 32
+
+
+#### 1. Sufficient Statistics ####
+
+def compute_shard_stats(data: np.ndarray) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    Computes the sufficient statistics of one shard of data
+
+    Args:
+        data (np.ndarray): A 2D array with one row per sample
+
+    Return:
+        The number of rows, the column means, and the centered cross-product matrix
+    """
+    data = np.asarray(data, dtype=np.float64)
+    mean = data.mean(axis=0)
+    centered = data - mean
+    return data.shape[0], mean, centered.T @ centered
+
+
+def merge_shard_stats(
+        stats_a: Tuple[int, np.ndarray, np.ndarray],
+        stats_b: Tuple[int, np.ndarray, np.ndarray]
+) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    Merges the sufficient statistics of two shards using Chan's pairwise update
+
+    Args:
+        stats_a: Statistics returned by compute_shard_stats
+        stats_b: Statistics returned by compute_shard_stats
+
+    Return:
+        The statistics of both shards combined
+    """
+    n_a, mean_a, cross_a = stats_a
+    n_b, mean_b, cross_b = stats_b
+    if n_a == 0:
+        return stats_b
+    if n_b == 0:
+        return stats_a
+
+    n_total = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / n_total)
+    cross = cross_a + cross_b + np.outer(delta, delta) * (n_a * n_b / n_total)
+    return n_total, mean, cross
+
+
+#### 2. Worker Process ####
+
+def _check_authkey(authkey: bytes):
+    """
+    Checks that a worker key was given
+
+    Raises:
+        ValueError: If the key is empty or not bytes
+    """
+    if not isinstance(authkey, bytes) or len(authkey) == 0:
+        raise ValueError("A secret authkey (bytes) is required to connect to PCA workers")
+
+
+def serve_worker(address, authkey: bytes, ready_conn=None):
+    """
+    Runs a PCA worker that answers coordinator requests until it is told to shut down
+
+    The worker holds one shard of data. A coordinator connects over a socket and sends
+        ("load", source, columns), ("stats",), ("standardize", mean, scale),
+        ("transform", mean, scale, components) or ("shutdown",). Every request is answered
+        with ("ok", value) or ("error", message). A load is answered with the shard's shape
+        and the columns holding missing or infinite values.
+
+    Messages are pickled, so anyone holding the key can run code on the worker. Workers must
+        only listen on trusted interfaces, such as localhost or a private network, and the
+        key must be kept secret. Generate keys with secrets.token_bytes.
+
+    Args:
+        address: The (host, port) to listen on. Port 0 selects a free port
+        authkey (bytes): The secret key coordinators must use to connect
+        ready_conn: Optional connection used to report the address actually listened on
+
+    Raises:
+        ValueError: If no key is given
+    """
+    _check_authkey(authkey)
+    shard = None
+    with Listener(address, authkey=authkey) as listener:
+        if ready_conn is not None:
+            ready_conn.send(listener.address)
+            ready_conn.close()
+
+        while True:
+            with listener.accept() as conn:
+                while True:
+                    try:
+                        message = conn.recv()
+                    except EOFError:
+                        break
+
+                    command = message[0]
+                    try:
+                        if command == "load":
+                            shard = _read_shard(message[1], message[2])
+                            non_finite = ~np.isfinite(shard).all(axis=0)
+                            conn.send(("ok", (shard.shape, [message[2][i] for i in np.flatnonzero(non_finite)])))
+                        elif command == "stats":
+                            conn.send(("ok", compute_shard_stats(shard)))
+                        elif command == "standardize":
+                            mean, scale = message[1:]
+                            conn.send(("ok", (shard - mean) / scale))
+                        elif command == "transform":
+                            mean, scale, components = message[1:]
+                            conn.send(("ok", ((shard - mean) / scale) @ components.T))
+                        elif command == "shutdown":
+                            conn.send(("ok", None))
+                            return
+                        else:
+                            conn.send(("error", f"Unknown command: {command}"))
+                    except Exception as e:
+                        conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def _read_shard(source, columns: List[str]) -> np.ndarray:
+    """
+    Reads a shard of data for a worker
+
+    Args:
+        source: A path to a cleaned .csv file or an array of the shard's data
+        columns (List[str]): The feature columns to keep, in order
+
+    Return:
+        The shard as a float64 array
+    """
+    if isinstance(source, str):
+        df = pd.read_csv(source)
+        df.columns = df.columns.str.strip().str.lower()
+        return df[columns].to_numpy(dtype=np.float64)
+    return np.asarray(source, dtype=np.float64)
+
+
+def spawn_local_workers(
+        n_workers: int,
+        authkey: Optional[bytes] = None
+) -> Tuple[List[Tuple[str, int]], List[Process], bytes]:
+    """
+    Starts PCA workers as processes on this machine, listening on localhost only
+
+    Args:
+        n_workers (int): The number of worker processes to start
+        authkey (bytes): The secret key coordinators must use to connect. None generates
+            a random key
+
+    Return:
+        The addresses the workers listen on, the worker processes and the key to connect with
+    """
+    if authkey is None:
+        authkey = secrets.token_bytes(AUTHKEY_BYTES)
+    _check_authkey(authkey)
+
+    addresses, processes = [], []
+    for __ in range(n_workers):
+        recv_conn, send_conn = Pipe(duplex=False)
+        process = Process(
+            target=serve_worker,
+            args=(("localhost", 0), authkey, send_conn),
+            daemon=True
+        )
+        process.start()
+        send_conn.close()
+        addresses.append(recv_conn.recv())
+        recv_conn.close()
+        processes.append(process)
+    return addresses, processes, authkey
+
+
+#### 3. Coordinator ####
+
+class DistributedPCABackend:
+    """
+    Coordinates one PCA fit across several workers
+
+    Each worker reduces its shard to counts, means and cross-products. The coordinator
+        merges them into the correlation matrix, decomposes it, and asks the workers to
+        project their shards onto the resulting components.
+
+    Workers unpickle every message they receive, so they must only be reachable on trusted
+        interfaces and the key must be kept secret, see serve_worker.
+    """
+
+    def __init__(
+            self,
+            addresses: Sequence[Tuple[str, int]],
+            authkey: bytes,
+            shard_sources: Optional[Sequence[str]] = None
+    ):
+        """
+        Creates a coordinator for the given workers
+
+        Args:
+            addresses: The (host, port) of each worker
+            authkey (bytes): The secret key used to connect to the workers
+            shard_sources: Optional .csv paths, one per worker, for workers to read their
+                own shard from. When None the data passed to fit is split between workers
+
+        Raises:
+            ValueError: If no key is given or the number of shard sources doesn't match the workers
+        """
+        _check_authkey(authkey)
+        if shard_sources is not None and len(shard_sources) != len(addresses):
+            raise ValueError("One shard source is required for each worker")
+
+        self.addresses = list(addresses)
+        self.authkey = authkey
+        self.shard_sources = shard_sources
+
+        # Standardizer built from the merged statistics of the last fit
+        self.scaler_ = None
+
+    def fit(self, df: pd.DataFrame, n_components: int) -> Dict[str, Any]:
+        """
+        Fits PCA on standardized data across all workers
+
+        Every shard must be complete. Missing values are not imputed as they are by the local
+            EM solver.
+
+        Args:
+            df (pd.DataFrame): Numeric data to run PCA on. When the workers read their own shards
+                its rows are not fitted, it only sets the feature columns each shard must hold
+            n_components (int): Number of components to run PCA on
+
+        Return:
+            A dictionary in the same format as PCAAnalyzer.run_pca, with 'model' set to None.
+                When the workers read their own shards it also holds 'standardized_data',
+                gathered from the shards in worker order
+
+        Raises:
+            ValueError: If any shard holds missing or infinite values
+        """
+        columns = df.columns.tolist()
+        if n_components > len(columns):
+            raise ValueError("More components selected then exist")
+
+        conns = [Client(address, authkey=self.authkey) for address in self.addresses]
+        try:
+            # Sends each worker its shard
+            if self.shard_sources is None:
+                sources = np.array_split(df.to_numpy(dtype=np.float64), len(conns))
+            else:
+                sources = self.shard_sources
+            loaded = self._request_all(conns, [("load", src, columns) for src in sources])
+            shard_shapes = [shape for shape, __ in loaded]
+
+            # Rejects incomplete shards, which the covariance can't be decomposed from
+            for i, (__, non_finite) in enumerate(loaded):
+                if non_finite:
+                    name = sources[i] if isinstance(sources[i], str) else f"shard {i}"
+                    raise ValueError(
+                        f"Distributed PCA requires complete data, but {name} has missing or "
+                        f"infinite values in columns: {', '.join(non_finite)}"
+                    )
+
+            # Merges the sufficient statistics from every worker
+            shard_stats = self._request_all(conns, [("stats",)] * len(conns))
+            n_rows, mean, cross = functools.reduce(merge_shard_stats, shard_stats)
+            if n_rows < 2:
+                raise ValueError("At least two rows are required for PCA")
+
+            # Builds the standardizer from the merged column moments
+            scaler = StreamingStandardizer.from_moments(n_rows, mean, np.diag(cross), columns)
+            scale = scaler.scale_
+
+            # Decomposes the covariance of the standardized data
+            covariance = cross / np.outer(scale, scale) / (n_rows - 1)
+            n_feat = covariance.shape[0]
+            eigvals, eigvecs = linalg.eigh(covariance, subset_by_index=[n_feat - n_components, n_feat - 1])
+            eigvals = np.clip(eigvals[::-1], 0, None)
+            components = eigvecs[:, ::-1].T
+
+            # Flips signs so the largest absolute loading of each component is positive
+            max_idx = np.argmax(np.abs(components), axis=1)
+            signs = np.sign(components[np.arange(n_components), max_idx])
+            signs[signs == 0] = 1
+            components *= signs[:, np.newaxis]
+
+            # Projects every shard onto the components, keeping the shard order
+            scores = self._request_all(conns, [("transform", mean, scale, components)] * len(conns))
+            transformed_data = np.vstack(scores)
+
+            # Gathers the standardized shards, the local data only holds the column names
+            standardized_data = None
+            if self.shard_sources is not None:
+                shards = self._request_all(conns, [("standardize", mean, scale)] * len(conns))
+                standardized_data = pd.DataFrame(np.vstack(shards), columns=columns)
+        finally:
+            for conn in conns:
+                conn.close()
+
+        self.scaler_ = scaler
+
+        results = {
+            'model': None,
+            'transformed_data': transformed_data,
+            'components': components,
+            'explained_variance': eigvals / np.trace(covariance),
+            'eigenvalues': eigvals,
+            'mean': np.zeros(n_feat),
+            'loadings': components.T,
+            'feature_names': columns,
+            'n_components': n_components,
+            'max_components': n_feat,
+            'data_shape': (n_rows, n_feat),
+            'solver': "distributed",
+            'shard_shapes': shard_shapes,
+        }
+        if standardized_data is not None:
+            results['standardized_data'] = standardized_data
+        return results
+
+    def shutdown(self):
+        """Tells every worker process to exit"""
+        for address in self.addresses:
+            with Client(address, authkey=self.authkey) as conn:
+                conn.send(("shutdown",))
+                conn.recv()
+
+    def _request_all(self, conns, messages) -> List[Any]:
+        """
+        Sends one message to each worker before waiting on any reply so workers run in parallel
+
+        Raises:
+            RuntimeError: If any worker reports an error
+        """
+        for conn, message in zip(conns, messages):
+            conn.send(message)
+
+        results = []
+        for address, conn in zip(self.addresses, conns):
+            status, value = conn.recv()
+            if status != "ok":
+                raise RuntimeError(f"Worker {address} failed: {value}")
+            results.append(value)
+        return results
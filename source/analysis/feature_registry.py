@@ -0,0 +1,79 @@
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class FeatureRegistry:
+    """
+    Looks up features by name and group as arrays, built once per set of PCA features
+
+    Feature names are matched by their canonical name, the name in lower case, the same as
+        the names of an uploaded feature-to-group mapping. Every feature is given a group ID.
+        Features missing from the group mapping are their own group, named after the feature.
+    """
+
+    __slots__ = ('feature_names', 'group_map', 'names', 'canonical', 'group_ids', 'group_labels')
+
+    def __init__(self, feature_names: Sequence[str], group_map: Optional[Dict[str, str]] = None):
+        """
+        Builds the name and group lookups of the features
+
+        Args:
+            feature_names (Sequence[str]): The names of the features in column order
+            group_map (Dict[str, str]): Maps canonical feature names to their group
+        """
+        self.feature_names = feature_names
+        self.group_map = group_map if group_map is not None else {}
+        self.names = np.asarray(feature_names, dtype=object)
+        self.canonical = pd.Index([str(name).lower() for name in self.names], dtype=object)
+
+        # Features without a group are their own group
+        groups = self.canonical.map(self.group_map)
+        groups = np.where(pd.isna(groups), self.names, np.asarray(groups, dtype=object))
+        self.group_ids, group_labels = pd.factorize(groups, sort=True)
+        self.group_labels = np.asarray(group_labels, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def matches(self, feature_names: Sequence[str], group_map: Dict[str, str]) -> bool:
+        """Returns True if the registry was built from these feature names and group mapping"""
+        return self.feature_names is feature_names and self.group_map is group_map
+
+    def positions(self, names: Iterable[str]) -> np.ndarray:
+        """
+        Finds the column positions of features by name, ignoring case
+
+        Args:
+            names (Iterable[str]): The feature names to find
+
+        Return:
+            (np.ndarray): The position of each name, or -1 for names that aren't features
+        """
+        canonical = pd.Index([str(name).lower() for name in names], dtype=object)
+
+        # Features whose names differ only in case are found by the first of them
+        first = np.flatnonzero(~self.canonical.duplicated())
+        found = self.canonical[first].get_indexer(canonical)
+        return np.where(found >= 0, first[found], -1)
+
+    def groups(self, positions: np.ndarray, grouped: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gathers the groups of the features at the given positions
+
+        Args:
+            positions (np.ndarray): Column positions of the features
+            grouped (bool): If False, every feature is treated as its own group
+
+        Return:
+            (np.ndarray): The code of each feature's group, indexing the group labels
+            (np.ndarray): The labels of the groups found, in sorted order
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        if grouped:
+            ids, labels = self.group_ids[positions], self.group_labels
+        else:
+            ids, labels = positions, self.names
+        unique, codes = np.unique(ids, return_inverse=True)
+        return codes.reshape(-1), labels[unique]
@@ -0,0 +1,89 @@
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from source.analysis.pca import PCAAnalyzer
+from source.utils.shared_pool import map_shared
+
+
+def _fit_group(rows: np.ndarray, data: np.ndarray, n_components: int) -> Dict[str, Any]:
+    """
+    Standardizes the given rows of the data within themselves and fits PCA to them
+
+    Return:
+        (Dict[str, Any]): The 'components', 'explained_variance', 'eigenvalues',
+            'transformed_data' and 'solver' of the group's PCA
+    """
+    analyzer = PCAAnalyzer()
+    standardized, __ = analyzer.standardize_data(pd.DataFrame(data[rows]))
+    results = analyzer.run_pca(standardized, n_components)
+    return {key: results[key] for key in ('components', 'explained_variance', 'eigenvalues', 'transformed_data', 'solver')}
+
+
+def group_pca(
+        data: np.ndarray,
+        groups: pd.Series,
+        n_components: int,
+        reference: Optional[np.ndarray] = None,
+        n_jobs: Optional[int] = None,
+        progress: Optional[Callable[[float], None]] = None
+) -> Dict[str, Any]:
+    """
+    Fits one PCA to the rows of each group of the data
+
+    Each group is standardized within itself, the same as cleaning and running PCA on only
+        that group. Groups are fit in a pool of worker processes that share one copy of the
+        data. Groups with too few rows for the number of components are skipped.
+
+    Args:
+        data (np.ndarray): Numeric data with no missing values
+        groups (pd.Series): The group key of each row, aligned with data by position. Rows
+            with a missing key are left out
+        n_components (int): The number of components fit to each group
+        reference (np.ndarray): Optional components fit to all of the data. The components of
+            each group are flipped to point the same way as the reference, so groups can be
+            compared
+        n_jobs (int): The number of worker processes. All cores if None
+        progress: Optional function called with the fraction of groups fitted
+
+    Return:
+        A dictionary with the results
+            'groups': a dictionary of the results of each fitted group by key, in sorted key
+                order, with its 'rows' positions in the data and the results of run_pca
+                'components', 'explained_variance', 'eigenvalues', 'transformed_data' and 'solver',
+            'skipped': a dictionary of the number of rows of each skipped group by key
+
+    Raises:
+        ValueError: If the groups don't match the rows of the data
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if len(groups) != len(data):
+        raise ValueError(f"Expected {len(data)} group keys but got {len(groups)}")
+
+    # Finds the rows of each group with one sort of the group codes
+    codes, keys = pd.factorize(groups, sort=True)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(keys))
+    group_rows = np.split(order[np.count_nonzero(codes < 0):], np.cumsum(counts)[:-1])
+
+    # Groups need more rows than components
+    fitted = [i for i, count in enumerate(counts) if count > n_components]
+    skipped = {keys[i]: int(counts[i]) for i, count in enumerate(counts) if count <= n_components}
+
+    results = map_shared(
+        partial(_fit_group, n_components=n_components), data, [group_rows[i] for i in fitted], n_jobs, progress
+    ) if fitted else []
+
+    fitted_groups = {}
+    for i, result in zip(fitted, results):
+        # Flips components to agree with the reference, along with their scores
+        if reference is not None:
+            signs = np.where(np.einsum('ij,ij->i', result['components'], reference) < 0, -1.0, 1.0)
+            result['components'] = result['components'] * signs[:, np.newaxis]
+            result['transformed_data'] = result['transformed_data'] * signs
+        result['rows'] = group_rows[i]
+        fitted_groups[keys[i]] = result
+
+    return {'groups': fitted_groups, 'skipped': skipped}
@@ -0,0 +1,291 @@
+import os
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+
+# Number of rows imputed between progress updates
+DEFAULT_IMPUTE_CHUNK_SIZE = 50_000
+
+# Number of principal components the neighbor search index is built on
+DEFAULT_INDEX_COMPONENTS = 16
+
+# Approximation allowed in the neighbor search, trading exact neighbors for speed
+DEFAULT_SEARCH_EPS = 1.0
+
+# Candidates searched per neighbor, so enough of them observe each missing column
+KNN_CANDIDATE_FACTOR = 2
+
+# Most candidate cells compared at once when ranking candidates
+KNN_BLOCK_CELLS = 20_000_000
+
+
+def _observed_moments(values: np.ndarray, observed: np.ndarray):
+    """Returns the mean and standard deviation of each column over its observed values"""
+    counts = observed.sum(axis=0)
+    if (counts == 0).any():
+        raise ValueError("Columns with no values must be dropped before imputing")
+    means = np.where(observed, values, 0.0).sum(axis=0) / counts
+    deviations = np.where(observed, values - means, 0.0)
+    stds = np.sqrt(np.einsum('ij,ij->j', deviations, deviations) / counts)
+    stds[stds < 10 * np.finfo(np.float64).eps] = 1.0
+    return means, stds
+
+
+def knn_impute(
+        df: pd.DataFrame,
+        n_neighbors: int = 5,
+        n_index_components: int = DEFAULT_INDEX_COMPONENTS,
+        eps: float = DEFAULT_SEARCH_EPS,
+        chunk_size: int = DEFAULT_IMPUTE_CHUNK_SIZE,
+        n_jobs: Optional[int] = None,
+        progress: Optional[Callable[[float], None]] = None
+) -> pd.DataFrame:
+    """
+    Fills missing values with the mean of the nearest rows that observe them
+
+    Every row is a donor, including rows with missing values of their own, so wide data where
+        few or no rows are complete can still be imputed. Candidate neighbors are found with a
+        k-d tree over the leading principal components of the standardized data, since k-d trees
+        lose their speed in many dimensions. Each row is placed in that space by a least squares
+        fit to only the columns it observes. The candidates are then ranked by their nan-Euclidean
+        distance, the distance over the columns both rows observe scaled up to all columns, and
+        each missing value is the mean of the n_neighbors nearest candidates that observe it.
+        Values no candidate observes are filled with the column mean. Neighbor queries are
+        approximate by default and run in chunks on all cores.
+
+    Args:
+        df (pd.DataFrame): Numeric data with missing values
+        n_neighbors (int): The number of neighbors averaged for each missing value
+        n_index_components (int): The number of principal components to search neighbors on
+        eps (float): Allows neighbors up to (1 + eps) times further than the true nearest ones,
+            which makes the search much faster. Use 0 for exact neighbors
+        chunk_size (int): The number of rows queried between progress updates
+        n_jobs (int): The number of threads used for queries. All cores if None
+        progress: Optional function called with the fraction of rows imputed
+
+    Return:
+        (pd.DataFrame): The data with missing values filled
+
+    Raises:
+        ValueError: If a column has no values or there are no other rows to take values from
+    """
+    values = df.to_numpy(dtype=np.float64, copy=True)
+    missing = np.isnan(values)
+    incomplete = np.flatnonzero(missing.any(axis=1))
+    if len(incomplete) == 0:
+        return df.copy()
+    if len(values) < 2:
+        raise ValueError("KNN imputation needs at least two rows")
+    means, stds = _observed_moments(values, ~missing)
+    scaled = np.where(missing, 0.0, (values - means) / stds)
+    observed = ~missing
+
+    # Builds the search basis from the covariance of each pair of columns over the rows observing both
+    counts = np.zeros((values.shape[1], values.shape[1]))
+    cross = np.zeros_like(counts)
+    for start in range(0, len(values), chunk_size):
+        block = observed[start:start + chunk_size].astype(np.float64)
+        counts += block.T @ block
+        cross += scaled[start:start + chunk_size].T @ scaled[start:start + chunk_size]
+    variances, vectors = np.linalg.eigh(cross / np.maximum(counts, 1))
+    variances = np.clip(variances[::-1], 0.0, None)
+    n_index = min(n_index_components, values.shape[1])
+    basis = vectors[:, ::-1][:, :n_index]
+
+    # Shrinks each score towards zero by the variance its component leaves unexplained
+    noise = max(variances[n_index:].mean() if n_index < len(variances) else 0.0, 1e-6 * max(variances[0], 1e-12))
+    prior = np.diag(noise / np.maximum(variances[:n_index], noise))
+
+    # Places every row in the search space, fitting incomplete rows to their observed columns only
+    scores = scaled @ basis / (1.0 + np.diag(prior))
+    for start in range(0, len(incomplete), chunk_size):
+        chunk = incomplete[start:start + chunk_size]
+        normal = np.einsum('ij,jk,jl->ikl', observed[chunk].astype(np.float64), basis, basis, optimize=True)
+        normal += prior
+        scores[chunk] = np.linalg.solve(normal, (scaled[chunk] @ basis)[:, :, np.newaxis])[:, :, 0]
+    tree = cKDTree(scores)
+    workers = n_jobs if n_jobs is not None else (os.cpu_count() or 1)
+
+    # Queries extra candidates, since the nearest rows may not observe every missing column
+    n_candidates = min(len(values), KNN_CANDIDATE_FACTOR * n_neighbors + 1)
+    block_rows = max(1, KNN_BLOCK_CELLS // (n_candidates * values.shape[1]))
+    for start in range(0, len(incomplete), chunk_size):
+        chunk = incomplete[start:start + chunk_size]
+        __, candidates = tree.query(scores[chunk], k=n_candidates, eps=eps, workers=workers)
+        candidates = candidates.reshape(len(chunk), n_candidates)
+
+        for block_start in range(0, len(chunk), block_rows):
+            rows = chunk[block_start:block_start + block_rows]
+            near = candidates[block_start:block_start + block_rows]
+            values[rows] = _fill_from_candidates(rows, near, scaled, observed, n_neighbors) * stds + means
+
+        if progress is not None:
+            progress(min(start + chunk_size, len(incomplete)) / len(incomplete))
+
+    filled = np.where(missing, values, df.to_numpy(dtype=np.float64))
+    return pd.DataFrame(filled, index=df.index, columns=df.columns).astype(df.dtypes)
+
+
+def _fill_from_candidates(rows, candidates, scaled, observed, n_neighbors) -> np.ndarray:
+    """
+    Fills the missing standardized values of rows from their nearest candidates by nan-Euclidean distance
+
+    Args:
+        rows: The rows to fill
+        candidates: The candidate neighbors of each row, one row of candidates per row
+        scaled: The standardized data, zero where missing
+        observed: True where a value was observed
+        n_neighbors: The number of candidates averaged for each missing value
+
+    Return:
+        (np.ndarray): The standardized rows with missing values filled, zero where no candidate observes them
+    """
+    n_cols = scaled.shape[1]
+    own, own_observed = scaled[rows], observed[rows].astype(np.float64)
+    donor, donor_observed = scaled[candidates], observed[candidates]
+
+    # Ranks candidates by their distance over shared columns, scaled up to all columns. Missing
+    # values are zero, so the squared differences expand into products that skip them
+    donor_weights = donor_observed.astype(np.float64)
+    n_shared = (donor_weights @ own_observed[:, :, np.newaxis])[:, :, 0]
+    distance = (
+        donor_weights @ (own * own)[:, :, np.newaxis]
+        + (donor * donor) @ own_observed[:, :, np.newaxis]
+        - 2 * donor @ own[:, :, np.newaxis]
+    )[:, :, 0] * n_cols / np.maximum(n_shared, 1)
+    distance[n_shared == 0] = np.inf
+    order = np.argsort(distance, axis=1, kind='stable')[:, :, np.newaxis]
+
+    # Averages the nearest n_neighbors candidates observing each column, counting in distance order
+    ranked = np.take_along_axis(donor_observed, order, axis=1)
+    ranked &= np.cumsum(ranked, axis=1, dtype=np.int16) <= n_neighbors
+    used = np.empty_like(ranked)
+    np.put_along_axis(used, order, ranked, axis=1)
+    n_used = ranked.sum(axis=1)
+    estimates = (used * donor).sum(axis=1) / np.maximum(n_used, 1)
+    return np.where(observed[rows], own, estimates)
+
+
+def iterative_impute(
+        df: pd.DataFrame,
+        max_iter: int = 10,
+        tol: float = 1e-3,
+        alpha: float = 1.0,
+        chunk_size: int = DEFAULT_IMPUTE_CHUNK_SIZE,
+        progress: Optional[Callable[[float], None]] = None
+) -> pd.DataFrame:
+    """
+    Fills missing values by regressing each column on all other columns in turn
+
+    Missing values start at the column mean. Each round fits a ridge regression for every
+        column with missing values on the rows where it was observed and replaces its missing
+        values with the predictions. Rounds repeat until the largest change is below tol
+        standard deviations. Regressions are solved from a Gram matrix of the data that is
+        built once in chunks and updated only for the changed cells, so each round costs
+        little more than the number of missing values.
+
+    Args:
+        df (pd.DataFrame): Numeric data with missing values
+        max_iter (int): The most rounds of regressions to run
+        tol (float): Stops once no value changes by more than tol standard deviations
+        alpha (float): Ridge penalty on the coefficients of the standardized columns
+        chunk_size (int): The number of rows multiplied at a time when building the Gram matrix
+        progress: Optional function called with the fraction of rounds completed
+
+    Return:
+        (pd.DataFrame): The data with missing values filled
+    """
+    values = df.to_numpy(dtype=np.float64)
+    missing = np.isnan(values)
+    n_rows, n_cols = values.shape
+    if not missing.any():
+        return df.copy()
+
+    # Works on standardized, mean-filled data with a column of ones for the intercept
+    means, stds = _observed_moments(values, ~missing)
+    data = np.ones((n_rows, n_cols + 1))
+    data[:, :n_cols] = np.where(missing, 0.0, (values - means) / stds)
+
+    gram = np.zeros((n_cols + 1, n_cols + 1))
+    for start in range(0, n_rows, chunk_size):
+        block = data[start:start + chunk_size]
+        gram += block.T @ block
+
+    missing_rows = [np.flatnonzero(missing[:, j]) for j in range(n_cols)]
+    targets = [j for j in range(n_cols) if len(missing_rows[j])]
+    for iteration in range(max_iter):
+        max_change = 0.0
+        for j in targets:
+            rows = missing_rows[j]
+            others = np.r_[0:j, j + 1:n_cols + 1]
+            block = data[rows]
+
+            # Removes the rows missing column j from the Gram matrix and solves the ridge regression
+            observed_gram = gram[np.ix_(others, others)] - block[:, others].T @ block[:, others]
+            observed_cross = gram[others, j] - block[:, others].T @ block[:, j]
+            penalty = np.full(len(others), alpha)
+            penalty[-1] = 0.0
+            coef = np.linalg.solve(observed_gram + np.diag(penalty), observed_cross)
+
+            # Replaces the missing values and updates the Gram matrix for the changed cells
+            delta = block[:, others] @ coef - block[:, j]
+            data[rows, j] += delta
+            update = delta @ data[rows]
+            gram[j, :] += update
+            gram[:, j] += update
+            gram[j, j] -= delta @ delta
+            max_change = max(max_change, np.abs(delta).max())
+
+        if progress is not None:
+            progress((iteration + 1) / max_iter)
+        if max_change < tol:
+            break
+
+    filled = np.where(missing, data[:, :n_cols] * stds + means, values)
+    return pd.DataFrame(filled, index=df.index, columns=df.columns).astype(df.dtypes)
+
+
+def group_impute(df: pd.DataFrame, groups: pd.Series, strategy: str = "mean") -> pd.DataFrame:
+    """
+    Fills missing values with the mean or median of their column within their group
+
+    The statistics of every group are computed in one groupby pass and every missing value
+        is filled in one gather from the table of group statistics, so the cost does not
+        depend on the number of groups. Rows with a missing group key form their own group.
+        Groups with no observed values in a column use the statistic of the whole column.
+
+    Args:
+        df (pd.DataFrame): Numeric data with missing values
+        groups (pd.Series): The group key of each row, aligned with df by position
+        strategy (str): Either "mean" or "median"
+
+    Return:
+        (pd.DataFrame): The data with missing values filled
+
+    Raises:
+        ValueError: If strategy is not "mean" or "median" or the groups don't match the rows
+    """
+    if strategy not in ("mean", "median"):
+        raise ValueError(f"Unknown group imputation strategy: {strategy}")
+    if len(groups) != len(df):
+        raise ValueError(f"Expected {len(df)} group keys but got {len(groups)}")
+
+    values = df.to_numpy(dtype=np.float64, copy=True)
+    missing = np.isnan(values)
+    if not missing.any():
+        return df.copy()
+
+    # Computes a table with the statistics of each column within each group
+    codes, uniques = pd.factorize(np.asarray(groups), use_na_sentinel=False)
+    table = pd.DataFrame(values).groupby(codes).agg(strategy)
+    table = table.reindex(range(len(uniques))).to_numpy()
+    overall = getattr(np, f"nan{strategy}")(values, axis=0)
+    table = np.where(np.isnan(table), overall, table)
+
+    # Fills every missing value from the statistics of its row's group
+    rows, cols = np.nonzero(missing)
+    values[rows, cols] = table[codes[rows], cols]
+    return pd.DataFrame(values, index=df.index, columns=df.columns).astype(df.dtypes)
@@ -0,0 +1,126 @@
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+from sklearn.utils.extmath import randomized_svd
+
+from source.utils.shared_pool import map_shared
+
+
+# Number of column-permuted copies of the data decomposed by default
+DEFAULT_PERMUTATIONS = 50
+
+# Percentile of the permuted eigenvalues a component must exceed to be kept
+DEFAULT_PERCENTILE = 95.0
+
+# Most components compared when no count is given
+MAX_PARALLEL_COMPONENTS = 50
+
+# Data with up to this many columns is solved exactly from its Gram matrix, which is faster
+# than the randomized solver until the columns far outnumber the components
+GRAM_MAX_COLUMNS = 1000
+
+# Power iterations of the randomized solver, permuted data has a flat spectrum that needs several
+RANDOMIZED_ITER = 6
+
+
+def _top_eigenvalues(data: np.ndarray, n_components: int, seed) -> np.ndarray:
+    """
+    Returns the largest covariance eigenvalues of centered data
+
+    Up to GRAM_MAX_COLUMNS columns are solved exactly from the Gram matrix, otherwise only
+        the leading components are found with a randomized truncated SVD. Permuted data has a
+        flat spectrum, so the randomized solver oversamples as many extra directions as it keeps.
+    """
+    if data.shape[1] <= GRAM_MAX_COLUMNS or 4 * n_components >= data.shape[1]:
+        gram = data.T @ data
+        eigvals = np.linalg.eigvalsh(gram)[::-1][:n_components]
+        return np.maximum(eigvals, 0.0) / (len(data) - 1)
+
+    random_state = int(np.random.default_rng(seed).integers(2 ** 31 - 1))
+    __, singular_values, __ = randomized_svd(
+        data, n_components, n_oversamples=n_components, n_iter=RANDOMIZED_ITER, random_state=random_state
+    )
+    return singular_values ** 2 / (len(data) - 1)
+
+
+def _permuted_eigenvalues(seed, data: np.ndarray, n_components: int) -> np.ndarray:
+    """Returns the largest eigenvalues of one copy of the data with every column shuffled separately"""
+    rng = np.random.default_rng(seed)
+    permuted = rng.permuted(data, axis=0)
+    return _top_eigenvalues(permuted, n_components, rng)
+
+
+def parallel_analysis(
+        data: np.ndarray,
+        n_components: Optional[int] = None,
+        n_permutations: int = DEFAULT_PERMUTATIONS,
+        percentile: float = DEFAULT_PERCENTILE,
+        seed: int = 0,
+        n_jobs: Optional[int] = None,
+        progress: Optional[Callable[[float], None]] = None
+) -> Dict[str, Any]:
+    """
+    Runs Horn's parallel analysis to choose how many principal components to keep
+
+    Shuffling each column separately removes all correlation between columns while keeping
+        their values. Components of the real data whose eigenvalues are above what shuffled
+        data gives by chance are kept. The shuffled copies are decomposed in a pool of worker
+        processes that read the data from shared memory, each with its own seed spawned from
+        the given seed, so results are the same for any number of workers.
+
+    Args:
+        data (np.ndarray): Standardized data with no missing values
+        n_components (int): The number of leading components to compare. Up to
+            MAX_PARALLEL_COMPONENTS if None
+        n_permutations (int): The number of shuffled copies to decompose
+        percentile (float): The percentile of the shuffled eigenvalues used as the threshold
+        seed (int): Seed of the random shuffles
+        n_jobs (int): The number of worker processes. All cores if None, 1 runs in this process
+        progress: Optional function called with the fraction of copies decomposed
+
+    Return:
+        A dictionary with the results
+            'eigenvalues': the eigenvalues of the data,
+            'threshold': the percentile of the shuffled eigenvalues for each component,
+            'permuted_eigenvalues': the eigenvalues of every shuffled copy,
+            'total_variance': the total variance of the data,
+            'n_suggested': the number of leading components above the threshold,
+            'n_permutations': n_permutations,
+            'percentile': percentile
+
+    Raises:
+        ValueError: If the data has missing values or too few rows or columns
+    """
+    data = np.asarray(data, dtype=np.float64)
+    n_rows, n_cols = data.shape
+    if n_rows < 3 or n_cols < 2:
+        raise ValueError("Parallel analysis needs at least 3 rows and 2 columns")
+    if np.isnan(data).any():
+        raise ValueError("Missing values must be filled before running parallel analysis")
+
+    # Works on centered data so the solver finds covariance eigenvalues
+    data = data - data.mean(axis=0)
+    max_components = min(n_cols, n_rows - 1)
+    n_components = min(n_components or MAX_PARALLEL_COMPONENTS, max_components)
+    seeds = np.random.SeedSequence(seed).spawn(n_permutations + 1)
+    eigenvalues = _top_eigenvalues(data, n_components, seeds[0])
+
+    permuted = np.array(map_shared(
+        partial(_permuted_eigenvalues, n_components=n_components), data, seeds[1:], n_jobs, progress
+    ))
+
+    # Keeps the leading components that stay above the threshold
+    threshold = np.percentile(permuted, percentile, axis=0)
+    above = eigenvalues > threshold
+    n_suggested = int(np.argmin(above)) if not above.all() else n_components
+
+    return {
+        'eigenvalues': eigenvalues,
+        'threshold': threshold,
+        'permuted_eigenvalues': permuted,
+        'total_variance': float(np.einsum('ij,ij->', data, data) / (n_rows - 1)),
+        'n_suggested': n_suggested,
+        'n_permutations': n_permutations,
+        'percentile': percentile,
+    }
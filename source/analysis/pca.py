@@ -1,10 +1,35 @@
 import numpy as np
 import pandas as pd
+from scipy import linalg
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
 from typing import Dict, Any, Optional, List, Tuple
 import traceback
 
+from source.analysis.pca_result import PCAResult
+from source.analysis.scaler import StreamingStandardizer, DEFAULT_CHUNK_SIZE
+
+
+# Features must outnumber rows by this factor before the Gram-matrix solver is used
+GRAM_FEATURE_RATIO = 5
+
+# Number of columns whose correlations are computed together when screening for collinearity
+COLLINEARITY_BLOCK_SIZE = 512
+
+# Iteration limit and relative tolerance of the EM solver for data with missing values
+EM_MAX_ITER = 500
+EM_TOL = 1e-6
+
+
+def _flip_signs(components: np.ndarray) -> np.ndarray:
+    """Returns the sign of each component that makes its largest absolute loading positive"""
+    max_idx = np.argmax(np.abs(components), axis=1)
+    signs = np.sign(components[np.arange(len(components)), max_idx])
+    signs[signs == 0] = 1
+    return signs
+
+
 class PCAAnalyzer:
     """
     Core PCA analysis functionality
@@ -14,8 +39,9 @@ class PCAAnalyzer:
             self,
             df: pd.DataFrame,
             drop_cols: Optional[List[str]] = None,
-            default_drop_cols: Optional[List[str]] = None
-    ) -> Tuple[pd.DataFrame, List[str]]:
+            default_drop_cols: Optional[List[str]] = None,
+            correlation_threshold: Optional[float] = None
+    ) -> Tuple[pd.DataFrame, List[str], Dict[str, List[str]]]:
         """
         Removes the specified columns from the data
 
@@ -23,9 +49,13 @@ class PCAAnalyzer:
             df (pd.DataFrame): Data to prepare
             drop_cols (List[str]): The names of the columns to remove from the data
             default_drop_cols (List[str]): The names of 'default' columns to remove from the data
+            correlation_threshold (float): If given, features correlated with an earlier feature by
+                at least this absolute value are removed, see screen_collinear
 
         Return:  
             DataFrame: A copy of data with the specified columns filtered out
+            List[str]: The user-specified columns that were not found
+            Dict[str, List[str]]: The features removed as collinear, by the feature kept in their place
         """
         if not isinstance(df, pd.DataFrame):
             raise TypeError(f"Input must be a pandas DataFrame, but got {type(df).__name__}")
@@ -45,7 +75,84 @@ class PCAAnalyzer:
             default_to_drop = [col for col in default_drop_cols if col in df_copy.columns]
             df_copy = df_copy.drop(columns=default_to_drop)
 
-        return df_copy, missing_cols if drop_cols else []
+        # Keeps one feature from each cluster of highly correlated features
+        pruned = {}
+        if correlation_threshold is not None:
+            df_copy, pruned = self.screen_collinear(df_copy, correlation_threshold)
+
+        return df_copy, missing_cols if drop_cols else [], pruned
+
+    def screen_collinear(
+            self,
+            df: pd.DataFrame,
+            threshold: float,
+            block_size: int = COLLINEARITY_BLOCK_SIZE
+    ) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+        """
+        Removes numeric features that are highly correlated with an earlier feature
+
+        Correlations are computed one pair of column blocks at a time, so only block_size
+            standardized columns and block_size x block_size correlations are held at once.
+            Features whose absolute correlation reaches the threshold are linked, and each
+            connected cluster of linked features keeps only its first feature. Missing and
+            infinite values are treated as the column mean and constant columns are never linked.
+
+        Args:
+            df (pd.DataFrame): Data to screen. Non-numeric columns are kept as they are
+            threshold (float): The absolute correlation, between 0 and 1, that links two features
+            block_size (int): The number of columns standardized and correlated together
+
+        Return:
+            (pd.DataFrame): The data without the pruned features
+            (Dict[str, List[str]]): The features removed, by the feature kept in their place
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Correlation threshold must be between 0 and 1, but got {threshold}")
+
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        n_cols = len(numeric_cols)
+        if n_cols < 2 or len(df) < 2:
+            return df, {}
+
+        # Column means over finite values, used to center and fill each block
+        data = df[numeric_cols].to_numpy(dtype=np.float64)
+        finite = np.isfinite(data)
+        data = np.where(finite, data, np.nan)
+        counts = finite.sum(axis=0)
+        means = np.nansum(data, axis=0) / np.maximum(counts, 1)
+
+        def standardize(start):
+            """Returns a block of columns centered and scaled to unit length"""
+            block = np.nan_to_num(data[:, start:start + block_size] - means[start:start + block_size])
+            norms = np.linalg.norm(block, axis=0)
+            return block / np.where(norms > 0, norms, np.inf)
+
+        # Finds every pair of features at or above the threshold, block by block
+        pair_rows, pair_cols = [], []
+        for i in range(0, n_cols, block_size):
+            block_i = standardize(i)
+            for j in range(i, n_cols, block_size):
+                block_j = block_i if j == i else standardize(j)
+                corr = np.abs(block_i.T @ block_j)
+                if j == i:
+                    corr = np.triu(corr, k=1)
+                rows, cols = np.nonzero(corr >= threshold)
+                pair_rows.append(rows + i)
+                pair_cols.append(cols + j)
+
+        # Groups linked features into clusters and keeps the first feature of each
+        pair_rows, pair_cols = np.concatenate(pair_rows), np.concatenate(pair_cols)
+        graph = coo_matrix((np.ones(len(pair_rows)), (pair_rows, pair_cols)), shape=(n_cols, n_cols))
+        __, labels = connected_components(graph, directed=False)
+
+        pruned = {}
+        for members in pd.Series(range(n_cols)).groupby(labels):
+            members = members[1].tolist()
+            if len(members) > 1:
+                pruned[numeric_cols[members[0]]] = [numeric_cols[m] for m in members[1:]]
+
+        pruned_cols = [col for cols in pruned.values() for col in cols]
+        return df.drop(columns=pruned_cols), pruned
 
     def clean_numeric_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
         """
@@ -78,32 +185,42 @@ class PCAAnalyzer:
 
         return numeric_df, rm_cols
   
-    def standardize_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def standardize_data(
+            self,
+            df: pd.DataFrame,
+            chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Tuple[pd.DataFrame, StreamingStandardizer]:
         """
         Standardize the data for PCA with detailed tracking.
         
         Args:
             df (pd.DataFrame): Data to be standardized
+            chunk_size (int): The number of rows to accumulate moments over at a time
         Return:
             (pd.DataFrame): Standardized data
+            (StreamingStandardizer): The fitted standardizer, for standardizing new data
         """
         # Validate Input data
         if not isinstance(df, pd.DataFrame):
             raise TypeError(f"Input must be a pandas DataFrame, but got {type(df).__name__}")
 
         # Standardize Data
-        standardized = pd.DataFrame(StandardScaler().fit_transform(df), columns=df.columns)
+        scaler = StreamingStandardizer().fit(df, chunk_size=chunk_size)
+        standardized = scaler.transform(df)
 
-        return standardized
+        return standardized, scaler
 
-    def run_pca(self, df: pd.DataFrame, n_components: int) -> Dict[str, Any]:
+    def run_pca(self, df: pd.DataFrame, n_components: int, solver: str = "auto") -> Dict[str, Any]:
         """
         Run PCA analysis with detailed validation and debugging.
         
         Args:
             df (pd.DataFrame): Numeric data to run PCA on.
-            dimensions (int):  Number of components for PCA to divide the data into
             n_components (int): Number of components to run PCA on
+            solver (str): "svd" for sklearn's PCA, "gram" for the n x n Gram-matrix solver,
+                "em" for the EM solver for data with missing values, or "auto" to use the EM
+                solver when values are missing and the Gram-matrix solver when features
+                greatly outnumber rows
 
         Return:
             A dictionary of useful information regaurding the PCA model
@@ -111,11 +228,14 @@ class PCAAnalyzer:
                 'transformed_data': transformed_data,
                 'components': model.components_,
                 'explained_variance': model.explained_variance_ratio_,
+                'eigenvalues': model.explained_variance_,
+                'mean': model.mean_,
                 'loadings': model.components_.T,
                 'feature_names': df.columns.tolist(),
                 'n_components': n_components,
                 'max_components': max_components,
-                'data_shape': df.shape
+                'data_shape': df.shape,
+                'solver': solver
         """
         # Gets the number of data entries in the df
         max_components = df.shape[1]
@@ -126,6 +246,19 @@ class PCAAnalyzer:
         if n_components > df.shape[1]:
             raise ValueError("More components selected then exist")
 
+        # Selects the solver based on the shape of the data
+        if solver == "auto":
+            if df.isna().any().any():
+                solver = "em"
+            else:
+                solver = "gram" if df.shape[1] >= GRAM_FEATURE_RATIO * df.shape[0] else "svd"
+        if solver == "gram":
+            return self.run_gram_pca(df, n_components)
+        if solver == "em":
+            return self.run_em_pca(df, n_components)
+        if solver != "svd":
+            raise ValueError(f"Unknown PCA solver: {solver}")
+
         # PCA Execution with detailed tracking
         model = PCA(n_components=n_components)
         transformed_data = model.fit_transform(df)
@@ -136,11 +269,178 @@ class PCAAnalyzer:
             'transformed_data': transformed_data,
             'components': model.components_,
             'explained_variance': model.explained_variance_ratio_,
+            'eigenvalues': model.explained_variance_,
+            'mean': model.mean_,
             'loadings': model.components_.T,
             'feature_names': df.columns.tolist(),
             'n_components': n_components,
             'max_components': max_components,
-            'data_shape': df.shape
+            'data_shape': df.shape,
+            'solver': solver,
+        }
+
+    def run_gram_pca(self, df: pd.DataFrame, n_components: int) -> Dict[str, Any]:
+        """
+        Run PCA through the n x n Gram matrix for data with many more features than rows
+
+        Decomposes X X^T instead of the feature covariance and recovers the loadings through
+            the dual, V = X^T U / s. Components follow sklearn's sign convention so results
+            match the "svd" solver. Float32 data is decomposed in float32.
+
+        Args:
+            df (pd.DataFrame): Numeric data to run PCA on.
+            n_components (int): Number of components to run PCA on
+
+        Return:
+            A dictionary in the same format as run_pca, with 'model' set to None
+        """
+        n_rows = df.shape[0]
+        if n_components > min(df.shape):
+            raise ValueError("More components selected then exist")
+
+        # Centers the data
+        dtype = np.float32 if (df.dtypes == np.float32).all() else np.float64
+        data = df.to_numpy(dtype=dtype, copy=True)
+        mean = data.mean(axis=0)
+        data -= mean
+
+        # Gets the largest eigenpairs of the Gram matrix, largest first
+        gram = data @ data.T
+        eigvals, eigvecs = linalg.eigh(gram, subset_by_index=[n_rows - n_components, n_rows - 1])
+        eigvals = np.clip(eigvals[::-1], 0, None)
+        eigvecs = eigvecs[:, ::-1]
+
+        # Recovers the loadings through the dual
+        singular_vals = np.sqrt(eigvals)
+        safe_singular_vals = np.where(singular_vals > 0, singular_vals, 1)
+        components = (data.T @ eigvecs / safe_singular_vals).T
+
+        # Flips signs so the largest absolute loading of each component is positive
+        signs = _flip_signs(components)
+        components *= signs[:, np.newaxis]
+        transformed_data = eigvecs * (singular_vals * signs)
+
+        # Calculates the variance explained by each component
+        explained_variance = eigvals / (n_rows - 1)
+        total_variance = np.trace(gram) / (n_rows - 1)
+
+        return {
+            'model': None,
+            'transformed_data': transformed_data,
+            'components': components,
+            'explained_variance': explained_variance / total_variance,
+            'eigenvalues': explained_variance,
+            'mean': mean,
+            'loadings': components.T,
+            'feature_names': df.columns.tolist(),
+            'n_components': n_components,
+            'max_components': df.shape[1],
+            'data_shape': df.shape,
+            'solver': "gram",
+        }
+
+    def run_em_pca(
+            self,
+            df: pd.DataFrame,
+            n_components: int,
+            max_iter: int = EM_MAX_ITER,
+            tol: float = EM_TOL
+    ) -> Dict[str, Any]:
+        """
+        Run PCA on data with missing values using expectation-maximization
+
+        Missing values start at the column mean. Each iteration fits the component scores to
+            the current loadings (E-step), refits the loadings to the scores (M-step), and
+            replaces only the missing cells with their rank-k reconstruction. Every step is a
+            matrix product over all rows, and the centered data is never copied. Iterations
+            stop when the missing values change by less than tol relative to their size.
+            Without missing values this is the "svd" solver. Float32 data stays float32.
+
+        Args:
+            df (pd.DataFrame): Numeric data to run PCA on, with missing values as NaN
+            n_components (int): Number of components to run PCA on
+            max_iter (int): The most EM iterations to run
+            tol (float): The relative change of the missing values to stop at
+
+        Return:
+            A dictionary in the same format as run_pca, with 'model' set to None, plus
+                'imputed_data': The data with missing values filled by the final model
+                'n_iter': The number of iterations run
+                'converged': Whether the tolerance was reached
+        """
+        n_rows, n_cols = df.shape
+        if n_components > min(df.shape):
+            raise ValueError("More components selected then exist")
+
+        dtype = np.float32 if (df.dtypes == np.float32).all() else np.float64
+        data = df.to_numpy(dtype=dtype, copy=True)
+        missing = np.isnan(data)
+        if not missing.any():
+            return self.run_pca(df, n_components, solver="svd")
+        if missing.all(axis=0).any():
+            raise ValueError("Columns with no values must be dropped before PCA")
+        rows, cols = np.nonzero(missing)
+        del missing
+
+        # Fills missing values with the column means and starts from a deterministic basis
+        data[rows, cols] = np.nanmean(data, axis=0)[cols]
+        weights, __ = np.linalg.qr(np.random.default_rng(0).standard_normal((n_cols, n_components)))
+        weights = weights.astype(dtype)
+
+        converged = False
+        n_iter = 0
+        while not converged and n_iter < max_iter:
+            n_iter += 1
+            mean = data.mean(axis=0)
+
+            # E-step: Scores of the centered data, computed without centering a copy
+            scores = np.linalg.solve(weights.T @ weights, (data @ weights - mean @ weights).T).T
+
+            # M-step: Loadings that best reconstruct the centered data from the scores
+            cross = data.T @ scores - np.outer(mean, scores.sum(axis=0))
+            weights = np.linalg.solve(scores.T @ scores, cross.T).T
+
+            # Replaces only the missing cells with their reconstruction
+            filled = np.einsum('ij,ij->i', scores[rows], weights[cols]) + mean[cols]
+            change = np.linalg.norm(filled - data[rows, cols])
+            size = np.linalg.norm(filled)
+            data[rows, cols] = filled
+            converged = change <= tol * max(size, np.finfo(dtype).tiny)
+
+        # Rotates the fitted subspace to orthogonal components ordered by variance
+        mean = data.mean(axis=0)
+        basis, __ = np.linalg.qr(weights)
+        projected = data @ basis - mean @ basis
+        eigvals, eigvecs = linalg.eigh(projected.T @ projected)
+        eigvals = np.clip(eigvals[::-1], 0, None)
+        eigvecs = eigvecs[:, ::-1]
+        components = (basis @ eigvecs).T.astype(dtype)
+
+        # Flips signs so the largest absolute loading of each component is positive
+        signs = _flip_signs(components)
+        components *= signs[:, np.newaxis]
+        transformed_data = projected @ (eigvecs * signs)
+
+        # Calculates the variance explained by each component
+        explained_variance = eigvals / (n_rows - 1)
+        total_variance = (np.einsum('ij,ij->', data, data) - n_rows * mean @ mean) / (n_rows - 1)
+
+        return {
+            'model': None,
+            'transformed_data': transformed_data,
+            'components': components,
+            'explained_variance': explained_variance / total_variance,
+            'eigenvalues': explained_variance,
+            'mean': mean,
+            'loadings': components.T,
+            'feature_names': df.columns.tolist(),
+            'n_components': n_components,
+            'max_components': n_cols,
+            'data_shape': df.shape,
+            'solver': "em",
+            'imputed_data': pd.DataFrame(data, index=df.index, columns=df.columns),
+            'n_iter': n_iter,
+            'converged': converged,
         }
 
     def analyze(
@@ -148,8 +448,12 @@ class PCAAnalyzer:
             df: pd.DataFrame,
             n_components: int,
             drop_cols: Optional[List[str]] = None,
-            default_drop_cols: Optional[List[str]] = None
-    ) -> Dict[str, Any]:
+            default_drop_cols: Optional[List[str]] = None,
+            solver: str = "auto",
+            backend: Optional[Any] = None,
+            dtype: Optional[str] = None,
+            correlation_threshold: Optional[float] = None
+    ) -> PCAResult:
         """
         Complete PCA analysis pipeline with comprehensive error handling.
         
@@ -158,39 +462,78 @@ class PCAAnalyzer:
             n_components (int): Number of components to run PCA on
             drop_cols (List[str]): The names of the columns to remove from the data
             default_drop_cols (List[str]): The names of 'default' columns to remove from the data
+            solver (str): The PCA solver to use, see run_pca
+            backend: An optional DistributedPCABackend to fit the PCA across worker processes.
+                The backend requires complete data, missing values are not imputed. When its
+                workers read their own shards, the standardized data and scores come from the
+                shards, but df must still be a representative sample of them. Column dropping,
+                collinearity screening and numeric cleaning run on df's rows and decide the
+                features every shard is fitted on
+            dtype (str): "float32" or "float64" to run the analysis in that precision.
+                None keeps the precision of the data. A backend always computes in float64
+                and its results are cast to this precision
+            correlation_threshold (float): If given, features correlated with an earlier feature
+                by at least this absolute value are removed before PCA
 
         Return:
-            A dictionary of useful information regaurding the PCA model
+            A PCAResult of useful information regaurding the PCA model, read like a dictionary
                 'model': model,
                 'transformed_data': transformed_data,
                 'components': model.components_,
                 'explained_variance': model.explained_variance_ratio_,
+                'eigenvalues': model.explained_variance_,
+                'mean': model.mean_,
                 'loadings': model.components_.T,
                 'feature_names': df.columns.tolist(),
                 'n_components': n_components,
                 'max_components': max_components,
-                'data_shape': df.shape
+                'data_shape': df.shape,
+                'solver': solver,
                 'missing_columns': missing_columns,
                 'original_shape': df.shape,
                 'prepared_shape': prepared_data.shape,
-                'standardized_shape': standardized_data.shape
+                'standardized_shape': standardized_data.shape,
+                'standardized_data': standardized_data,
+                'scaler': scaler,
+                'pruned_features': pruned_features
         """
         try:
             # Prepare and validate data
-            prepared_data, missing_cols = self.prepare_data(
+            prepared_data, missing_cols, pruned_features = self.prepare_data(
                 df,
                 drop_cols=drop_cols,
-                default_drop_cols=default_drop_cols
+                default_drop_cols=default_drop_cols,
+                correlation_threshold=correlation_threshold
             )
 
             # Clean numeric data
             numeric_data, missing_cols = self.clean_numeric_data(prepared_data)
+            if dtype is not None:
+                numeric_data = numeric_data.astype(dtype, copy=False)
 
-            # Standardize
-            standardized_data = self.standardize_data(numeric_data)
+            if backend is None:
+                # Standardize
+                standardized_data, scaler = self.standardize_data(numeric_data)
 
-            # Run PCA
-            results = self.run_pca(standardized_data, n_components)
+                # Run PCA, replacing missing values with those fitted by the EM solver
+                results = self.run_pca(standardized_data, n_components, solver=solver)
+                if 'imputed_data' in results:
+                    standardized_data = results.pop('imputed_data')
+            else:
+                # Run PCA across the backend's workers and standardize with their statistics,
+                # using the workers' own shards when they read them instead of the local data
+                results = backend.fit(numeric_data, n_components)
+                scaler = backend.scaler_
+                standardized_data = results.pop('standardized_data', None)
+                if standardized_data is None:
+                    standardized_data = scaler.transform(numeric_data)
+
+                # Workers compute in float64, so their results are cast to the precision requested
+                if dtype is not None:
+                    standardized_data = standardized_data.astype(dtype, copy=False)
+                    for key in ('transformed_data', 'components', 'explained_variance',
+                                'eigenvalues', 'mean', 'loadings'):
+                        results[key] = results[key].astype(dtype, copy=False)
             # Add additional context to results
             results.update({
                 'missing_columns': missing_cols,
@@ -198,11 +541,69 @@ class PCAAnalyzer:
                 'prepared_shape': prepared_data.shape,
                 'standardized_shape': standardized_data.shape,
                 'standardized_data': standardized_data,
+                'scaler': scaler,
+                'pruned_features': pruned_features,
             })
 
-            return results
+            return PCAResult(results)
 
         except Exception as e:
             error_str = traceback.print_exc()  # Keep detailed error tracking
             print(error_str)
-            raise Exception(f"PCA analysis failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"PCA analysis failed: {str(e)}")
+
+    def precision_report(self, df: pd.DataFrame, n_components: int, solver: str = "auto") -> Dict[str, Any]:
+        """
+        Compares PCA run in float32 against float64 on the same data
+
+        Args:
+            df (pd.DataFrame): Data to run the PCA analysis on
+            n_components (int): Number of components to run PCA on
+            solver (str): The PCA solver to use, see run_pca
+
+        Return:
+            A dictionary comparing the two precisions
+                'data_dtype': The dtype of the numeric data given,
+                'explained_variance_64': float64 explained variance ratios,
+                'explained_variance_32': float32 explained variance ratios,
+                'max_abs_error': Largest absolute difference in explained variance ratio,
+                'max_rel_error': Largest relative difference in explained variance ratio,
+                'cumulative_abs_error': Absolute difference in total explained variance ratio,
+                'component_similarity': Absolute cosine between matching components,
+                'memory_64': Bytes used by float64 data, standardized data and scores,
+                'memory_32': Bytes used by float32 data, standardized data and scores
+        """
+        numeric_data, __ = self.clean_numeric_data(df)
+
+        results, memory = {}, {}
+        for dtype in (np.float64, np.float32):
+            data = numeric_data.astype(dtype)
+            standardized_data, __ = self.standardize_data(data)
+            results[dtype] = self.run_pca(standardized_data, n_components, solver=solver)
+            memory[dtype] = (
+                data.memory_usage(index=False).sum()
+                + standardized_data.memory_usage(index=False).sum()
+                + results[dtype]['transformed_data'].nbytes
+            )
+
+        # Compares the explained variance and the direction of each component
+        var_64 = np.asarray(results[np.float64]['explained_variance'], dtype=np.float64)
+        var_32 = np.asarray(results[np.float32]['explained_variance'], dtype=np.float64)
+        abs_error = np.abs(var_64 - var_32)
+        components_64 = np.asarray(results[np.float64]['components'], dtype=np.float64)
+        components_32 = np.asarray(results[np.float32]['components'], dtype=np.float64)
+        similarity = np.abs(np.einsum('ij,ij->i', components_64, components_32)) / (
+            np.linalg.norm(components_64, axis=1) * np.linalg.norm(components_32, axis=1)
+        )
+
+        return {
+            'data_dtype': str(np.result_type(*numeric_data.dtypes)),
+            'explained_variance_64': var_64,
+            'explained_variance_32': var_32,
+            'max_abs_error': abs_error.max(),
+            'max_rel_error': (abs_error / np.where(var_64 > 0, var_64, 1)).max(),
+            'cumulative_abs_error': abs(var_64.sum() - var_32.sum()),
+            'component_similarity': similarity,
+            'memory_64': int(memory[np.float64]),
+            'memory_32': int(memory[np.float32]),
+        }
\ No newline at end of file
@@ -0,0 +1,167 @@
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Results that the derived quantities are computed from
+_DERIVED_FROM = {'loadings', 'components', 'explained_variance', 'feature_names'}
+
+
+def _top_positions(values: np.ndarray, k: int) -> np.ndarray:
+    """Returns the positions of the k largest values, largest first, without sorting every value"""
+    k = max(0, min(k, len(values)))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    top = np.argpartition(-values, k - 1)[:k] if k < len(values) else np.arange(len(values))
+    return top[np.argsort(-values[top], kind='stable')]
+
+
+class PCAResult(MutableMapping):
+    """
+    The results of a PCA analysis with derived quantities computed once on first use
+
+    Results are read and written like the dictionary returned by earlier versions, such as
+        result['loadings']. Quantities the plots derive from the loadings, like absolute
+        loadings, feature rankings and biplot arrow lengths, are computed the first time
+        they are used and kept until the loadings they depend on are replaced.
+    """
+
+    __slots__ = (
+        '_results',
+        '_abs_loadings',
+        '_magnitudes',
+        '_biplot_loadings',
+        '_feature_index',
+        '_rank_orders',
+        '_top_loadings',
+        '_top_magnitudes',
+    )
+
+    def __init__(self, results: Optional[Dict[str, Any]] = None):
+        """
+        Creates a result from a dictionary of PCA results
+
+        Args:
+            results (Dict[str, Any]): Results such as those returned by PCAAnalyzer.run_pca
+        """
+        self._results = dict(results) if results is not None else {}
+        self._clear_derived()
+
+    def _clear_derived(self):
+        """Forgets every derived quantity so it is computed again on its next use"""
+        self._abs_loadings = None
+        self._magnitudes = None
+        self._biplot_loadings = None
+        self._feature_index = None
+        self._rank_orders = {}
+        self._top_loadings = {}
+        self._top_magnitudes = {}
+
+
+    #### 1. Dictionary Interface ####
+
+    def __getitem__(self, key: str) -> Any:
+        return self._results[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self._results[key] = value
+        if key in _DERIVED_FROM:
+            self._clear_derived()
+
+    def __delitem__(self, key: str):
+        del self._results[key]
+        if key in _DERIVED_FROM:
+            self._clear_derived()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._results)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __repr__(self) -> str:
+        return f"PCAResult({', '.join(self._results)})"
+
+
+    #### 2. Derived Quantities ####
+
+    @property
+    def abs_loadings(self) -> np.ndarray:
+        """The absolute loadings, one row per feature and one column per component"""
+        if self._abs_loadings is None:
+            self._abs_loadings = np.abs(self['loadings'])
+        return self._abs_loadings
+
+    @property
+    def magnitudes(self) -> np.ndarray:
+        """The length of each feature's loading vector on the first two components"""
+        if self._magnitudes is None:
+            loadings = self['loadings']
+            self._magnitudes = np.hypot(loadings[:, 0], loadings[:, 1])
+        return self._magnitudes
+
+    @property
+    def biplot_loadings(self) -> np.ndarray:
+        """The loadings on the first two components scaled by the square root of their explained variance"""
+        if self._biplot_loadings is None:
+            self._biplot_loadings = self['loadings'][:, :2] * np.sqrt(self['explained_variance'][:2])
+        return self._biplot_loadings
+
+    @property
+    def feature_index(self) -> pd.Index:
+        """The feature names as an index, for looking up many features at once"""
+        if self._feature_index is None:
+            self._feature_index = pd.Index(self['feature_names'])
+        return self._feature_index
+
+    def rank_order(self, component: int) -> np.ndarray:
+        """
+        Ranks every feature by its absolute loading on a component
+
+        Args:
+            component (int): The position of the component, starting from 0
+
+        Return:
+            (np.ndarray): The positions of all features, largest absolute loading first
+        """
+        if component not in self._rank_orders:
+            self._rank_orders[component] = np.argsort(-self.abs_loadings[:, component], kind='stable')
+        return self._rank_orders[component]
+
+    def top_loadings(self, component: int, k: int) -> np.ndarray:
+        """
+        Finds the features with the largest absolute loadings on a component
+
+        Uses the full ranking when it was already computed, otherwise only the top k
+            features are found and sorted.
+
+        Args:
+            component (int): The position of the component, starting from 0
+            k (int): The number of features to find
+
+        Return:
+            (np.ndarray): The positions of the top features, largest absolute loading first
+        """
+        key = (component, k)
+        if key not in self._top_loadings:
+            if component in self._rank_orders:
+                self._top_loadings[key] = self._rank_orders[component][:k]
+            else:
+                self._top_loadings[key] = _top_positions(self.abs_loadings[:, component], k)
+        return self._top_loadings[key]
+
+    def top_magnitudes(self, k: int) -> np.ndarray:
+        """
+        Finds the features with the longest loading vectors on the first two components
+
+        Args:
+            k (int): The number of features to find
+
+        Return:
+            (np.ndarray): The positions of the top features, longest first
+        """
+        if k not in self._top_magnitudes:
+            self._top_magnitudes[k] = _top_positions(self.magnitudes, k)
+        return self._top_magnitudes[k]
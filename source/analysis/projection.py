@@ -0,0 +1,62 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from source.analysis.cleaning import align_columns
+
+
+def project_data(df: pd.DataFrame, pca_results: Dict[str, Any], fill_values: Optional[pd.Series] = None) -> np.ndarray:
+    """
+    Projects data onto the components of an already fitted PCA model
+
+    Args:
+        df (pd.DataFrame): Data containing every feature of the fitted model
+        pca_results (Dict[str, Any]): Results from PCAAnalyzer.analyze
+        fill_values (pd.Series): Values used to fill missing data, indexed by feature name
+
+    Return:
+        (np.ndarray): The scores of each row on the fitted components
+    """
+    aligned = align_columns(df, pca_results['feature_names'])
+    if fill_values is not None:
+        aligned = aligned.fillna(fill_values)
+    if aligned.isna().any().any():
+        raise ValueError("Projected data contains missing values and no fill values are available")
+    aligned = aligned.astype(pca_results['components'].dtype, copy=False)
+
+    standardized = pca_results['scaler'].transform(aligned).to_numpy()
+    return (standardized - pca_results['mean']) @ pca_results['components'].T
+
+
+def project_chunks(
+        chunks: Iterable[pd.DataFrame],
+        pca_results: Dict[str, Any],
+        fill_values: Optional[pd.Series] = None,
+        row_filter: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+) -> np.ndarray:
+    """
+    Projects data read in chunks onto the components of an already fitted PCA model
+
+    Only one chunk of raw data is held in memory at a time.
+
+    Args:
+        chunks: An iterable of DataFrames, such as a pandas chunked csv reader
+        pca_results (Dict[str, Any]): Results from PCAAnalyzer.analyze
+        fill_values (pd.Series): Values used to fill missing data, indexed by feature name
+        row_filter: An optional function that filters the rows of each chunk
+
+    Return:
+        (np.ndarray): The scores of every kept row on the fitted components
+    """
+    scores = []
+    for chunk in chunks:
+        chunk = chunk.rename(columns=lambda col: str(col).strip().lower())
+        if row_filter is not None:
+            chunk = row_filter(chunk)
+        if not chunk.empty:
+            scores.append(project_data(chunk, pca_results, fill_values))
+
+    if not scores:
+        return np.empty((0, len(pca_results['components'])))
+    return np.vstack(scores)
@@ -0,0 +1,173 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Number of rows standardized at a time when fitting
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+class StreamingStandardizer:
+    """
+    Standardizes data using moments accumulated chunk by chunk
+
+    Column counts, means and sums of squared deviations are updated with Welford/Chan
+        updates, so chunks can be fitted one at a time and partial states from parallel
+        workers can be merged. Missing values are ignored while fitting and kept as NaN
+        when transforming, matching sklearn's StandardScaler.
+    """
+
+    def __init__(self):
+        """Creates an unfitted standardizer"""
+        self.feature_names_: Optional[List[str]] = None
+        self.n_samples_seen_: Optional[np.ndarray] = None
+        self.mean_: Optional[np.ndarray] = None
+        self.m2_: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_moments(
+            cls,
+            n_samples: np.ndarray,
+            mean: np.ndarray,
+            m2: np.ndarray,
+            feature_names: Optional[List[str]] = None
+    ) -> "StreamingStandardizer":
+        """
+        Creates a fitted standardizer from already accumulated moments
+
+        Args:
+            n_samples (np.ndarray): The number of values seen in each column
+            mean (np.ndarray): The mean of each column
+            m2 (np.ndarray): The sum of squared deviations from the mean of each column
+            feature_names (List[str]): The names of the columns
+
+        Return:
+            A fitted StreamingStandardizer
+        """
+        scaler = cls()
+        scaler.n_samples_seen_ = np.broadcast_to(np.asarray(n_samples, dtype=np.int64), np.shape(mean)).copy()
+        scaler.mean_ = np.asarray(mean, dtype=np.float64).copy()
+        scaler.m2_ = np.asarray(m2, dtype=np.float64).copy()
+        scaler.feature_names_ = list(feature_names) if feature_names is not None else None
+        return scaler
+
+    @property
+    def var_(self) -> np.ndarray:
+        """The population variance of each column"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.n_samples_seen_ > 0, self.m2_ / self.n_samples_seen_, 0.0)
+
+    @property
+    def scale_(self) -> np.ndarray:
+        """The standard deviation of each column, with constant columns scaled by 1"""
+        scale = np.sqrt(self.var_)
+        scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+        return scale
+
+
+    #### 1. Fitting ####
+
+    def partial_fit(self, chunk: pd.DataFrame) -> "StreamingStandardizer":
+        """
+        Updates the moments with one chunk of rows
+
+        Args:
+            chunk (pd.DataFrame): Numeric data with the same columns as previous chunks
+
+        Return:
+            This standardizer
+        """
+        if self.feature_names_ is None:
+            self.feature_names_ = chunk.columns.tolist()
+        elif chunk.columns.tolist() != self.feature_names_:
+            raise ValueError("Chunk columns do not match the columns the standardizer was fitted on")
+
+        # Computes the moments of the chunk, ignoring missing values
+        values = chunk.to_numpy(dtype=np.float64)
+        observed = ~np.isnan(values)
+        counts = observed.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = np.where(counts > 0, np.nansum(values, axis=0) / counts, 0.0)
+        deviations = np.where(observed, values - means, 0.0)
+        m2 = np.einsum('ij,ij->j', deviations, deviations)
+
+        return self.merge(StreamingStandardizer.from_moments(counts, means, m2, self.feature_names_))
+
+    def merge(self, other: "StreamingStandardizer") -> "StreamingStandardizer":
+        """
+        Merges the moments of another standardizer fitted on different rows into this one
+
+        Args:
+            other (StreamingStandardizer): A standardizer fitted on the same columns
+
+        Return:
+            This standardizer
+        """
+        if other.mean_ is None:
+            return self
+        if self.mean_ is None:
+            self.feature_names_ = other.feature_names_
+            self.n_samples_seen_ = other.n_samples_seen_.copy()
+            self.mean_ = other.mean_.copy()
+            self.m2_ = other.m2_.copy()
+            return self
+        if self.mean_.shape != other.mean_.shape:
+            raise ValueError("Cannot merge standardizers fitted on different columns")
+
+        # Combines the moments with Chan's pairwise update
+        n_a, n_b = self.n_samples_seen_, other.n_samples_seen_
+        n_total = n_a + n_b
+        delta = other.mean_ - self.mean_
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(n_total > 0, n_b / n_total, 0.0)
+            self.mean_ = self.mean_ + delta * weight
+            self.m2_ = self.m2_ + other.m2_ + delta ** 2 * n_a * weight
+        self.n_samples_seen_ = n_total
+        return self
+
+    def fit(self, df: pd.DataFrame, chunk_size: int = DEFAULT_CHUNK_SIZE) -> "StreamingStandardizer":
+        """
+        Fits the standardizer on data one chunk of rows at a time
+
+        Args:
+            df (pd.DataFrame): Numeric data to fit
+            chunk_size (int): The number of rows to process at a time
+
+        Return:
+            This standardizer
+        """
+        self.__init__()
+        for start in range(0, max(len(df), 1), chunk_size):
+            self.partial_fit(df.iloc[start:start + chunk_size])
+        return self
+
+
+    #### 2. Transforming ####
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Standardizes data using the fitted moments
+
+        Float32 data stays float32, all other data is standardized as float64.
+
+        Args:
+            df (pd.DataFrame): Numeric data with the columns the standardizer was fitted on
+
+        Return:
+            (pd.DataFrame): Standardized data
+        """
+        if self.mean_ is None:
+            raise AttributeError("The standardizer must be fitted before transforming data")
+        if df.shape[1] != self.mean_.shape[0]:
+            raise ValueError(f"Expected {self.mean_.shape[0]} columns but got {df.shape[1]}")
+
+        dtype = np.float32 if (df.dtypes == np.float32).all() else np.float64
+        standardized = df.to_numpy(dtype=dtype, copy=True)
+        standardized -= self.mean_.astype(dtype)
+        standardized /= self.scale_.astype(dtype)
+        return pd.DataFrame(standardized, columns=df.columns, index=df.index)
+
+    def fit_transform(self, df: pd.DataFrame, chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+        """Fits the standardizer on data and returns the standardized data"""
+        return self.fit(df, chunk_size).transform(df)
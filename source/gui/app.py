@@ -1,10 +1,10 @@
+import multiprocessing
 import platform
 import tkinter as tk
 from tkinter import VERTICAL, Scrollbar, filedialog, messagebox
 
 from matplotlib import pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 
 import screeninfo
 
@@ -20,6 +20,19 @@ from source.gui.app_state  import AppState
 import source.utils.file_operations as file_ops
 
 
+# Shortest time between hover tooltip updates while the mouse moves over a plot
+HOVER_INTERVAL_MS = 30
+
+# Farthest the mouse can be from a point, in pixels, for the point's tooltip to show
+HOVER_RADIUS_PX = 8
+
+# How much one step of the mouse wheel zooms the PCA Plot and Biplot
+ZOOM_FACTOR = 1.25
+
+# Most points drawn while zooming or panning, and the pause after which every point the view needs is drawn
+INTERACTIVE_MAX_POINTS = 5_000
+SETTLE_MS = 200
+
 class PCAAnalysisApp(tk.Tk):
     """GUI Application for PCA Analysis."""
 
@@ -54,10 +67,20 @@ class PCAAnalysisApp(tk.Tk):
         self.plot_canvas = None
         self.plot_canvas_figure = None
 
+        # The latest mouse motion over the plot and the scheduled tooltip update, used to throttle hovering
+        self.hover_event = None
+        self.hover_job = None
+
+        # The start of a pan of the plot, and the plot as last drawn, which tooltips are drawn over
+        self.pan_start = None
+        self.plot_background = None
+        self.settle_job = None
+
         # Results Section
         self.program_status_lbl = None
         self.program_status_text = None
         self.data_text = None
+        self.data_info_text = ""
         self.pca_text = None
 
         # Save Button
@@ -72,7 +95,7 @@ class PCAAnalysisApp(tk.Tk):
     def create_components(self):
         """Creates the components to be placed onto this tk Frame"""
         # Creates canvas and figure where plots will be displayed
-        self.plot_canvas = FigureCanvasTkAgg(self.app_state.fig, master=self)
+        self.plot_canvas = self.app_state.figure_pool.show(self.app_state.fig, self.create_canvas)
         self.plot_canvas_figure = self.plot_canvas.get_tk_widget()
 
         # Creates a scrollable window 
@@ -194,19 +217,26 @@ class PCAAnalysisApp(tk.Tk):
             main.replace_pca_text(text)
             return app_state.pca_results
 
+        # A blank collinearity threshold keeps every feature
+        threshold = app_state.correlation_threshold.get().strip()
+
         try:
             # Run analysis and store the result
             app_state.pca_results = pca_results =  self.pca_analyzer.analyze(
                 df=app_state.df,
                 n_components=app_state.num_pca_comp.get(),
+                dtype=app_state.precision.get(),
+                correlation_threshold=float(threshold) if threshold else None,
             )
 
             # Update display
             text = main.create_pca_text(pca_results)
             main.replace_pca_text(text)
+            main.refresh_data_text()
 
-            # Update df status variables
+            # Update df status variables, data projected onto the old model no longer applies
             app_state.df_updated.set(False)
+            app_state.projected_scores = None
             return pca_results
 
         except ValueError as e:
@@ -236,14 +266,27 @@ class PCAAnalysisApp(tk.Tk):
 
         self.update_figure()
 
+    def replace_progress_text(self, text):
+        """Replaces the text in the program status text widget during a long task, without redrawing the figure"""
+        self.program_status_text.delete(1.0, tk.END)
+        self.program_status_text.insert(tk.END, text)
+
+        self.update_idletasks()
+
     def replace_data_text(self, text):
-        """Replaces the text in the data text widget"""
+        """Replaces the text in the data text widget, followed by the current memory usage"""
         # Insert the info_text into the GUI widget
+        self.data_info_text = text
         self.data_text.delete(1.0, tk.END)
-        self.data_text.insert(tk.END, text)
+        self.data_text.insert(tk.END, text + "\n" + self.create_memory_text())
 
         self.update_figure()
 
+    def refresh_data_text(self):
+        """Updates the memory usage shown in the data text widget"""
+        self.data_text.delete(1.0, tk.END)
+        self.data_text.insert(tk.END, self.data_info_text + "\n" + self.create_memory_text())
+
     def replace_pca_text(self, text):
         """Replaces the text in the pca text widget"""
         self.pca_text.delete(1.0, tk.END)
@@ -253,34 +296,88 @@ class PCAAnalysisApp(tk.Tk):
     
 
     def update_figure(self):
-        # Destroy old canvas
-        self.app_state.main.plot_canvas_figure.destroy()
+        main = self.app_state.main
         # Adjusts Layout to avoid cutoff
         self.app_state.fig.tight_layout()
 
-        # Create new canvas with updated figure
-        self.app_state.main.plot_canvas = FigureCanvasTkAgg(self.app_state.fig, master=self.app_state.main)
-        self.app_state.main.plot_canvas.draw()
+        # Draws the points of zoomable layers needed for their final view, and places any labels
+        for layer in self.app_state.lod_layers:
+            layer.refresh()
+        if self.app_state.label_layout is not None:
+            self.app_state.label_layout.place()
+
+        # Gets the canvas of the updated figure, created only the first time the figure is shown
+        canvas = self.app_state.figure_pool.show(self.app_state.fig, main.create_canvas)
+        canvas.draw()
+
+        # Swaps the Tkinter widget of the old canvas for the new one in the grid
+        canvas_figure = canvas.get_tk_widget()
+        if canvas_figure is not main.plot_canvas_figure:
+            main.plot_canvas_figure.grid_remove()
+        main.plot_canvas = canvas
+        main.plot_canvas_figure = canvas_figure
+        main.plot_canvas_figure.grid(row=0, column=2, rowspan=3, columnspan=4, padx=10, pady=10, sticky="nw")
+
+    def create_canvas(self, fig):
+        """Creates the Tkinter canvas a figure is drawn on, showing tooltips for hovered points"""
+        canvas = FigureCanvasTkAgg(fig, master=self)
+        canvas.mpl_connect("motion_notify_event", self._on_plot_motion)
+        canvas.mpl_connect("figure_leave_event", self._on_plot_motion)
+        canvas.mpl_connect("scroll_event", self._on_plot_scroll)
+        canvas.mpl_connect("button_press_event", self._on_plot_press)
+        canvas.mpl_connect("button_release_event", self._on_plot_release)
+        canvas.mpl_connect("draw_event", self._on_plot_draw)
+        return canvas
+
+    def clear_selector(self):
+        """Disconnects the lasso or box selector from the current plot"""
+        selector = self.app_state.selector
+        if selector is not None:
+            selector.set_active(False)
+            selector.disconnect_events()
+            self.app_state.selector = None
+
+    def create_blank_fig(self, grid=True):
+        app_state = self.app_state
+        app_state.hover_index = None
+        app_state.lod_layers = []
+        app_state.home_limits = None
+        app_state.label_layout = None
+        self.clear_selector()
+        app_state.fig, app_state.ax = fig, ax = app_state.figure_pool.blank_fig(grid)
+
+        return fig, ax
+
+    def create_grid_fig(self, n_plots, grid=True):
+        """
+        Creates a blank figure with a grid of small plots
 
-        # Get the Tkinter widget and add it to the grid
-        self.app_state.main.plot_canvas_figure = self.app_state.main.plot_canvas.get_tk_widget()
-        self.app_state.main.plot_canvas_figure.grid(row=0, column=2, rowspan=3, columnspan=4, padx=10, pady=10, sticky="nw")
+        Args:
+            n_plots: The number of plots in the grid
+            grid: Whether each plot shows grid lines
 
-    def create_blank_fig(self, grid=True, subplot_shape=111):
+        Returns:
+            The figure and a list of its n_plots axes in reading order
+        """
         app_state = self.app_state
-        app_state.fig = fig = Figure(self.app_state.fig_size)
-        app_state.ax = ax = fig.add_subplot(subplot_shape)
-        ax.grid(grid)
+        app_state.hover_index = None
+        app_state.lod_layers = []
+        app_state.home_limits = None
+        app_state.label_layout = None
+        self.clear_selector()
+        app_state.fig, axes = fig, axes = app_state.figure_pool.grid_fig(n_plots, grid)
+        app_state.ax = axes[0]
 
-        return fig, ax
+        return fig, axes
 
 
     #### 5. EVENT HANDLERS ####
 
     def on_close(self):
-        if self.plot_canvas:
-            self.plot_canvas.get_tk_widget().destroy()
+        for canvas in self.app_state.figure_pool.canvases.values():
+            canvas.get_tk_widget().destroy()
         plt.close('all')
+        self.app_state.memory.close()
         self.destroy()
 
     def _bind_mousewheel(self):
@@ -303,6 +400,154 @@ class PCAAnalysisApp(tk.Tk):
         else:  # Windows/macOS
             self.options_canvas.yview_scroll(-1 * (event.delta // 120), "units")
 
+    def _on_plot_motion(self, event):
+        """Keeps the latest mouse motion over the plot and schedules a tooltip update if none is waiting"""
+        self.hover_event = event
+        if self.hover_job is None:
+            self.hover_job = self.after(HOVER_INTERVAL_MS, self.update_hover)
+
+    def update_hover(self):
+        """
+        Shows the tooltip of the point nearest to the latest mouse position, or hides it if no point is near
+
+        Pans the plot instead while the right mouse button is held. Tooltips are drawn over the
+            plot as it was last drawn, without drawing the plot again.
+        """
+        self.hover_job = None
+        event = self.hover_event
+        if self.pan_start is not None:
+            if event is not None and event.name == "motion_notify_event":
+                self.pan_view(event)
+            return
+        index = self.app_state.hover_index
+        if index is None:
+            return
+
+        # Finds the nearest point when the mouse is over the indexed plot
+        point = None
+        if event is not None and event.name == "motion_notify_event" and event.inaxes is index.ax:
+            point = index.nearest(event.x, event.y, HOVER_RADIUS_PX)
+        if point == index.shown:
+            return
+        index.shown = point
+
+        # Creates the tooltip the first time a point of the plot is hovered
+        if index.tooltip is None:
+            index.tooltip = index.ax.annotate(
+                "", xy=(0, 0), xytext=(12, 12), textcoords="offset points",
+                bbox=dict(boxstyle="round", fc="white", alpha=0.9),
+                arrowprops=dict(arrowstyle="->"), fontsize=8, zorder=10, visible=False, animated=True
+            )
+        if point is not None:
+            index.tooltip.xy = index.points[point]
+            index.tooltip.set_text(index.describe(point))
+        index.tooltip.set_visible(point is not None)
+
+        # Draws the tooltip over the last drawing of the plot
+        canvas = index.ax.figure.canvas
+        if self.plot_background is None or self.plot_background[0] is not canvas:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self.plot_background[1])
+        if point is not None:
+            index.ax.draw_artist(index.tooltip)
+        canvas.blit(index.ax.figure.bbox)
+
+    def _on_plot_draw(self, event):
+        """Keeps the plot as drawn, so tooltips can be drawn over it, and draws any shown tooltip"""
+        canvas = event.canvas
+        self.plot_background = (canvas, canvas.copy_from_bbox(canvas.figure.bbox))
+        index = self.app_state.hover_index
+        if index is not None and index.tooltip is not None and index.tooltip.get_visible() and index.ax.figure is canvas.figure:
+            index.ax.draw_artist(index.tooltip)
+
+    def get_view_axes(self, event):
+        """Returns the axes of the plot's zoomable layers if the mouse is over them, otherwise None"""
+        layers = self.app_state.lod_layers
+        if layers and event.inaxes is not None and event.inaxes is layers[0].collection.axes:
+            return event.inaxes
+        return None
+
+    def _on_plot_scroll(self, event):
+        """Zooms the plot in or out around the mouse"""
+        ax = self.get_view_axes(event)
+        if ax is None:
+            return
+        self.save_home_view(ax)
+        scale = ZOOM_FACTOR ** -event.step
+        ax.set_xlim([event.xdata + (limit - event.xdata) * scale for limit in ax.get_xlim()])
+        ax.set_ylim([event.ydata + (limit - event.ydata) * scale for limit in ax.get_ylim()])
+        self.refresh_view()
+
+    def _on_plot_press(self, event):
+        """Starts panning the plot with the right mouse button, double clicking returns to the first view"""
+        ax = self.get_view_axes(event)
+        if ax is None:
+            return
+        if event.button == 3:
+            self.save_home_view(ax)
+            self.pan_start = (ax, event.x, event.y, ax.get_xlim(), ax.get_ylim(), ax.transData.inverted().frozen())
+        elif event.button == 1 and event.dblclick and self.app_state.home_limits is not None:
+            ax.set_xlim(self.app_state.home_limits[0])
+            ax.set_ylim(self.app_state.home_limits[1])
+            self.refresh_view(interactive=False)
+
+    def _on_plot_release(self, event):
+        """Stops panning the plot"""
+        if event.button == 3:
+            self.pan_start = None
+
+    def pan_view(self, event):
+        """Moves the plot's view with the mouse since the pan started"""
+        ax, x, y, xlim, ylim, inverse = self.pan_start
+        dx, dy = inverse.transform((event.x, event.y)) - inverse.transform((x, y))
+        ax.set_xlim(xlim[0] - dx, xlim[1] - dx)
+        ax.set_ylim(ylim[0] - dy, ylim[1] - dy)
+        self.refresh_view()
+
+    def save_home_view(self, ax):
+        """Keeps the view of the plot before its first zoom or pan"""
+        if self.app_state.home_limits is None:
+            self.app_state.home_limits = (ax.get_xlim(), ax.get_ylim())
+
+    def refresh_view(self, interactive=True):
+        """
+        Draws the plot again after its view changed, with the points and labels the new view needs
+
+        Every layer of the plot moves with the view, so the whole plot is drawn again. While the
+            view is zoomed or panned, a coarse sample of the points is drawn to keep each step
+            fast, and every point the view needs is drawn once the view stops changing.
+
+        Args:
+            interactive: True while the view is being zoomed or panned
+        """
+        if self.settle_job is not None:
+            self.after_cancel(self.settle_job)
+            self.settle_job = None
+        if interactive:
+            self.settle_job = self.after(SETTLE_MS, self.settle_view)
+
+        max_points = INTERACTIVE_MAX_POINTS if interactive else None
+        for layer in self.app_state.lod_layers:
+            layer.refresh(max_points, coarse=interactive)
+        if self.app_state.label_layout is not None:
+            self.app_state.label_layout.place()
+
+        # Hides the tooltip, its point may have moved out of view
+        index = self.app_state.hover_index
+        if index is not None and index.tooltip is not None:
+            index.tooltip.set_visible(False)
+            index.shown = None
+        self.app_state.fig.canvas.draw_idle()
+
+    def settle_view(self):
+        """Draws every point the view needs once it stops changing, waiting longer while a pan is held"""
+        self.settle_job = None
+        if self.pan_start is not None:
+            self.settle_job = self.after(SETTLE_MS, self.settle_view)
+            return
+        self.refresh_view(interactive=False)
+
 
     #### Text Generation ####
     def create_pca_text(self, pca_results):
@@ -321,6 +566,9 @@ class PCAAnalysisApp(tk.Tk):
             # Data in PCA space
             text += "Data after Analysis\n"
             text += f"PCA Components: {len(pca_results['components'])}\n"
+            if pca_results.get('solver') == "em":
+                status = "Converged" if pca_results['converged'] else "Stopped before converging"
+                text += f"Missing Values Fitted by EM PCA: {status} after {pca_results['n_iter']} iterations\n"
 
             # Explained Variance Section
             text_cols = [f"PC{i + 1}: {var:.3f}" for i, var in enumerate(pca_results['explained_variance'])]
@@ -331,6 +579,12 @@ class PCAAnalysisApp(tk.Tk):
             text_cols = [f"PC{i + 1}: {cum_var:.3f}" for i, cum_var in enumerate(cumulative_variance)]
             text += self.format_col_text(text_cols, "Cumulative Variance:\t", sep=",\t")
 
+            # Collinear Features Section
+            pruned = pca_results.get('pruned_features')
+            if pruned:
+                text_cols = [f"{', '.join(cols)} (kept {kept})" for kept, cols in pruned.items()]
+                text += self.format_col_text(text_cols, "Collinear Features Pruned:\t", sep=";\t")
+
             # Seperator
             text += "═══════════════════════════════════════\n\n"
 
@@ -344,6 +598,24 @@ class PCAAnalysisApp(tk.Tk):
         except Exception:
             return "PCA TEXT CREATION FAILED"
     
+    def create_memory_text(self):
+        memory = self.app_state.memory
+        text = "Memory Usage\n"
+        text += "═══════════════════════════════════════\n"
+        for name, usage in memory.usage().items():
+            text += f"{name}:\t{usage['bytes'] / 2 ** 20:.1f} MB in memory"
+            if usage['state'] == "spilled":
+                text += f", {usage['spilled_bytes'] / 2 ** 20:.1f} MB spilled to disk"
+            elif usage['state'] == "evicted":
+                text += ", evicted until next use"
+            text += "\n"
+        text += f"Total:\t{memory.total_bytes() / 2 ** 20:.1f} MB of {memory.budget_bytes / 2 ** 20:.0f} MB budget\n"
+
+        # Plots are drawn on a fixed set of reused figures, pyplot figures left open are leaks
+        figures = self.app_state.figure_pool.stats()
+        text += f"Figures:\t{figures['figures']} reused for {figures['acquired']} plots, {figures['leaked']} leaked\n"
+        return text
+
     def format_col_text(self, cols, start_text="", line_limit=80, sep=", "):
         if cols is None or len(cols) == 0:
             return start_text + "None\n"
@@ -372,6 +644,8 @@ TOPBAR_HEIGHT = 50
 
 # Start App
 if __name__ == "__main__":   
+        # Stops worker processes of the frozen app from starting the GUI again
+        multiprocessing.freeze_support()
         app = PCAAnalysisApp()
 
         os_type = platform.system()
@@ -1,9 +1,13 @@
 import platform
 import tkinter as tk
 
-from matplotlib.figure import Figure
+import pandas as pd
 
 
+from source.utils.dataset_store import DatasetStore
+from source.utils.figure_pool import FigurePool
+from source.utils.memory_budget import DEFAULT_MEMORY_BUDGET_MB, MemoryBudget
+
 
 
 class AppState:
@@ -14,20 +18,40 @@ class AppState:
         # Selects application color palette
         self.selected_palette = tk.StringVar(value="Default")
 
+        # Tracks the memory held by the data frames and PCA results below
+        self.memory_budget_mb = tk.IntVar(main, value=DEFAULT_MEMORY_BUDGET_MB)
+        self.memory = MemoryBudget(self.memory_budget_mb.get() * 2 ** 20)
+
         # PCA Results
         self.pca_results = None
 
+        # Scores of new data projected onto the current PCA model
+        self.projected_scores = None
+
+        # Results of the last parallel analysis, with the data version and features it was run on
+        self.parallel_results = None
+
+        # Bootstrap loading intervals, with the components they were computed for
+        self.bootstrap_results = None
+
+        # Name and group lookups of the PCA features, with the feature group mapping they were built from
+        self.feature_registry = None
+
+        # PCA results of each group of the split column, with the settings they were computed for
+        self.group_pca_results = None
+
         # Output directory for saved files
         self.output_dir = "KUpca_plots_output"
 
-        # Variables for tracking the data frame with the data file
-        self.original_df = None
-        self.df = None
+        # Variables for tracking the data frame with the data file and its cleaning history
+        self.dataset: DatasetStore = None
         self.df_cleaned = tk.BooleanVar(main, value=False)
         self.df_updated = tk.BooleanVar(main, value=False)
 
         # Variabes to track user inputs for data cleaning
         self.missing_choice = tk.StringVar(main, value="impute_mean")
+        self.impute_group = tk.StringVar(main, value="")
+        self.drop_degenerate = tk.BooleanVar(main, value=False)
         self.bbch_choice = tk.IntVar(main, value=-1)
         self.custom_filter_target = tk.StringVar(main, value="")
         self.custom_filter_type = tk.StringVar(main, value="")
@@ -42,15 +66,67 @@ class AppState:
         self.num_feat = tk.IntVar(main, value=10)
         self.focused_pca_num = tk.IntVar(main, value=1)
         self.heatmap_feat = tk.StringVar(main, "")
+        self.heatmap_cluster = tk.BooleanVar(main, value=False)
+        self.biplot_labels = tk.BooleanVar(main, value=True)
+
+        # Floating point precision used for cleaned data and PCA, "float64" or "float32"
+        self.precision = tk.StringVar(main, value="float64")
+
+        # Absolute correlation at which features are pruned as collinear before PCA, blank to keep all
+        self.correlation_threshold = tk.StringVar(main, value="")
+
+        # Column whose values split the data into groups that are each fit with their own PCA
+        self.split_column = tk.StringVar(main, value="")
         
         # Variables for tracking feature mapping
         self.feat_group_enabled = tk.BooleanVar(main, value=False)
         self.feat_group_map = {}
 
-        # Variables for the current figure being displayed
+        # Variables for the current figure being displayed, drawn on figures reused from the pool
         self.fig_size = (10, 5)
-        self.fig = Figure(self.fig_size)
-        self.ax = self.fig.add_subplot(111)
-        self.ax.grid(True)
+        self.figure_pool = FigurePool(self.fig_size)
+        self.fig, self.ax = self.figure_pool.blank_fig()
 
-        
+        # Index of the points on the current plot used for hover tooltips and selection, None if the plot has none
+        self.hover_index = None
+
+        # Scatter layers of the current plot drawn at the detail of the view, and the view before any zooming or panning
+        self.lod_layers = []
+        self.home_limits = None
+
+        # Feature name labels of the current biplot, placed again whenever the view changes
+        self.label_layout = None
+
+        # The lasso or box selector on the current plot, and the rows last selected with the data version they are from
+        self.selector = None
+        self.selection = None
+
+    # The loaded data and its current version are held by the dataset store
+    @property
+    def original_df(self):
+        return self.dataset.original if self.dataset is not None else None
+
+    @property
+    def df(self):
+        return self.dataset.data if self.dataset is not None else None
+
+    # Cleaning rules used on the current data, reused when projecting new data
+    @property
+    def row_filter(self):
+        return self.dataset.current.row_filter if self.dataset is not None else None
+
+    @property
+    def fill_values(self):
+        if self.dataset is None or not self.dataset.current.fill_values:
+            return None
+        return pd.Series(self.dataset.current.fill_values, dtype=float)
+
+    # Cached artifacts are stored in the memory budget, which may spill them to disk
+
+    @property
+    def pca_results(self):
+        return self.memory.get("PCA Results")
+
+    @pca_results.setter
+    def pca_results(self, value):
+        self.memory.put("PCA Results", value)
@@ -1,28 +1,40 @@
 import tkinter as tk
 from tkinter import messagebox
 import numpy as np
-import pandas as pd
 
 from sklearn.impute import SimpleImputer
 
+from source.analysis.cleaning import FILTER_TYPES, filter_rows, optimize_dtypes
+from source.analysis.data_profile import MISSING_LIMIT_PCT, degenerate_columns, profile_data
+from source.analysis.imputation import group_impute, iterative_impute, knn_impute
+from source.analysis.projection import project_chunks
 from source.gui.clean_widgets.filter_selector import FilterSelector
 from source.gui.clean_widgets.missing_selector import MissingSelector
 from source.gui.app_state  import AppState
+from source.utils.dataset_store import DatasetStore
 import source.utils.file_operations as file_ops
 
 from source.utils.constant import *
 
 
+# Columns listed for each data quality issue, the full table can be exported
+PROFILE_TOP_COLUMNS = 10
+
+
 class CleanDataBox(tk.Frame):
     """
     A GUI box for loading data, selecting cleaning options, and cleaning data
 
     A banner indicating the usage of this container
     A text prompt and button allowing for users to load a .csv file
+    A text prompt and button allowing for users to project a .csv file onto the current PCA model
     Two columns, The left column containg another GUI box for selecting how to Handle Missing inputs
                  The right column gontaining another GUI box for selecting what BBCH stage filter to use
     An optional entry box for droping columns from the loaded data
+    A checkbox for droping constant, mostly empty, and duplicate columns
     A button for cleaning the CSV
+    Buttons for undoing and redoing cleaning steps
+    A button for exporting the data quality profile of every column
     """
 
     #### 0. Setup GUI Elements ####
@@ -49,6 +61,10 @@ class CleanDataBox(tk.Frame):
         self.load_label = None
         self.load_bttn = None
 
+        # Declare projection components
+        self.project_label = None
+        self.project_bttn = None
+
         # Declare selector components for user input
         self.missing_selector = None
         self.filter_selector = None
@@ -56,10 +72,19 @@ class CleanDataBox(tk.Frame):
         # Declare widgets for selecting columns to drop
         self.drop_label = None
         self.drop_entry = None
+        self.drop_degenerate_check = None
 
         # Declare button for cleaning user data
         self.clean_bttn = None
 
+        # Declare buttons for undoing and redoing cleaning
+        self.undo_bttn = None
+        self.redo_bttn = None
+        self.keep_selected_bttn = None
+
+        # Declare button for exporting the data quality profile
+        self.export_profile_bttn = None
+
         # Creates components and sets them within the GUI
         self.create_components()
         self.setup_layout()
@@ -72,6 +97,10 @@ class CleanDataBox(tk.Frame):
         # Creates loading components
         self.load_label =  tk.Label(self, text="Load CSV File:", **LABEL_STYLE)
         self.load_bttn = tk.Button(self, text="Browse", **BUTTON_STYLE, command=lambda: self.load_data(self.app_state))
+
+        # Creates projection components
+        self.project_label = tk.Label(self, text="Project CSV onto PCA:", **LABEL_STYLE)
+        self.project_bttn = tk.Button(self, text="Browse", **BUTTON_STYLE, command=lambda: self.project_data(self.app_state))
         
         # Creates selector components for user input       
         self.missing_selector = MissingSelector(self, self.app_state, bg="#f0f0f0")
@@ -80,9 +109,25 @@ class CleanDataBox(tk.Frame):
         # Creates widgets for selecting columns to drop
         self.drop_label = tk.Label(self, text="Columns to Drop (comma-separated):", **LABEL_STYLE)
         self.drop_entry = tk.Text(self, height=4, **BIG_ENTRY_STYLE)
+        self.drop_degenerate_check = tk.Checkbutton(
+            self,
+            text="Drop Constant, Mostly Empty, and Duplicate Columns",
+            variable=self.app_state.drop_degenerate,
+            **LABEL_STYLE,
+        )
 
         # Creates button for cleaning user data
         self.clean_bttn = tk.Button(self, text="Clean CSV", **BUTTON_STYLE, command=lambda: self.clean_data(self.app_state))
+
+        # Creates buttons for undoing and redoing cleaning
+        self.undo_bttn = tk.Button(self, text="Undo Cleaning", **BUTTON_STYLE, command=lambda: self.undo_clean(self.app_state))
+        self.redo_bttn = tk.Button(self, text="Redo Cleaning", **BUTTON_STYLE, command=lambda: self.redo_clean(self.app_state))
+
+        # Creates button for keeping only the rows selected on the plot
+        self.keep_selected_bttn = tk.Button(self, text="Keep Selected Rows", **BUTTON_STYLE, command=lambda: self.keep_selected_rows(self.app_state))
+
+        # Creates button for exporting the data quality profile
+        self.export_profile_bttn = tk.Button(self, text="Export Profile", **BUTTON_STYLE, command=lambda: self.export_profile(self.app_state))
  
     def setup_layout(self):
         """Sets the components onto this tk Frame"""
@@ -97,16 +142,31 @@ class CleanDataBox(tk.Frame):
         self.load_label.grid(row=1, column=0, padx=5, pady=5)
         self.load_bttn.grid(row=1, column=1, padx=5, pady=5)
 
+        # Places projection components below the loading components
+        self.project_label.grid(row=2, column=0, padx=5, pady=5)
+        self.project_bttn.grid(row=2, column=1, padx=5, pady=5)
+
         # Places selector components next to each other
-        self.missing_selector.grid(row=2, column=0, padx=5, pady=5, sticky="nswe")
-        self.filter_selector.grid(row=2, column=1, padx=5, pady=5, sticky="nswe")
+        self.missing_selector.grid(row=3, column=0, padx=5, pady=5, sticky="nswe")
+        self.filter_selector.grid(row=3, column=1, padx=5, pady=5, sticky="nswe")
 
         # Places column dropping widgets
-        self.drop_label.grid(row=3, column=0, columnspan=2, padx=5, pady=5, sticky="nswe")
-        self.drop_entry.grid(row=4, column=0, columnspan=2, padx=5, pady=5, sticky="nswe")
+        self.drop_label.grid(row=4, column=0, columnspan=2, padx=5, pady=5, sticky="nswe")
+        self.drop_entry.grid(row=5, column=0, columnspan=2, padx=5, pady=5, sticky="nswe")
+        self.drop_degenerate_check.grid(row=6, column=0, columnspan=2, padx=5, pady=5, sticky="w")
 
         # Places data cleaning button
-        self.clean_bttn.grid(row=5, column=0, columnspan=2, padx=5, pady=5)
+        self.clean_bttn.grid(row=7, column=0, columnspan=2, padx=5, pady=5)
+
+        # Places undo and redo buttons below the cleaning button
+        self.undo_bttn.grid(row=8, column=0, padx=5, pady=5)
+        self.redo_bttn.grid(row=8, column=1, padx=5, pady=5)
+
+        # Places button for keeping selected rows below the undo and redo buttons
+        self.keep_selected_bttn.grid(row=9, column=0, columnspan=2, padx=5, pady=5)
+
+        # Places button for exporting the data quality profile below the selection button
+        self.export_profile_bttn.grid(row=10, column=0, columnspan=2, padx=5, pady=5)
 
 
     #### 1. Data Handling ####
@@ -127,8 +187,15 @@ class CleanDataBox(tk.Frame):
             else:
                 self.app_state.main.replace_status_text("Data File Not Selected: Please Load Data")
             return
-        app_state.df = df
-        app_state.original_df = df.copy()
+        # Stores each column in its most compact type, measuring the memory saved
+        loaded_bytes = df.memory_usage(deep=True).sum()
+        df = optimize_dtypes(df)
+        compact_bytes = df.memory_usage(deep=True).sum()
+
+        # Profiles the data once, the profile is kept with the dataset for cleaning
+        profile = profile_data(df)
+        app_state.dataset = DatasetStore(df, app_state.memory, profile=profile)
+        app_state.projected_scores = None
 
         # Updates df status variables
         app_state.df_updated.set(True)
@@ -139,7 +206,7 @@ class CleanDataBox(tk.Frame):
         main.create_blank_fig()    
 
         # Updates the GUI and shows sucess message
-        main.replace_data_text(self.create_load_data_str(df))
+        main.replace_data_text(self.create_load_data_str(df, profile, loaded_bytes, compact_bytes))
         main.replace_status_text("Data Succsessfully Loaded!")
 
 
@@ -147,7 +214,8 @@ class CleanDataBox(tk.Frame):
         """
         Cleans the data based on the user selections in preperation for PCA Analysis
         
-        Converts all int64 columns to float columns
+        The cleaning is recorded as a new version of the dataset, so it can be undone
+        Converts all numeric columns to float columns of the selected precision
         Standardizes the column names by stripping whitespace and setting text to lower case
         Filters the data by the selected bbch
         Verifies and drops the user selected columns. Shows an error if columns are missing
@@ -160,14 +228,17 @@ class CleanDataBox(tk.Frame):
             messagebox.showerror("Error", "Data must be loaded before it can be cleaned!")
             return  
         
-        df = app_state.df
+        # Works on a shallow copy so the current version is unchanged until the step is recorded
+        df = app_state.df.copy(deep=False)
 
-        # Convert int64 to float for PCA compatibility
-        int_cols = df.select_dtypes(include='int64').columns
-        df[int_cols] = df[int_cols].astype(float)
+        # Convert numeric columns to the selected float precision for PCA compatibility
+        precision = app_state.precision.get()
+        num_cols = df.select_dtypes(include=[np.number]).columns
+        df[num_cols] = df[num_cols].astype(precision)
 
         # Standardize column names
-        df.columns = df.columns.str.strip().str.lower() 
+        rename = lambda col: str(col).strip().lower()
+        df.columns = [rename(col) for col in df.columns]
 
         # Get filter values
         filter_name = self.app_state.custom_filter_target.get().lower().strip()
@@ -177,30 +248,34 @@ class CleanDataBox(tk.Frame):
         upper_value = float(self.app_state.custom_filter_upper.get())
 
         # Filter based on the filter selection
-        filters = ["None", "Equal to", "Less than", "Greater than", "Between", "Outside"]
-        if filter_type != filters[0]:
+        row_filter = None
+        if filter_type != FILTER_TYPES[0]:
             if filter_name not in df.columns:
                 messagebox.showerror("Column Label Error", f"The selected column, {filter_name}, was not found in the data.\nSkipping filtering!")
             elif filter_name == "":
                 messagebox.showerror("Select a Column", "No Column was selected for filtering")
                 return  
+            elif filter_type == FILTER_TYPES[1] and len(exact_value) == 0:
+                messagebox.showerror("No Values Selected", "Filtering by Values 'Equal to' was selected, but no value were entered")
+                return
+            elif filter_type not in FILTER_TYPES:
+                messagebox.showerror("Application Error", "An internal program error has occurred getting filter type")
             else:
-                if filter_type == filters[1]:
-                    if len(exact_value) == 0:
-                        messagebox.showerror("No Values Selected", "Filtering by Values 'Equal to' was selected, but no value were entered")
-                        return
-                    exact_value_floats = [float(val) for val in exact_value]
-                    df = df[df[filter_name].apply(lambda x: any(np.isclose(x, v, atol=0.001) for v in exact_value_floats))]
-                elif filter_type == filters[2]:
-                    df = df[df[filter_name] < upper_value]
-                elif filter_type == filters[3]:
-                    df = df[df[filter_name] > lower_value]
-                elif filter_type == filters[4]:
-                    df = df[(df[filter_name] > lower_value) & (df[filter_name] < upper_value)]
-                elif filter_type == filters[5]:
-                    df = df[(df[filter_name] < lower_value) | (df[filter_name] > upper_value)]
-                else:
-                    messagebox.showerror("Application Error", "An internal program error has occurred getting filter type")
+                # Keeps the filter so projected data can be filtered the same way
+                exact_value_floats = [float(val) for val in exact_value]
+                row_filter = lambda data: filter_rows(
+                    data, filter_name, filter_type, exact_value_floats, lower_value, upper_value
+                )
+                df = row_filter(df)
+
+        # Keeps the keys of the grouping column before non-numeric columns are dropped
+        group_name = self.app_state.impute_group.get().strip().lower()
+        group_keys = None
+        if group_name != "":
+            if group_name in df.columns:
+                group_keys = df[group_name]
+            else:
+                messagebox.showerror("Column Label Error", f"The grouping column, {group_name}, was not found in the data.\nImputing without groups!")
         
         # Drop user-specified columns
         missing_user_drop_cols =  [col.strip().lower() for col in self.drop_entry.get('1.0', 'end-1c').split(",") if col.strip()]
@@ -210,12 +285,19 @@ class CleanDataBox(tk.Frame):
         missing_user_drop_cols = set(missing_user_drop_cols) - set(user_drop_cols)
         
         # Drops the columns from the dataset
-        df.drop(columns=user_drop_cols, inplace=True)
+        df = df.drop(columns=user_drop_cols)
+
+        # Drops degenerate columns found by the profile made when the data was loaded
+        degenerate_cols = []
+        if app_state.drop_degenerate.get():
+            degenerate_cols = [rename(col) for col in degenerate_columns(app_state.dataset.profile)]
+            degenerate_cols = [col for col in degenerate_cols if col in df.columns]
+            df = df.drop(columns=degenerate_cols)
 
         # Drop non-numeric columns and columns with no values
-        non_num_cols = df.select_dtypes(exclude=[float]).columns
-        df.drop(columns=non_num_cols, inplace=True)
-        df.dropna(axis=1, how='all', inplace=True)
+        non_num_cols = df.select_dtypes(exclude=[np.floating]).columns
+        df = df.drop(columns=non_num_cols)
+        df = df.dropna(axis=1, how='all')
 
         # Determine how to filter/interpolate data
         missing_choice = self.app_state.missing_choice.get()
@@ -225,16 +307,40 @@ class CleanDataBox(tk.Frame):
             imputer = SimpleImputer(strategy='median')
         elif missing_choice == "replace_nan":
                 imputer = SimpleImputer(strategy='constant', fill_value=0)
+        else:
+            # KNN, iterative and EM PCA imputation fill new data with the column mean
+            imputer = SimpleImputer(strategy='mean')
 
             # Impute missing values
         
-        # Filter/Interpolate data
-        if df.isnull().any().any():
-            x_imputed = imputer.fit_transform(df)
-            df = pd.DataFrame(x_imputed, columns=df.columns)
+        # Finds the fill values, which are also used for projecting new data
+        imputer.fit(df)
+        fill_values = dict(zip(df.columns, imputer.statistics_.tolist()))
+
+        # Missing values are left for the EM PCA solver to fit
+        # KNN, iterative and group-wise imputation fill each missing value separately
+        fills = fill_values if missing_choice != "pca_em" else {}
+        group_choice = group_keys is not None and missing_choice in ("impute_mean", "impute_median")
+        if (group_choice or missing_choice in ("impute_knn", "impute_iterative")) and df.isnull().any().any():
+            fills = self.impute_cells(df, missing_choice, group_keys if group_choice else None)
+            if fills is None:
+                return
+
+        # Records the cleaning as a new version, which fills in the missing data
+        app_state.dataset.derive(
+            "Cleaned Data",
+            names=df.columns.tolist(),
+            rows=df.index.to_numpy() if row_filter is not None else None,
+            rename=rename,
+            dtype=precision,
+            fills=fills,
+            fill_values=fill_values,
+            row_filter=row_filter,
+        )
+        df = app_state.df
         
         # Update varibales tracking df status
-        app_state.df = df
+        app_state.projected_scores = None
         app_state.df_updated.set(True)
         app_state.df_cleaned.set(True)
 
@@ -244,7 +350,7 @@ class CleanDataBox(tk.Frame):
         main.create_blank_fig()
 
         # Updates the GUI and shows sucess message
-        text = self.create_clean_data_str(df, user_drop_cols, missing_user_drop_cols, non_num_cols)
+        text = self.create_clean_data_str(df, user_drop_cols, missing_user_drop_cols, non_num_cols, degenerate_cols)
         main.replace_data_text(text)
         if len(missing_user_drop_cols) == 0:
             main.replace_status_text("Data Succsessfully Cleaned!")
@@ -252,22 +358,218 @@ class CleanDataBox(tk.Frame):
             main.replace_status_text("Data Partially Cleaned! Check data section")
         
 
+    def impute_cells(self, df, missing_choice, group_keys=None):
+        """
+        Imputes each missing value with KNN, iterative or group-wise imputation
+
+        KNN and iterative imputation show their progress in the status text
+
+        Args:
+            df: The numeric data to impute
+            missing_choice: One of "impute_knn", "impute_iterative", "impute_mean" or "impute_median"
+            group_keys: The group of each row, used with "impute_mean" and "impute_median"
+
+        Returns:
+            A dictionary of the imputed values of each column with missing data, indexed by row.
+            None if the data could not be imputed
+        """
+        main = self.app_state.main
+        names = {"impute_knn": "KNN", "impute_iterative": "Iterative"}
+        name = names.get(missing_choice, "Group")
+        progress = lambda fraction: main.replace_progress_text(f"{name} Imputation: {fraction:.0%} Complete")
+
+        try:
+            if missing_choice == "impute_knn":
+                filled = knn_impute(df, progress=progress)
+            elif missing_choice == "impute_iterative":
+                filled = iterative_impute(df, progress=progress)
+            else:
+                strategy = "mean" if missing_choice == "impute_mean" else "median"
+                filled = group_impute(df, group_keys, strategy)
+        except ValueError as e:
+            messagebox.showerror("Imputation Error", str(e))
+            main.replace_status_text(f"{name} Imputation Failed: Data Not Cleaned")
+            return None
+
+        missing = df.isna()
+        return {col: filled.loc[missing[col], col] for col in df.columns[missing.any()]}
+
+    def undo_clean(self, app_state: AppState):
+        """
+        Returns the data to the version before the last cleaning step
+
+        No data is copied or reloaded, the previous version is rebuilt from the loaded data
+        """
+        if app_state.dataset is None or not app_state.dataset.can_undo():
+            app_state.main.replace_status_text("Nothing to Undo")
+            return
+        app_state.dataset.undo()
+        self.change_version(app_state, "Undid")
+
+    def redo_clean(self, app_state: AppState):
+        """Reapplies the last undone cleaning step"""
+        if app_state.dataset is None or not app_state.dataset.can_redo():
+            app_state.main.replace_status_text("Nothing to Redo")
+            return
+        app_state.dataset.redo()
+        self.change_version(app_state, "Redid")
+
+    def keep_selected_rows(self, app_state: AppState):
+        """
+        Keeps only the rows selected on the PCA Plot or Biplot as a new version of the data
+
+        The selected rows are already known by position, so no data is scanned to find them.
+            The step can be undone like a cleaning step.
+        """
+        selection = app_state.selection
+        if selection is None or len(selection['positions']) == 0:
+            messagebox.showerror("Error", "Select points with the Lasso or Box Select buttons first!")
+            return
+        if selection['version'] is not app_state.dataset.current:
+            messagebox.showerror("Error", "The data changed since the points were selected, select them again!")
+            return
+
+        # Records the selection as a new version with the same columns
+        current = app_state.dataset.current
+        app_state.dataset.derive(
+            f"{len(selection['positions'])} Selected Rows",
+            names=list(current.names),
+            rows=selection['positions'],
+            cleaned=current.cleaned,
+        )
+        app_state.selection = None
+        self.change_version(app_state, "Applied")
+
+    def export_profile(self, app_state: AppState):
+        """Saves the data quality statistics of every numeric column of the loaded data to a csv file"""
+        if app_state.dataset is None or app_state.dataset.profile is None:
+            messagebox.showerror("Error", "Data must be loaded first!")
+            return
+
+        profile = app_state.dataset.profile.rename_axis("column").reset_index()
+        if file_ops.save_data_csv(profile, app_state.output_dir, file_prefix="Data_Profile") is not None:
+            app_state.main.replace_status_text(f"Profile of {len(profile)} Columns Exported")
+
+    def change_version(self, app_state: AppState, action: str):
+        """Updates status variables and the GUI after the current dataset version changes"""
+        version = app_state.dataset.current
+        app_state.projected_scores = None
+        app_state.df_updated.set(True)
+        app_state.df_cleaned.set(version.cleaned)
+
+        main = app_state.main
+        # Generate new blank figure
+        main.create_blank_fig()
+
+        # Updates the GUI and shows sucess message
+        main.replace_data_text(self.create_version_str(app_state.df, version.description))
+        main.replace_status_text(f"{action} Cleaning Step: Showing {version.description}")
+
+    def project_data(self, app_state: AppState):
+        """
+        Asks user to select a .csv data file and projects it onto the current PCA model
+
+        Streams the selected file in chunks, aligning its columns with the cleaned data and
+        applying the row filter and missing value fills used when the data was cleaned.
+        The projected scores are overlaid on the PCA plot without refitting the model.
+        """
+        # Validates that there is a PCA model to project onto
+        if not app_state.df_cleaned.get():
+            messagebox.showerror("Error", "Data must be cleaned before new data can be projected!")
+            return
+
+        # Ensures the PCA model is up to date before projecting onto it
+        main = app_state.main
+        pca_results = main.run_analysis(app_state)
+        if pca_results is None:
+            return
+
+        # Opens the file to project
+        reader = file_ops.load_csv_chunks()
+        if reader is None:
+            main.replace_status_text("Data File Not Selected: Nothing Projected")
+            return
+
+        # Projects the file one chunk at a time
+        try:
+            with reader:
+                scores = project_chunks(reader, pca_results, app_state.fill_values, app_state.row_filter)
+        except (ValueError, KeyError) as e:
+            messagebox.showerror("Projection Error", f"The selected data could not be projected: {e}")
+            return
+
+        # Overlays the projected data on the PCA plot
+        app_state.projected_scores = scores
+        main.plot_box.visualize_pca()
+        main.replace_status_text(f"{len(scores)} Rows Projected onto the PCA Plot")
+
+
     #### 2. Generate Information Strings ####
-    def create_load_data_str(self, df):
+    def create_load_data_str(self, df, profile, loaded_bytes, compact_bytes):
         text = "Data Information\n"
         text += "═══════════════════════════════════════\n\n"
         text += f"Dataset Shape: {df.shape[0]} rows × {df.shape[1]} columns\n\n"
         text += self.format_col_text(df.columns, "Columns:\t")
+        text += self.format_col_text(df.select_dtypes(include=['category']).columns, "Categorical Columns:\t")
+        text += f"Memory Usage:\t{loaded_bytes / 2 ** 20:.1f} MB as loaded, {compact_bytes / 2 ** 20:.1f} MB after compacting types\n"
+        text += "═══════════════════════════════════════\n\n"
+        text += self.create_profile_str(profile)
 
         return text
+
+    def create_profile_str(self, profile, top_n=PROFILE_TOP_COLUMNS):
+        text = "Data Quality\n"
+        constant_cols = profile.index[(profile['variance'] == 0) & (profile['count'] > 0)]
+        empty_cols = profile.index[profile['missing_pct'] >= MISSING_LIMIT_PCT]
+        duplicate_cols = [f"{col} = {dup}" for col, dup in profile['duplicate_of'].dropna().items()]
+        missing_cols = profile.index[profile['missing_pct'] > 0]
+
+        # Counts the columns with each issue, listing only the first few of them
+        text += f"Numeric Columns:\t{len(profile)}\n"
+        text += self.format_col_text(self.limit_cols(constant_cols, top_n), f"Constant Columns ({len(constant_cols)}):\t")
+        text += self.format_col_text(
+            self.limit_cols(empty_cols, top_n),
+            f"Columns Missing ≥ {MISSING_LIMIT_PCT:g}% of Values ({len(empty_cols)}):\t"
+        )
+        text += self.format_col_text(self.limit_cols(duplicate_cols, top_n), f"Duplicate Columns ({len(duplicate_cols)}):\t")
+        text += f"Columns With Missing Values:\t{len(missing_cols)}\n"
+        text += f"Missing Values:\t{profile['missing_pct'].mean() if len(profile) else 0:.1f}% of numeric values\n\n"
+
+        # Lists the statistics of the columns missing the most values
+        worst = profile.loc[missing_cols].nlargest(top_n, 'missing_pct')
+        if len(worst):
+            text += f"Columns Missing the Most Values (top {len(worst)} of {len(missing_cols)}):\n"
+            text += "Column\tMissing %\tVariance\tMin\tMax\n"
+            for col, row in worst.iterrows():
+                text += f"{col}\t{row['missing_pct']:.1f}\t{row['variance']:.4g}\t{row['min']:.4g}\t{row['max']:.4g}\n"
+            text += "\n"
+        text += "Click 'Export Profile' to save the statistics of every column\n"
+
+        return text
+
+    def limit_cols(self, cols, limit):
+        """Returns the first limit columns, followed by a count of the columns left out"""
+        cols = list(cols)
+        if len(cols) <= limit:
+            return cols
+        return cols[:limit] + [f"... {len(cols) - limit} more"]
     
-    def create_clean_data_str(self, df, user_drop_cols, missing_user_drop_cols, non_num_cols):
+    def create_version_str(self, df, description):
+        text = f"{description} Information\n"
+        text += "═══════════════════════════════════════\n\n"
+        text += f"Dataset Shape: {df.shape[0]} rows × {df.shape[1]} columns\n\n"
+        text += self.format_col_text(df.columns, "Columns:\t")
+
+        return text
+
+    def create_clean_data_str(self, df, user_drop_cols, missing_user_drop_cols, non_num_cols, degenerate_cols):
         text = "Cleaned Data Information\n"
         text += "═══════════════════════════════════════\n\n"
 
         text += self.format_col_text(user_drop_cols, "User Droped Columns:\t")
         text += self.format_col_text(missing_user_drop_cols, "User Drop Columns Not Found:\t")
         text += self.format_col_text(non_num_cols, "Non-numeric Columns Dropped:\t")
+        text += self.format_col_text(degenerate_cols, "Degenerate Columns Dropped:\t")
         text += "═══════════════════════════════════════\n\n"
 
         orig_rows = self.app_state.original_df.shape[0] #FIX THIS LOGIC
@@ -16,6 +16,10 @@ class MissingSelector(tk.Frame):
         Button for Imputing with Mean
         Button for Imputing with Median
         Button for Replacing with 0
+        Button for Imputing with the K Nearest Neighbors
+        Button for Imputing with Iterative Regression
+        Button for skipping imputation and fitting missing values during PCA
+    A text-box for selecting a column to impute the mean or median within groups of
     """
 
     #### 0. Setup GUI Elements ####
@@ -41,6 +45,13 @@ class MissingSelector(tk.Frame):
         self.mean_rad = None
         self.median_rad = None
         self.nan_rad = None
+        self.knn_rad = None
+        self.iterative_rad = None
+        self.em_rad = None
+
+        # Declares widgets for getting the user grouping column
+        self.group_lbl = None
+        self.group_entry = None
 
         # Creates components and sets them within the GUI
         self.create_components()
@@ -73,6 +84,31 @@ class MissingSelector(tk.Frame):
             variable=self.app_state.missing_choice,
             **RAD_BUTTON_STYLE
         )
+        self.knn_rad = RadBttn(
+            self,
+            text="Impute with KNN",
+            value="impute_knn",
+            variable=self.app_state.missing_choice,
+            **RAD_BUTTON_STYLE
+        )
+        self.iterative_rad = RadBttn(
+            self,
+            text="Impute with Iterative Regression",
+            value="impute_iterative",
+            variable=self.app_state.missing_choice,
+            **RAD_BUTTON_STYLE
+        )
+        self.em_rad = RadBttn(
+            self,
+            text="No Imputation, Handle in PCA",
+            value="pca_em",
+            variable=self.app_state.missing_choice,
+            **RAD_BUTTON_STYLE
+        )
+
+        # Creates grouping column entry
+        self.group_lbl = tk.Label(self, text="Impute Mean/Median Within Groups of:", **LABEL_STYLE)
+        self.group_entry = tk.Entry(self, **SMALL_ENTRY_STYLE, textvariable=self.app_state.impute_group)
 
     def setup_layout(self):
         """Sets the components onto this tk Frame"""
@@ -83,4 +119,11 @@ class MissingSelector(tk.Frame):
         self.mean_rad.grid(row=1, padx=5, pady=5, sticky="w")
         self.median_rad.grid(row=2, padx=5, pady=5, sticky="w")
         self.nan_rad.grid(row=3, padx=5, pady=5, sticky="w")
+        self.knn_rad.grid(row=4, padx=5, pady=5, sticky="w")
+        self.iterative_rad.grid(row=5, padx=5, pady=5, sticky="w")
+        self.em_rad.grid(row=6, padx=5, pady=5, sticky="w")
+
+        # Places grouping column entry below the selection buttons
+        self.group_lbl.grid(row=7, padx=5, pady=5, sticky="w")
+        self.group_entry.grid(row=8, padx=5, pady=5, sticky="w")
 
@@ -4,20 +4,39 @@ import traceback
 from matplotlib import cm, pyplot as plt
 from matplotlib.colors import to_hex
 from matplotlib.patches import Ellipse
+from matplotlib.widgets import LassoSelector, RectangleSelector
 import pandas as pd
 import numpy as np
-import seaborn as sns
 import plotly.graph_objects as go
 
 from scipy import stats
+from scipy.cluster import hierarchy
 
+from source.analysis.bootstrap import bootstrap_loadings
+from source.analysis.diagnostics import outlier_scores
+from source.analysis.feature_registry import FeatureRegistry
+from source.analysis.group_pca import group_pca
 from source.gui.app_state  import AppState
+from source.utils.label_placement import LabelLayout
+from source.utils.level_of_detail import LevelOfDetail
+from source.utils.point_index import PointIndex
 import source.utils.file_operations as file_ops
 from source.utils.constant import *
 
-from adjustText import adjust_text
 
 
+# Most groups drawn in the grids of group plots, the summary table lists every group
+MAX_GROUP_PLOTS = 16
+
+# Most heatmap cells written with their loading, larger heatmaps are only colored
+HEATMAP_MAX_ANNOTATED_CELLS = 400
+
+# Most heatmap rows labeled with their feature name
+HEATMAP_MAX_ROW_LABELS = 100
+
+# Most columns of the loaded data shown in the tooltip of a hovered point
+HOVER_MAX_COLUMNS = 4
+
 class CreatePlotBox(tk.Frame):
     """
     A GUI box for generating different types of plots using PCA analysis
@@ -30,6 +49,11 @@ class CreatePlotBox(tk.Frame):
         A button for creating and showing a Biplot with Groups
         A button for creating and showing a Interactive Biplot
         A button for creating and showing a Top Feature Loadings Plot
+        A button for bootstrapping loading confidence intervals
+        A button for creating and showing an Outlier Diagnostics Plot
+        A button for exporting the rows flagged as outliers
+        A button for creating and showing a grid of Scree Plots, one per group of the split column
+        A button for creating and showing a grid of Biplots, one per group of the split column
     """
 
     #### 0. Setup GUI Elements ####
@@ -62,6 +86,14 @@ class CreatePlotBox(tk.Frame):
         self.interactive_biplot_bttn = None
         self.scree_plot_bttn = None
         self.top_feat_bttn = None
+        self.bootstrap_bttn = None
+        self.diagnostics_bttn = None
+        self.export_outliers_bttn = None
+        self.group_scree_bttn = None
+        self.group_biplot_bttn = None
+        self.lasso_select_bttn = None
+        self.box_select_bttn = None
+        self.export_selection_bttn = None
 
 
         # Creates components and sets them within the GUI
@@ -80,6 +112,14 @@ class CreatePlotBox(tk.Frame):
         self.biplot_bttn = tk.Button(self, text="Biplot", **BUTTON_STYLE, command=self.create_biplot)
         self.interactive_biplot_bttn = tk.Button(self, text="Interactive Biplot", **BUTTON_STYLE, command=self.create_interactive_biplot)
         self.top_feat_bttn = tk.Button(self, text="Feature Loadings Plot", **BUTTON_STYLE, command=self.create_top_n_feat_plot)
+        self.bootstrap_bttn = tk.Button(self, text="Bootstrap Loadings", **BUTTON_STYLE, command=self.run_bootstrap)
+        self.diagnostics_bttn = tk.Button(self, text="Outlier Diagnostics", **BUTTON_STYLE, command=self.create_diagnostics_plot)
+        self.export_outliers_bttn = tk.Button(self, text="Export Outliers", **BUTTON_STYLE, command=self.export_outliers)
+        self.group_scree_bttn = tk.Button(self, text="Group Scree Plots", **BUTTON_STYLE, command=self.create_group_scree_plot)
+        self.group_biplot_bttn = tk.Button(self, text="Group Biplots", **BUTTON_STYLE, command=self.create_group_biplot)
+        self.lasso_select_bttn = tk.Button(self, text="Lasso Select", **BUTTON_STYLE, command=lambda: self.start_selection("lasso"))
+        self.box_select_bttn = tk.Button(self, text="Box Select", **BUTTON_STYLE, command=lambda: self.start_selection("box"))
+        self.export_selection_bttn = tk.Button(self, text="Export Selection", **BUTTON_STYLE, command=self.export_selection)
 
     def setup_layout(self):
         """Sets the components onto this tk Frame"""
@@ -97,6 +137,14 @@ class CreatePlotBox(tk.Frame):
         self.interactive_biplot_bttn.grid(row=2, column=1, padx=5, pady=5)
         self.scree_plot_bttn.grid(row=3, column=0, padx=5, pady=5)
         self.top_feat_bttn.grid(row=3, column=1, padx=5, pady=5)
+        self.bootstrap_bttn.grid(row=4, column=0, padx=5, pady=5)
+        self.diagnostics_bttn.grid(row=4, column=1, padx=5, pady=5)
+        self.export_outliers_bttn.grid(row=5, column=0, columnspan=2, padx=5, pady=5)
+        self.group_scree_bttn.grid(row=6, column=0, padx=5, pady=5)
+        self.group_biplot_bttn.grid(row=6, column=1, padx=5, pady=5)
+        self.lasso_select_bttn.grid(row=7, column=0, padx=5, pady=5)
+        self.box_select_bttn.grid(row=7, column=1, padx=5, pady=5)
+        self.export_selection_bttn.grid(row=8, column=0, columnspan=2, padx=5, pady=5)
 
 
     #### 1. Create PCA Visualization ####
@@ -106,11 +154,11 @@ class CreatePlotBox(tk.Frame):
         Creates a PCA visualization based on the given inputs and updates GUI plot
         
         Creates a PCA plot of the first two prinicple components. Creates groupings using
-            the selected Target Variable and gives them unique colors. Displays the generated plot.
+            the selected Target Variable and gives them unique colors. Overlays any data projected
+            onto the current model. Displays the generated plot.
         """
         app_state = self.app_state
         main = app_state.main
-        df = app_state.df
         # Validates that the data has been cleaned
         if not app_state.df_cleaned.get():
             messagebox.showerror("Error", "Data must be cleaned in order to run PCA.")
@@ -118,9 +166,7 @@ class CreatePlotBox(tk.Frame):
         
         # Runs PCA Analysis and get important results
         pca_results = main.run_analysis(app_state)
-        transformed_data = pca_results['transformed_data']
-        transformed_cols = [f'PC{i + 1}' for i in range(transformed_data.shape[1])]
-        transformed_df = pd.DataFrame(transformed_data, columns=transformed_cols)
+        transformed_data = np.asarray(pca_results['transformed_data'])
         
         # Gets the user selected target variable
         target = self.app_state.pca_target.get().strip()
@@ -131,55 +177,61 @@ class CreatePlotBox(tk.Frame):
         ax.set_title("PCA Visualization")
         ax.set_xlabel("Principal Component 1")
         ax.set_ylabel("Principal Component 2")
+
+        # Overlays data projected onto the current model above the fitted data
+        projected = app_state.projected_scores
+        if projected is not None:
+            ax.scatter(
+                projected[:, 0], projected[:, 1], marker='x', color='black',
+                alpha=0.7, label="Projected Data", zorder=3
+            )
+
+        # Finds the target in the cleaned data, or in the loaded data if cleaning dropped it
+        target_vals = app_state.dataset.column(target) if target != "" else None
+
         # Plot grouped by target if available
         if target == "":
             # Plot without grouping
-            ax.scatter(
-                transformed_df["PC1"], transformed_df["PC2"], alpha=0.7, label="Data Points"
-            )
+            self.scatter_scores(ax, transformed_data, alpha=0.7, label="Data Points")
+            if projected is not None:
+                ax.legend()
             main.replace_status_text("PCA Plot Successfully Generated")
-        elif target in self.app_state.df.columns:
-            # Gets the values for the given target
-            target_vals = df[target].reset_index(drop=True)
-
-            if target_vals.nunique() > 20:
+        elif target_vals is not None:
+            if pd.api.types.is_numeric_dtype(target_vals) and target_vals.nunique() > 20:
                 # Bin the values into 20 equal-width intervals
-                binned = pd.cut(target_vals, bins=20, include_lowest=True)
-                
+                target_vals = pd.cut(target_vals, bins=20, include_lowest=True)
+            elif isinstance(target_vals.dtype, pd.CategoricalDtype) and not target_vals.cat.ordered:
+                # Sorts the categories so the groups are listed in order
+                target_vals = target_vals.cat.set_categories(sorted(target_vals.cat.categories))
+
+            # Gets the sorted groups and the group code of each point, using the codes of categoricals directly
+            codes, unique_targets = pd.factorize(target_vals, sort=True)
+            if isinstance(unique_targets, pd.IntervalIndex):
                 # Format the interval labels to show up to 6 significant digits
-                def format_interval(interval):
-                    left = f"{interval.left:.6g}"
-                    right = f"{interval.right:.6g}"
-                    return f"({left}, {right}]"
-
-                formatted_bins = binned.apply(format_interval)
-                target_vals = formatted_bins
-                unique_targets = sorted(target_vals.unique())
+                labels = [f"({interval.left:.6g}, {interval.right:.6g}]" for interval in unique_targets]
             else:
-                unique_targets = sorted(target_vals.unique())
-
+                labels = [str(t) for t in unique_targets]
 
-            # Assign colors and add a legend
+            # Plots every point at once colored by its group, skipping points without a target value
             colors = plt.cm.tab20(np.linspace(0, 1, len(unique_targets)))
-            for i, t in enumerate(unique_targets):
-                mask = target_vals == t
-                color = colors[i]
-                ax.scatter(
-                    transformed_df.loc[mask, "PC1"],
-                    transformed_df.loc[mask, "PC2"],
-                    c=[color], label=str(t), alpha=0.7,
-                )
+            grouped = codes >= 0
+            self.scatter_scores(ax, transformed_data[grouped], colors[codes[grouped]], alpha=0.7)
+
+            # Assign colors and add a legend, drawing an empty scatter for each group
+            for color, label in zip(colors, labels):
+                ax.scatter([], [], c=[color], label=label, alpha=0.7)
 
             ax.legend(title=f"{target} Groups", bbox_to_anchor=(1.05, 1), loc='upper left')
             main.replace_status_text("PCA Plot Successfully Generated")
         else:
             # Plot without grouping
-            ax.scatter(
-                transformed_df["PC1"], transformed_df["PC2"], alpha=0.7, label="Data Points"
-            )
+            self.scatter_scores(ax, transformed_data, alpha=0.7, label="Data Points")
+            if projected is not None:
+                ax.legend()
             main.replace_status_text(f"{target} not found! Showing Default PCA Plot")
 
-
+        # Shows the row of a point when it is hovered
+        self.set_hover_points(ax, transformed_data, target)
         main.update_figure()
 
 
@@ -229,6 +281,27 @@ class CreatePlotBox(tk.Frame):
                 label='Cumulative explained variance'
             )
 
+            # Overlays the parallel analysis threshold if it was run on the current data
+            parallel = app_state.parallel_results
+            if (
+                parallel is not None
+                and parallel['version'] is app_state.dataset.current
+                and parallel['feature_names'] == app_state.pca_results['feature_names']
+            ):
+                n_shown = min(len(pc_indices), len(parallel['threshold']))
+                ax.plot(
+                    pc_indices[:n_shown],
+                    parallel['threshold'][:n_shown] / parallel['total_variance'],
+                    color='red', linestyle='--', marker='o',
+                    label=f"Shuffled data {parallel['percentile']:g}th percentile"
+                )
+                if parallel['n_suggested'] < len(pc_indices):
+                    ax.axvline(
+                        parallel['n_suggested'] + 0.5, color='gray', linestyle=':',
+                        label=f"Suggested components: {parallel['n_suggested']}"
+                    )
+                ax.legend()
+
             # Set x-axis ticks to whole numbers only
             ax.set_xticks(pc_indices)
             
@@ -256,7 +329,7 @@ class CreatePlotBox(tk.Frame):
             messagebox.showerror("Error", "DataFrame must be cleaned")
             return
         # Runs PCA analysis and gets relavent values
-        scores, loadings, variance, eigvals, feat_names, top_idx, top_feat, __, num_feat = self.validate_biplot_data(app_state)
+        scores, scaled_loadings, variance, eigvals, registry, top_idx, __, num_feat = self.validate_biplot_data(app_state)
 
         # Intializes the figure
         if not self.init_biplot_fig(variance, num_feat, app_state): return 
@@ -264,7 +337,7 @@ class CreatePlotBox(tk.Frame):
 
         # Add legend for groups
         try:
-            color_map, user_mapping_enabled = self.get_color_mapping(top_feat, app_state)
+            color_map, feat_colors, __, grouping_enabled = self.get_color_mapping(top_idx, registry, app_state)
             for group, color in color_map.items():
                 label = group[:35] + ('...' if len(group) > 35 else '')
                 ax.plot([], [], '-', color=color, label=label, linewidth=2)
@@ -283,17 +356,18 @@ class CreatePlotBox(tk.Frame):
             ax.add_patch(ellipse)
 
             # Sets axis limits
-            variance_scale = np.sqrt(eigvals)
-            scaled_loadings = loadings[:, :2] * variance_scale
             self.set_biplot_axis_limits(scaled_loadings, top_idx, ax)
 
 
             # Creates biplot arrows and arrow text
-            self.add_biplot_arrows(top_idx, feat_names, scaled_loadings, color_map, ax)
+            self.add_biplot_arrows(top_idx, scaled_loadings, feat_colors, ax)
+            if app_state.biplot_labels.get():
+                self.add_biplot_labels(top_idx, scaled_loadings, registry.names[top_idx], feat_colors, ax)
 
 
-            # Creates Scatter Plot
-            ax.scatter(scores[:, 0], scores[:, 1], alpha=0.2, color='gray', s=30, label='Samples')
+            # Creates Scatter Plot, showing the row of a point when it is hovered
+            self.scatter_scores(ax, scores, alpha=0.2, color='gray', s=30, label='Samples')
+            self.set_hover_points(ax, scores)
         except Exception as e:
             traceback.print_exc()
             messagebox.showerror("Error", f"An error occures while generating the biplot: {e}")
@@ -301,7 +375,7 @@ class CreatePlotBox(tk.Frame):
         
         # Updates the figure on the GUI
         main = app_state.main
-        if user_mapping_enabled and app_state.feat_group_enabled.get():
+        if not grouping_enabled and app_state.feat_group_enabled.get():
             main.replace_status_text("No Feature Grouping Loaded! Generic Biplot Generated")
         else:
             main.replace_status_text("Biplot Sucsessfully Generated")
@@ -360,38 +434,45 @@ class CreatePlotBox(tk.Frame):
         ax.set_xlim(x_min - margin, x_max + margin)
         ax.set_ylim(y_min - margin, y_max + margin)
 
-    def add_biplot_arrows(self, top_idx, feat_names, scaled_loadings, color_map, ax):
+    def add_biplot_arrows(self, top_idx, scaled_loadings, feat_colors, ax):
         """
-        Adds arrows and arrow text to a biplot
+        Adds arrows to a biplot
         
         Args:
-            top_feat:  List of the top PCA features
             top_idx:   List of the indexes of the top PCA features
-            feat_names: List of all the PCA feature Names
             scaled_loadings:   List of all the PCA loadings
+            feat_colors: The color of each top feature's arrow
         """
-        # Use the color mapping to add arrows to the plot
-        for idx in top_idx:
-            feature = feat_names[idx]
-            
-            # Get feature group and group color
-            group = self.app_state.feat_group_map[feature]
-            color = color_map.get(group)
-
-            # Generate arrow
-            ax.quiver(
-                0, 0,
-                scaled_loadings[idx, 0],
-                scaled_loadings[idx, 1],
-                angles='xy',
-                scale_units='xy',
-                scale=1,
-                color=color,
-                alpha=0.8,
-                width=0.005,
-                headwidth=3,
-                headlength=5
-            )
+        # Generates every arrow at once, colored by its feature group
+        ax.quiver(
+            np.zeros(len(top_idx)), np.zeros(len(top_idx)),
+            scaled_loadings[top_idx, 0],
+            scaled_loadings[top_idx, 1],
+            angles='xy',
+            scale_units='xy',
+            scale=1,
+            color=feat_colors,
+            alpha=0.8,
+            width=0.005,
+            headwidth=3,
+            headlength=5
+        )
+
+    def add_biplot_labels(self, top_idx, scaled_loadings, feat_names, feat_colors, ax):
+        """
+        Labels the tip of each biplot arrow with its feature name
+
+        Labels are placed so they don't overlap, longest arrows first. Labels that have no free
+            space near their arrow are hidden.
+
+        Args:
+            top_idx:   List of the indexes of the top PCA features
+            scaled_loadings:   List of all the PCA loadings
+            feat_names: The name of each top feature
+            feat_colors: The color of each top feature's arrow
+        """
+        texts = [str(name)[:35] + ('...' if len(str(name)) > 35 else '') for name in feat_names]
+        self.app_state.label_layout = LabelLayout(ax, scaled_loadings[top_idx, :2], texts, feat_colors)
 
 
     #### 4. Create Interactive Biplot ####
@@ -400,17 +481,15 @@ class CreatePlotBox(tk.Frame):
         """Creates an interactive biplot visualization and opens it in users webbrowser"""
         app_state = self.app_state
         # Runs PCA analysis and gets relavent values
-        __, loadings, variance, eigvals, feat_names, top_idx, top_feat, magnitudes, __ = self.validate_biplot_data(app_state)
+        __, scaled_loadings, variance, eigvals, registry, top_idx, magnitudes, __ = self.validate_biplot_data(app_state)
 
         try:
             # Intializes figure
             fig = go.Figure()
 
             # Sets axis limits
-            variance_scale = np.sqrt(eigvals)
-            scaled_loadings = loadings[:, :2] * variance_scale
-            color_map, user_mapping_enabled = self.get_color_mapping(top_feat, app_state)
-            self.add_interactive_biplot_groups(top_idx, feat_names, scaled_loadings, magnitudes, color_map, fig, app_state.feat_group_map)
+            __, feat_colors, feat_groups, __ = self.get_color_mapping(top_idx, registry, app_state)
+            self.add_interactive_biplot_groups(top_idx, registry.names[top_idx], scaled_loadings, magnitudes, feat_colors, feat_groups, fig)
 
             #Add interactivity to figure
             fig.update_layout(
@@ -457,28 +536,24 @@ class CreatePlotBox(tk.Frame):
         if file_name is not None:
             app_state.main.replace_status_text("Interactive Biplot Sucsessfully Generated")
     
-    def add_interactive_biplot_groups(self, top_idx, feat_names, scaled_loadings, magnitudes, color_map, fig, feat_group_map):
+    def add_interactive_biplot_groups(self, top_idx, top_feat, scaled_loadings, magnitudes, feat_colors, feat_groups, fig):
         """
         Adds biplot groupings to an interactive biplot
 
         Args:
-            top_feat:  List of the top PCA features
             top_idx:   List of the indexes of the top PCA features
-            feat_names: List of all the PCA feature Names
+            top_feat:  List of the names of the top PCA features
             scaled_loadings:   List of all the PCA loadings
+            feat_colors: The color of each top feature
+            feat_groups: The group of each top feature
             fig:    The figure to generate the biplot groupings on
         """
         # Set for holding legend groups to avoid duplicate legend entries
         legend_groups = set()
 
-        for idx in top_idx:
-            feature = feat_names[idx]
+        for idx, feature, color, group in zip(top_idx, top_feat, feat_colors, feat_groups):
             magnitude = magnitudes[idx]
 
-            # Get feature color
-            group = feat_group_map.get(feature)
-            color = color_map.get(group)
-
             # Only show legend for the group once; check if it's already been shown
             showlegend = group not in legend_groups
             legend_groups.add(group)
@@ -523,24 +598,39 @@ class CreatePlotBox(tk.Frame):
         if not self.init_top_feat_plot(top_n, pca_comp_num+1, app_state): return
         ax = app_state.ax
         
-        # Validate and retrieve loadings
-        loadings = abs(pca_results['components'][pca_comp_num])
-        feat_names = pca_results['feature_names']
-        
-        # Sorting the loadings
-        sorted_pairs = sorted(zip(feat_names, loadings), key=lambda x: abs(x[1]), reverse=True)
-        sorted_loadings, sorted_feat_names = zip(*sorted_pairs)
-        sorted_loadings = list(sorted_loadings)
-        sorted_feat_names = list(sorted_feat_names)
-        
+        # Validate and retrieve loadings, sorted by absolute value
+        loadings = pca_results['loadings'][:, pca_comp_num]
+        feat_names = pca_results.feature_index
+        top_idx = pca_results.top_loadings(pca_comp_num, top_n)
+        top_loadings = pca_results.abs_loadings[top_idx, pca_comp_num]
+
+        # Gets error bars from bootstrap intervals, flipping the intervals of negative loadings
+        xerr = None
+        bootstrap = self.get_bootstrap_results(pca_results)
+        if bootstrap is not None:
+            signs = np.where(loadings[top_idx] < 0, -1.0, 1.0)
+            bounds = np.stack([
+                bootstrap['lower'][top_idx, pca_comp_num],
+                bootstrap['upper'][top_idx, pca_comp_num],
+            ]) * signs
+            bounds.sort(axis=0)
+            xerr = np.clip([top_loadings - bounds[0], bounds[1] - top_loadings], 0, None)
+
         try:
             # Plot top feature loadings
             ax.barh(
-                sorted_loadings[:top_n],
-                sorted_feat_names[:top_n],
+                feat_names[top_idx],
+                top_loadings,
+                xerr=xerr,
+                capsize=3 if xerr is not None else 0,
                 color='steelblue',
                 alpha=0.8
             )
+            if xerr is not None:
+                ax.set_xlabel(
+                    f"PCA{pca_comp_num + 1} Absolute Loadings ({bootstrap['confidence']:g}% bootstrap intervals)",
+                    fontsize=12
+                )
         except Exception as e:
             traceback.print_exc()
             messagebox.showerror("Error", f"An error occurred while generating the top feature plot: {e}")
@@ -550,6 +640,47 @@ class CreatePlotBox(tk.Frame):
         main.replace_status_text("Top Feature Plot Sucessfully Generated")
         main.update_figure()
 
+    def run_bootstrap(self):
+        """
+        Bootstraps confidence intervals of the loadings and shows them on the Feature Loadings Plot
+
+        PCA is refit on resampled rows of the standardized data across all cores. The
+            intervals are kept until PCA is run again and are also shown on the Heatmap.
+        """
+        app_state = self.app_state
+        main = app_state.main
+        if not app_state.df_cleaned.get():
+            messagebox.showerror("Error", "Data must be cleaned first!")
+            return
+
+        # Ensures PCA has been run
+        pca_results = main.run_analysis(app_state)
+        if pca_results is None:
+            return
+
+        try:
+            results = bootstrap_loadings(
+                pca_results['standardized_data'],
+                pca_results['components'],
+                progress=lambda done: main.replace_progress_text(f"Bootstrapping Loadings: {done:.0%}")
+            )
+        except Exception as e:
+            traceback.print_exc()
+            messagebox.showerror("Error", f"Bootstrapping loadings failed: {str(e)}")
+            return
+
+        # Keeps the components the intervals belong to, so stale intervals are never shown
+        results['components'] = np.array(pca_results['components'])
+        app_state.bootstrap_results = results
+        self.create_top_n_feat_plot()
+
+    def get_bootstrap_results(self, pca_results):
+        """Returns the bootstrap results if they were computed for the current PCA components, otherwise None"""
+        bootstrap = self.app_state.bootstrap_results
+        if bootstrap is None or not np.array_equal(bootstrap['components'], pca_results['components']):
+            return None
+        return bootstrap
+
     def init_top_feat_plot(self, top_n, pca_num, app_state):
         """
         Intializes a blank top feature plot with title and labels
@@ -587,7 +718,11 @@ class CreatePlotBox(tk.Frame):
         
         Creates a heatmap using the top number of features selected or custom features.
             Shows the number of PCA components selected, and sorts the features by absolute 
-            loadings of the selected PCA component to analize
+            loadings of the selected PCA component to analize. Rows are reordered so similar
+            features are next to each other when heatmap clustering is enabled.
+
+        The loadings are drawn as a single image, so thousands of features draw quickly.
+            Cells are only written with their values when there are few enough to read.
         """
         app_state = self.app_state
         main = app_state.main
@@ -600,7 +735,7 @@ class CreatePlotBox(tk.Frame):
             pca_results = main.run_analysis(app_state)
 
             # Creates a new blank figure
-            __, ax  = main.create_blank_fig(grid=False)
+            fig, ax  = main.create_blank_fig(grid=False)
 
             # Adds a title and x and y label 
             ax.set_title('Loadings Heatmap', fontsize=16)
@@ -612,26 +747,43 @@ class CreatePlotBox(tk.Frame):
             ax.tick_params(axis='y', labelsize=10)
 
             # Determine focus columns
-            focus_columns = self.get_focus_cols(app_state)
+            selected_idx = self.get_focus_cols(app_state)
 
-            if focus_columns is None:
+            if selected_idx is None:
                 return
 
-            loadings = app_state.pca_results['loadings']
-            col_names = app_state.df.columns.tolist()
-            selected_loadings = loadings[[col_names.index(col) for col in focus_columns], :]
-            # Create the heatmap
-            plt.figure(app_state.fig_size[0])  # Increase figure size for clarity
-            sns.heatmap(
+            # Reorders the rows by hierarchical clustering when enabled
+            loadings = pca_results['loadings']
+            if app_state.heatmap_cluster.get():
+                selected_idx = selected_idx[self.get_cluster_order(loadings[selected_idx, :])]
+            focus_columns = self.get_feature_registry(pca_results).names[selected_idx]
+            selected_loadings = np.asarray(loadings[selected_idx, :])
+
+            # Create the heatmap, centering the colors on zero
+            limit = max(float(np.abs(selected_loadings).max()), np.finfo(np.float64).tiny)
+            image = ax.imshow(
                 selected_loadings,
-                annot=True,  # Add annotations to cells
-                fmt=".2f",  # Format numbers
-                cmap="coolwarm",  # Use perceptually uniform colormap
-                cbar_kws={'label': 'Absolute Loadings'},  # Single, descriptive colorbar
-                xticklabels=[f'PC{i + 1}' for i in range(loadings.shape[1])],
-                yticklabels=focus_columns,
-                ax=ax
+                cmap="coolwarm",
+                vmin=-limit,
+                vmax=limit,
+                aspect='auto',
+                interpolation='nearest'
             )
+            fig.colorbar(image, ax=ax, label='Loadings')
+            ax.set_xticks(np.arange(loadings.shape[1]), [f'PC{i + 1}' for i in range(loadings.shape[1])])
+            if len(focus_columns) <= HEATMAP_MAX_ROW_LABELS:
+                ax.set_yticks(np.arange(len(focus_columns)), focus_columns)
+            else:
+                ax.set_yticks([])
+
+            # Writes each loading in its cell when there are few enough cells to read
+            if selected_loadings.size <= HEATMAP_MAX_ANNOTATED_CELLS:
+                # Shows the half width of the bootstrap interval under each loading when available
+                bootstrap = self.get_bootstrap_results(pca_results)
+                half_widths = None
+                if bootstrap is not None:
+                    half_widths = (bootstrap['upper'] - bootstrap['lower'])[selected_idx, :] / 2
+                self.annotate_heatmap(selected_loadings, half_widths, limit, ax)
 
             # Ensure that the GUI updates
             main.replace_status_text("Heatmap Sucessfully Generated")
@@ -642,49 +794,392 @@ class CreatePlotBox(tk.Frame):
             print(error_str)
             messagebox.showerror("Error", f"Error creating heatmap: {str(e)}")
 
+    def annotate_heatmap(self, values, half_widths, limit, ax):
+        """
+        Writes the value of each cell onto a heatmap
+
+        Args:
+            values: The values of the heatmap cells
+            half_widths: Optional half widths of the bootstrap interval of each cell, written under its value
+            limit: The largest absolute value of the color scale
+        """
+        for (row, col), value in np.ndenumerate(values):
+            text = f"{value:.2f}" if half_widths is None else f"{value:.2f}\n±{half_widths[row, col]:.2f}"
+
+            # Uses white text on the darkest cells so it stays readable
+            color = "white" if abs(value) > 0.6 * limit else "black"
+            ax.text(col, row, text, ha="center", va="center", color=color, fontsize=8)
+
+    def get_cluster_order(self, values):
+        """
+        Orders rows so rows with similar values are next to each other
+
+        Args:
+            values: The rows to order, one row per feature
+
+        Returns:
+            The positions of the rows in their clustered order
+        """
+        if len(values) < 3:
+            return np.arange(len(values))
+        return hierarchy.leaves_list(hierarchy.linkage(values, method="average"))
+
     def get_focus_cols(self, app_state):
-        """Determine columns to focus on based on heatmap mode."""
+        """Determine the positions of the columns to focus on based on heatmap mode."""
         # Get user Settings
-        df = app_state.df
         focused_pca_num = app_state.focused_pca_num.get()-1
         heatmap_feats = app_state.heatmap_feat.get().strip().split(',')
         num_feat = app_state.num_feat.get()
         main = app_state.main
 
         try:
-            # Get the column and loadings data
-            df_cols = df.columns.tolist()
-            loadings = abs(app_state.pca_results['loadings'])
-
-            # Get absolute loadings for the first principal component
-            pc1_loadings = abs(loadings[:,focused_pca_num])
-            loading_series = pd.Series(pc1_loadings, index=df_cols)
-            sorted_columns = loading_series.sort_values(ascending=False).index.tolist()
+            # Get the column data, which may exclude features pruned before PCA
+            pca_results = app_state.pca_results
+            registry = self.get_feature_registry(pca_results)
 
-            target_feats = set([feat.strip() for feat in  heatmap_feats if feat.strip()])
-            # Returns the top Features if the target is empty
+            # Keeps the order the features were entered in, without repeats
+            target_feats = list(dict.fromkeys(feat.strip() for feat in heatmap_feats if feat.strip()))
+            # Returns the top Features of the focused component if the target is empty
             if not target_feats:
-                return sorted_columns[:num_feat]
+                return pca_results.top_loadings(focused_pca_num, num_feat)
             else:
                 # Gets the focused columns and missing columns
-                df_feats = set(df.columns)
-                focus_feats = target_feats & df_feats
-                missing_feat = target_feats - focus_feats
+                positions = registry.positions(target_feats)
+                missing_feat = [feat for feat, pos in zip(target_feats, positions) if pos < 0]
 
                 # If there are missing features, inform the user by updating the status
                 if len(missing_feat) != 0:
                     main.replace_status_text(f"Heatmap Failed! Selected Features Not Found In Data!")
-                    main.replace_pca_text(f"Missing Features:\t{[feat for feat in missing_feat]}")
+                    main.replace_pca_text(f"Missing Features:\t{missing_feat}")
                 
-                return_list = [feat for feat in focus_feats]
+                focus_idx = pd.unique(positions[positions >= 0])
 
-            return return_list or None
+            return focus_idx if len(focus_idx) else None
         except Exception as e:
             messagebox.showerror("Error", f"Error determining focus columns: {str(e)}")
             return None
 
- 
-    #### 7. Data Functions ####
+
+    #### 7. Create Outlier Diagnostics ####
+
+    def create_diagnostics_plot(self):
+        """
+        Plots Hotelling's T² against the Q residual of every row with their control limits
+
+        Rows above either limit are flagged in red. Rows far along the components have a
+            high T², rows poorly described by the components have a high Q residual.
+        """
+        app_state = self.app_state
+        main = app_state.main
+        diagnostics = self.get_diagnostics()
+        if diagnostics is None:
+            return
+
+        __, ax = main.create_blank_fig()
+        try:
+            flagged = diagnostics['flagged']
+            ax.set_title(f"Outlier Diagnostics: {flagged.sum()} of {len(flagged)} Rows Flagged")
+            ax.set_xlabel("Hotelling's T²")
+            ax.set_ylabel("Q Residual (SPE)")
+
+            # Plots the rows within the limits under the flagged rows
+            ax.scatter(diagnostics['t2'][~flagged], diagnostics['q'][~flagged], s=10, alpha=0.6, color='steelblue', label="Within Limits")
+            ax.scatter(diagnostics['t2'][flagged], diagnostics['q'][flagged], s=14, alpha=0.8, color='red', label="Flagged")
+
+            # Draws the control limits
+            confidence = f"{diagnostics['confidence']:.0%}"
+            if not np.isnan(diagnostics['t2_limit']):
+                ax.axvline(diagnostics['t2_limit'], color='black', linestyle='--', label=f"T² Limit ({confidence})")
+            if not np.isnan(diagnostics['q_limit']):
+                ax.axhline(diagnostics['q_limit'], color='gray', linestyle='--', label=f"Q Limit ({confidence})")
+            ax.legend()
+        except Exception as e:
+            traceback.print_exc()
+            messagebox.showerror("Error", f"An error occurred while generating the diagnostics plot: {e}")
+            return
+
+        main.replace_status_text("Outlier Diagnostics Plot Sucessfully Generated")
+        main.update_figure()
+
+    def export_outliers(self):
+        """Saves the loaded data of the rows flagged as outliers, with their diagnostics, to a csv file"""
+        app_state = self.app_state
+        diagnostics = self.get_diagnostics()
+        if diagnostics is None:
+            return
+
+        flagged = np.flatnonzero(diagnostics['flagged'])
+        if len(flagged) == 0:
+            messagebox.showinfo("No Outliers", "No rows are above the control limits, nothing was exported")
+            return
+
+        # Exports the flagged rows as they were loaded, with their row number in the loaded file
+        rows = app_state.dataset.original_positions(flagged)
+        outliers = app_state.dataset.original.take(rows).reset_index(drop=True)
+        outliers.insert(0, "row", rows + 1)
+        outliers["hotelling_t2"] = diagnostics['t2'][flagged]
+        outliers["q_residual"] = diagnostics['q'][flagged]
+        if file_ops.save_data_csv(outliers, app_state.output_dir, file_prefix="Outliers") is not None:
+            app_state.main.replace_status_text(f"{len(flagged)} Outlier Rows Exported")
+
+    def get_diagnostics(self):
+        """Runs PCA if needed and returns the outlier diagnostics of every row. None if they can't be computed"""
+        app_state = self.app_state
+        if not app_state.df_cleaned.get():
+            messagebox.showerror("Error", "Data must be cleaned first!")
+            return None
+
+        # Ensures PCA has been run
+        pca_results = app_state.main.run_analysis(app_state)
+        if pca_results is None:
+            return None
+
+        try:
+            return outlier_scores(pca_results)
+        except Exception as e:
+            traceback.print_exc()
+            messagebox.showerror("Error", f"Failed to compute outlier diagnostics: {str(e)}")
+            return None
+
+
+    #### 8. Create Group Plots ####
+
+    def create_group_scree_plot(self):
+        """Creates a grid of Scree Plots from PCA fit separately to each group of the split column"""
+        app_state = self.app_state
+        main = app_state.main
+        results = self.get_group_results()
+        if results is None:
+            return
+
+        shown = list(results['groups'].items())[:MAX_GROUP_PLOTS]
+        fig, axes = main.create_grid_fig(len(shown), grid=False)
+        try:
+            fig.suptitle(f"Scree Plots by {results['split_column']}")
+            for ax, (key, group) in zip(axes, shown):
+                explained_variance = group['explained_variance']
+                pc_indices = range(1, len(explained_variance) + 1)
+                ax.bar(pc_indices, explained_variance, alpha=0.7, align='center')
+                ax.step(pc_indices, np.cumsum(explained_variance), where='mid')
+                ax.set_title(f"{key} (n={len(group['rows'])})", fontsize=9)
+                ax.set_xticks(pc_indices)
+                ax.set_ylim(0, 1)
+                ax.tick_params(labelsize=7)
+        except Exception as e:
+            traceback.print_exc()
+            messagebox.showerror("Error", f"An error occurred while generating the group scree plots: {e}")
+            return
+
+        main.replace_status_text(self.create_group_status_str(results, "Scree Plots"))
+        main.update_figure()
+
+    def create_group_biplot(self):
+        """Creates a grid of Biplots from PCA fit separately to each group of the split column"""
+        app_state = self.app_state
+        main = app_state.main
+        results = self.get_group_results()
+        if results is None:
+            return
+
+        shown = list(results['groups'].items())[:MAX_GROUP_PLOTS]
+        feat_names = np.asarray(results['feature_names'])
+        num_feat = app_state.num_feat.get()
+        fig, axes = main.create_grid_fig(len(shown))
+        try:
+            fig.suptitle(f"Biplots by {results['split_column']}")
+            for ax, (key, group) in zip(axes, shown):
+                scores = group['transformed_data']
+                loadings = group['components'][:2].T
+                variance = group['explained_variance']
+                ax.scatter(scores[:, 0], scores[:, 1], s=4, alpha=0.5, color='gray')
+
+                # Draws arrows for the group's top features, scaled to the spread of its scores
+                magnitudes = np.hypot(loadings[:, 0], loadings[:, 1])
+                top_idx = np.argsort(magnitudes)[::-1][:num_feat]
+                scale = 0.8 * np.abs(scores[:, :2]).max() / max(magnitudes[top_idx].max(), np.finfo(float).tiny)
+                for i in top_idx:
+                    x, y = loadings[i] * scale
+                    ax.arrow(0, 0, x, y, color='steelblue', width=0.002 * scale, head_width=0.03 * scale, length_includes_head=True)
+                    ax.text(x, y, feat_names[i], fontsize=6)
+
+                ax.set_title(f"{key} (n={len(group['rows'])})", fontsize=9)
+                ax.set_xlabel(f"PC1 ({variance[0]:.1%})", fontsize=7)
+                ax.set_ylabel(f"PC2 ({variance[1]:.1%})", fontsize=7)
+                ax.tick_params(labelsize=7)
+        except Exception as e:
+            traceback.print_exc()
+            messagebox.showerror("Error", f"An error occurred while generating the group biplots: {e}")
+            return
+
+        main.replace_status_text(self.create_group_status_str(results, "Biplots"))
+        main.update_figure()
+
+    def get_group_results(self):
+        """
+        Fits PCA to each group of the split column and shows a summary table of the results
+
+        Results are reused while the data, split column and PCA settings are unchanged.
+
+        Returns:
+            The results of group_pca with the settings they were computed for. None if they
+                can't be computed
+        """
+        app_state = self.app_state
+        main = app_state.main
+        if not app_state.df_cleaned.get():
+            messagebox.showerror("Error", "Data must be cleaned first!")
+            return None
+
+        split_column = app_state.split_column.get().strip()
+        if split_column == "":
+            messagebox.showerror("Select a Column", "Enter a column to split the data by under 'Split PCA By'")
+            return None
+
+        # Ensures PCA has been run, groups are fit with the same settings
+        pca_results = main.run_analysis(app_state)
+        if pca_results is None:
+            return None
+
+        # Reuses the results computed for the same data, split column and components
+        results = app_state.group_pca_results
+        if (
+            results is None
+            or results['split_column'] != split_column
+            or results['version'] is not app_state.dataset.current
+            or not np.array_equal(results['components'], pca_results['components'])
+        ):
+            groups = app_state.dataset.column(split_column)
+            if groups is None:
+                messagebox.showerror("Column Label Error", f"The split column, {split_column}, was not found in the data.")
+                return None
+
+            try:
+                results = group_pca(
+                    pca_results['standardized_data'],
+                    groups,
+                    pca_results['n_components'],
+                    reference=pca_results['components'],
+                    progress=lambda done: main.replace_progress_text(f"Fitting PCA to Each Group: {done:.0%}")
+                )
+            except Exception as e:
+                traceback.print_exc()
+                messagebox.showerror("Error", f"Failed to fit PCA to each group: {str(e)}")
+                return None
+            if not results['groups']:
+                messagebox.showerror("Error", f"No group of {split_column} has enough rows to fit PCA.")
+                return None
+
+            results.update({
+                'split_column': split_column,
+                'version': app_state.dataset.current,
+                'components': np.array(pca_results['components']),
+                'feature_names': pca_results['feature_names'],
+            })
+            app_state.group_pca_results = results
+
+        main.replace_pca_text(self.create_group_summary_str(results))
+        return results
+
+    def create_group_summary_str(self, results):
+        text = f"Group PCA Results: Split by {results['split_column']}\n"
+        text += "═══════════════════════════════════════\n\n"
+
+        # Explained variance of each component within each group
+        n_components = len(results['components'])
+        text += "Group\tRows\t" + "\t".join(f"PC{i + 1}" for i in range(n_components)) + "\tTotal\n"
+        for key, group in results['groups'].items():
+            explained_variance = group['explained_variance']
+            text += f"{key}\t{len(group['rows'])}\t"
+            text += "\t".join(f"{value:.2%}" for value in explained_variance)
+            text += f"\t{explained_variance.sum():.2%}\n"
+        text += "═══════════════════════════════════════\n\n"
+
+        skipped = [f"{key} ({count} rows)" for key, count in results['skipped'].items()]
+        text += self.app_state.main.format_col_text(skipped, "Groups With Too Few Rows:\t")
+        return text
+
+    def create_group_status_str(self, results, plot_name):
+        n_groups = len(results['groups'])
+        if n_groups > MAX_GROUP_PLOTS:
+            return f"Group {plot_name} Sucessfully Generated: Showing {MAX_GROUP_PLOTS} of {n_groups} Groups"
+        return f"Group {plot_name} Sucessfully Generated"
+
+
+    #### 9. Select Points ####
+
+    def start_selection(self, kind):
+        """
+        Lets the user select points on the PCA Plot or Biplot by drawing a lasso or a box
+
+        Args:
+            kind: "lasso" or "box"
+        """
+        app_state = self.app_state
+        index = app_state.hover_index
+        if index is None:
+            messagebox.showerror("Error", "Plot PCA or a Biplot before selecting points!")
+            return
+
+        # Replaces any selector already on the plot
+        app_state.main.clear_selector()
+        if kind == "lasso":
+            app_state.selector = LassoSelector(index.ax, lambda vertices: self.select_points(index.within_polygon(vertices)))
+        else:
+            app_state.selector = RectangleSelector(
+                index.ax,
+                lambda press, release: self.select_points(
+                    index.within_box((press.xdata, press.ydata), (release.xdata, release.ydata))
+                ),
+                useblit=True,
+                button=[1]
+            )
+        app_state.main.replace_status_text(f"Draw a {kind.title()} Around the Points to Select")
+
+    def select_points(self, positions):
+        """
+        Keeps the selected points as rows of the loaded data and outlines them on the plot
+
+        Args:
+            positions: The positions of the selected points among the rows of the current data
+        """
+        app_state = self.app_state
+        index = app_state.hover_index
+        dataset = app_state.dataset
+        app_state.selection = {
+            'positions': positions,
+            'rows': dataset.original_positions(positions),
+            'version': dataset.current,
+        }
+
+        # Outlines the selected points, replacing the outline of the last selection
+        if index.highlight is not None:
+            index.highlight.remove()
+        selected = index.points[positions]
+        index.highlight = index.ax.scatter(
+            selected[:, 0], selected[:, 1], s=60, facecolors='none', edgecolors='red', linewidths=1.5, zorder=4
+        )
+
+        # Draws the outline now, the selector only redraws its own artists
+        index.ax.figure.canvas.draw_idle()
+        app_state.main.replace_status_text(f"{len(positions)} Points Selected")
+
+    def export_selection(self):
+        """Saves the loaded data of the rows selected on the plot to a csv file"""
+        app_state = self.app_state
+        selection = app_state.selection
+        if selection is None or len(selection['rows']) == 0:
+            messagebox.showerror("Error", "Select points with the Lasso or Box Select buttons first!")
+            return
+
+        # Exports the selected rows as they were loaded, with their row number in the loaded file
+        rows = selection['rows']
+        selected = app_state.dataset.original.take(rows).reset_index(drop=True)
+        selected.insert(0, "row", rows + 1)
+        if file_ops.save_data_csv(selected, app_state.output_dir, file_prefix="Selected_Rows") is not None:
+            app_state.main.replace_status_text(f"{len(rows)} Selected Rows Exported")
+
+
+    #### 10. Data Functions ####
 
     def validate_biplot_data(self, app_state: AppState):
         """Runs PCA analysis and gets important pca results"""
@@ -698,9 +1193,9 @@ class CreatePlotBox(tk.Frame):
         
         # Grab important results
         scores = pca_results['transformed_data']
-        loadings = pca_results['loadings']
+        scaled_loadings = pca_results.biplot_loadings
         variance = pca_results['explained_variance']
-        feat_names = [name.lower() for name in pca_results['feature_names']]
+        registry = self.get_feature_registry(pca_results)
 
         # Calculate eigenvalues from results
         eigenvals = variance[:2]
@@ -708,65 +1203,117 @@ class CreatePlotBox(tk.Frame):
         # Gets Users number of PCA results
         num_feat = app_state.num_feat.get()
 
-        # Calculates PCA magnitudes and gets top indexes and features
-        magnitudes = np.sqrt(loadings[:, 0] ** 2 + loadings[:, 1] ** 2)
-        top_idx = np.argsort(magnitudes)[::-1][:num_feat]
-        top_feat = app_state.df.columns[top_idx]
+        # Gets PCA magnitudes and top indexes, computed once per PCA result
+        magnitudes = pca_results.magnitudes
+        top_idx = pca_results.top_magnitudes(num_feat)
+
+        return scores, scaled_loadings, variance, eigenvals, registry, top_idx, magnitudes, num_feat
+
+    def scatter_scores(self, ax, scores, colors=None, **style):
+        """
+        Draws a scatter plot of PCA scores that only draws as many points as the view needs
+
+        Zoomed out views of many points draw a stratified sample of them, zooming in draws
+            every point inside the view. The axes are scaled to fit every point.
+
+        Args:
+            ax: The axes to draw on
+            scores: The PCA scores, the first two columns are drawn
+            colors: The color of each point. None to use the color given in style
+            **style: Other keyword arguments of matplotlib's scatter
 
-        return scores, loadings, variance, eigenvals, feat_names, top_idx, top_feat, magnitudes, num_feat
+        Returns:
+            The PathCollection the points are drawn with
+        """
+        scores = np.asarray(scores)
+        collection = ax.scatter(np.empty(0), np.empty(0), **style)
+        layer = LevelOfDetail(collection, scores, colors)
+
+        # Scales the axes to every point, not only those drawn
+        ax.update_datalim(layer.bounds)
+        ax.autoscale_view()
+        layer.refresh()
+        self.app_state.lod_layers.append(layer)
+        return collection
+
+    def set_hover_points(self, ax, scores, target=""):
+        """
+        Indexes the PCA scores drawn on a plot so hovering over a point shows a tooltip of its row
+
+        The tooltip shows the row's position in the loaded data, its scores and its key columns
+            in the loaded data: the PCA plot target and text columns, like sites.
+
+        Args:
+            ax: The axes the scores are drawn on
+            scores: The PCA scores of the rows of the current data
+            target: The name of the PCA plot target, if any
+        """
+        dataset = self.app_state.dataset
+        original = dataset.original
+        rows = dataset.original_positions()
+
+        # Picks the key columns once per plot, so hovering only reads single values
+        key = target.strip().lower()
+        key_cols = [i for i, col in enumerate(original.columns) if key and str(col).strip().lower() == key]
+        key_cols += [
+            i for i, dtype in enumerate(original.dtypes)
+            if not pd.api.types.is_numeric_dtype(dtype) and i not in key_cols
+        ]
+        key_cols = key_cols[:HOVER_MAX_COLUMNS]
+
+        def describe(point):
+            row = rows[point]
+            original = dataset.original
+            lines = [f"Row {row + 1}", f"PC1: {scores[point, 0]:.3f}, PC2: {scores[point, 1]:.3f}"]
+            lines += [f"{original.columns[i]}: {original.iat[row, i]}" for i in key_cols]
+            return "\n".join(lines)
+
+        self.app_state.hover_index = PointIndex(ax, scores, describe)
+
+    def get_feature_registry(self, pca_results):
+        """Returns the name and group lookups of the PCA features, building them again only for new features or a new group mapping"""
+        app_state = self.app_state
+        registry = app_state.feature_registry
+        if registry is None or not registry.matches(pca_results['feature_names'], app_state.feat_group_map):
+            registry = app_state.feature_registry = FeatureRegistry(pca_results['feature_names'], app_state.feat_group_map)
+        return registry
     
-    def get_color_mapping(self, features, app_state: AppState):
+    def get_color_mapping(self, top_idx, registry: FeatureRegistry, app_state: AppState):
         """
         Creates a color mapping for biplot groups or features
 
-        Creates a color mapping using the selected color palette and extra generated colors
-            when a feature group mapping is enabled has been uploaded. Creates a color mapping
-            of the given features if using generated colors if feature group mapping is disabled.
+        Creates a color mapping of the groups of the given features when a feature group
+            mapping is enabled and has been uploaded. Each feature is its own group otherwise,
+            as are features missing from the mapping.
         
         Args:
-            top_feat: List of the top PCA features to color map
+            top_idx: The positions of the top PCA features to color map
+            registry: The name and group lookups of the PCA features
         
         Returns:
-            feature mapping and feature colors
+            The color of each group by group name, the color and group of each feature and whether grouping is enabled
 
         Raises:
-            Attribute Error: If feature grouping is enabled but a feature map hasn't been uploaded or
-                    if feature gouping is disabled and no top_features are provided
             ValueError: If the number of features/groups without predefined colors is greater then 20
         """
-        # Get User Selection
-        grouping_enabled = app_state.feat_group_enabled.get()
-        group_map = app_state.feat_group_map
-        
         # Disable Grouping if no Group-Map is uploaded
-        grouping_enabled = grouping_enabled and len(group_map) != 0
+        grouping_enabled = app_state.feat_group_enabled.get() and len(app_state.feat_group_map) != 0
 
         # Find all unique groups in the features
-        feat_groups = set()
-        for feat in features:
-            # Get the feature group from the group_map
-            if grouping_enabled and feat in group_map.keys():
-                feat_groups.add(group_map[feat])
-            # Add the feature as a unique group to the group_map and add it to the feat_groups
-            else:
-                group_map[feat] = feat
-                feat_groups.add(feat)
+        group_codes, feat_groups = registry.groups(top_idx, grouped=grouping_enabled)
 
         # Gets the most appropriate color map
         if (len(feat_groups) > 20):
             messagebox.showerror("Mapping Error", f"{len(feat_groups)} groups without predfined colors where requested, but only 20 colors are available")
             raise ValueError("Mapping Error, not enough colors available for requested groups")  
-        elif len(feat) > 10:
-            colors = [to_hex(c) for c in plt.get_cmap('tab20').colors]
+        elif len(feat_groups) > 10:
+            colors = np.array([to_hex(c) for c in plt.get_cmap('tab20').colors])
         else:
-            colors = [to_hex(c) for c in plt.get_cmap('tab10').colors]
-        
-        # Map Groups to colors
-        color_group_map = {}
-        for group, color in zip(feat_groups, colors):
-                color_group_map[group] = color
+            colors = np.array([to_hex(c) for c in plt.get_cmap('tab10').colors])
         
-        return color_group_map, grouping_enabled
+        # Map Groups to colors and gather the color and group of each feature
+        color_group_map = dict(zip(feat_groups, colors))
+        return color_group_map, colors[group_codes], feat_groups[group_codes], grouping_enabled
             
     
 
@@ -7,6 +7,7 @@ from matplotlib import cm
 from matplotlib.colors import to_hex
 import pandas as pd
 
+from source.analysis.parallel_analysis import parallel_analysis
 from source.gui.app_state  import AppState
 from source.utils.constant import *
 
@@ -23,7 +24,12 @@ class SettingBox(tk.Frame):
         * "Top N Features for Biplot" and an entry bow
         * "Select the PCA Component to Analize" and an entry box
         * "Text Distance for Labels" and an entry box
-    A button for creating and visualizing a PCA plot
+        * "Compute Precision" and a dropdown menu
+        * "Memory Budget (MB)" and an entry box
+        * "Collinearity Threshold" and an entry box
+        * "Split PCA By" and an entry box
+    A button for comparing float32 PCA accuracy against float64
+    A button for suggesting the number of PCA components with parallel analysis
     """
 
     #### 0. Setup GUI Elements ####
@@ -70,9 +76,34 @@ class SettingBox(tk.Frame):
         self.mapping_toggle = None
         self.mapping_bttn = None
 
+        # Declares biplot label components
+        self.biplot_labels_toggle = None
+
         # Declares heatmap target feature components
         self.heatmap_feat_lbl = None
         self.heatmap_feat_entry = None
+        self.heatmap_cluster_toggle = None
+
+        # Declares compute precision components
+        self.precision_lbl = None
+        self.precision_menu = None
+        self.precision_report_bttn = None
+
+        # Declares memory budget components
+        self.memory_budget_lbl = None
+        self.memory_budget_entry = None
+
+        # Declares collinearity screening components
+        self.collinearity_lbl = None
+        self.collinearity_entry = None
+        self.last_correlation_threshold = None
+
+        # Declares component suggestion components
+        self.suggest_comp_bttn = None
+
+        # Declares split column components
+        self.split_column_lbl = None
+        self.split_column_entry = None
 
         self.create_components()
         self.setup_layout()
@@ -151,6 +182,78 @@ class SettingBox(tk.Frame):
         self.heatmap_feat_lbl = tk.Label(self, text="Heatmap Targets:\n(comma seperated)", **LABEL_STYLE)
         self.heatmap_feat_entry = tk.Text(self, height=4, **BIG_ENTRY_STYLE)
         self.heatmap_feat_entry.bind("<KeyRelease>", self._on_text_change)
+        self.heatmap_cluster_toggle = tk.Checkbutton(
+            self,
+            text="Cluster Heatmap Rows",
+            variable=self.app_state.heatmap_cluster,
+            **LABEL_STYLE,
+        )
+
+        # Creates biplot label components
+        self.biplot_labels_toggle = tk.Checkbutton(
+            self,
+            text="Label Biplot Arrows",
+            variable=self.app_state.biplot_labels,
+            **LABEL_STYLE,
+        )
+
+        # Creates compute precision components
+        self.precision_lbl = tk.Label(self, text="Compute Precision:", **LABEL_STYLE)
+        self.precision_menu = tk.OptionMenu(
+            self,
+            self.app_state.precision,
+            "float64",
+            "float32",
+            command=self._on_precision_change,
+        )
+        self.precision_report_bttn = tk.Button(
+            self,
+            text="Precision Report",
+            **BUTTON_STYLE,
+            command=self.create_precision_report
+        )
+
+        # Creates memory budget components
+        self.memory_budget_lbl = tk.Label(self, text="Memory Budget (MB):", **LABEL_STYLE)
+        self.memory_budget_entry = tk.Entry(
+            self,
+            **BIG_ENTRY_STYLE,
+            validate="key",
+            validatecommand=self.vcmd_int,
+            textvariable=self.app_state.memory_budget_mb
+        )
+        self.memory_budget_entry.bind("<FocusOut>", lambda e: self._on_exit_memory_budget())
+        self.memory_budget_entry.bind("<Return>", lambda e: self.memory_budget_entry.tk_focusNext().focus())
+
+        # Creates collinearity screening components, left blank to keep every feature
+        self.collinearity_lbl = tk.Label(self, text="Collinearity Threshold:\n(blank to keep all)", **LABEL_STYLE)
+        self.collinearity_entry = tk.Entry(
+            self,
+            **BIG_ENTRY_STYLE,
+            validate="key",
+            validatecommand=self.vcmd_non_neg_float,
+            textvariable=self.app_state.correlation_threshold
+        )
+        self.last_correlation_threshold = ""
+        self.collinearity_entry.bind("<FocusOut>", lambda e: self._on_exit_collinearity())
+        self.collinearity_entry.bind("<Return>", lambda e: self.collinearity_entry.tk_focusNext().focus())
+
+        # Creates component suggestion components
+        self.suggest_comp_bttn = tk.Button(
+            self,
+            text="Suggest Components",
+            **BUTTON_STYLE,
+            command=self.suggest_components
+        )
+
+        # Creates split column components, used by the group plots
+        self.split_column_lbl = tk.Label(self, text="Split PCA By:\n(column for group plots)", **LABEL_STYLE)
+        self.split_column_entry = tk.Entry(
+            self,
+            **BIG_ENTRY_STYLE,
+            textvariable=self.app_state.split_column
+        )
+        self.split_column_entry.bind("<Return>", lambda e: self.split_column_entry.tk_focusNext().focus())
         
     def setup_layout(self):
         """Sets the components onto this tk Frame"""
@@ -179,11 +282,33 @@ class SettingBox(tk.Frame):
 
         #Places heatmap feature components
         self.heatmap_feat_lbl.grid(row=5, column=0, padx=5, pady=5, sticky="e")
-        self.heatmap_feat_entry.grid(row=5, column=1, padx=5, pady=5, sticky="w")        
+        self.heatmap_feat_entry.grid(row=5, column=1, padx=5, pady=5, sticky="w")
+        self.heatmap_cluster_toggle.grid(row=6, column=0, columnspan=2, padx=5, pady=5)
 
         # Places feature grouping components
-        self.mapping_toggle.grid(row=6, column=0, padx=5, pady=5, sticky="e")
-        self.mapping_bttn.grid(row=6, column=1, padx=5, pady=5, sticky="w")
+        self.mapping_toggle.grid(row=7, column=0, padx=5, pady=5, sticky="e")
+        self.mapping_bttn.grid(row=7, column=1, padx=5, pady=5, sticky="w")
+
+        # Places biplot label components below the feature grouping used by the biplot
+        self.biplot_labels_toggle.grid(row=8, column=0, columnspan=2, padx=5, pady=5)
+
+        # Places compute precision components
+        self.precision_lbl.grid(row=9, column=0, padx=5, pady=5, sticky="e")
+        self.precision_menu.grid(row=9, column=1, padx=5, pady=5, sticky="w")
+        self.precision_report_bttn.grid(row=10, column=0, columnspan=2, padx=5, pady=5)
+
+        # Places memory budget components
+        self.memory_budget_lbl.grid(row=11, column=0, padx=5, pady=5, sticky="e")
+        self.memory_budget_entry.grid(row=11, column=1, padx=5, pady=5, sticky="w")
+        self.collinearity_lbl.grid(row=12, column=0, padx=5, pady=5, sticky="e")
+        self.collinearity_entry.grid(row=12, column=1, padx=5, pady=5, sticky="w")
+
+        # Places component suggestion components
+        self.suggest_comp_bttn.grid(row=13, column=0, columnspan=2, padx=5, pady=5)
+
+        # Places split column components
+        self.split_column_lbl.grid(row=14, column=0, padx=5, pady=5, sticky="e")
+        self.split_column_entry.grid(row=14, column=1, padx=5, pady=5, sticky="w")
 
 
         
@@ -268,6 +393,37 @@ class SettingBox(tk.Frame):
     def _on_text_change(self, event):
         self.app_state.heatmap_feat.set(self.heatmap_feat_entry.get('1.0', 'end-1c'))
 
+    def _on_exit_memory_budget(self):
+        """Applies the memory budget entry, freeing cached data if it is now over budget"""
+        val = self.memory_budget_entry.get()
+        if val == "" or int(val) < 1:
+            self.memory_budget_entry.delete(0, tk.END)
+            self.memory_budget_entry.insert(0, str(self.app_state.memory.budget_bytes // 2 ** 20))
+
+        self.app_state.memory.set_budget(int(self.memory_budget_entry.get()) * 2 ** 20)
+        self.app_state.main.refresh_data_text()
+
+    def _on_exit_collinearity(self):
+        """Validates the collinearity threshold entry and sets PCA to run again if it changed"""
+        # Clears the value if it is not a correlation above 0
+        val = self.collinearity_entry.get().strip()
+        try:
+            valid = 0 < float(val) <= 1
+        except ValueError:
+            valid = False
+        if val != "" and not valid:
+            self.collinearity_entry.delete(0, tk.END)
+
+        # Sets PCA to run again if the value has changed
+        if self.collinearity_entry.get() != self.last_correlation_threshold:
+            self.last_correlation_threshold = self.collinearity_entry.get()
+            self.app_state.df_updated.set(True)
+
+    def _on_precision_change(self, value):
+        """Sets PCA to run again in the newly selected precision"""
+        self.app_state.df_updated.set(True)
+        self.app_state.main.replace_status_text(f"Compute Precision Set to {value}")
+
     #### 2. Feature Grouping Operations ####
 
     def upload_mapping(self):
@@ -317,4 +473,91 @@ class SettingBox(tk.Frame):
             messagebox.showerror("Error", f"Failed to load mapping CSV: {str(e)}")
 
 
+    #### 3. Precision Report ####
+
+    def create_precision_report(self):
+        """Compares PCA run in float32 against float64 on the cleaned data and shows the results"""
+        app_state = self.app_state
+        main = app_state.main
+        if not app_state.df_cleaned.get():
+            messagebox.showerror("Error", "Data must be cleaned first!")
+            return
+
+        try:
+            report = main.pca_analyzer.precision_report(app_state.df, app_state.num_pca_comp.get())
+        except Exception as e:
+            traceback.print_exc()
+            messagebox.showerror("Error", f"Failed to create the precision report: {str(e)}")
+            return
+
+        main.replace_pca_text(self.create_precision_report_str(report))
+        main.replace_status_text("Precision Report Generated")
+
+    def create_precision_report_str(self, report):
+        text = "Precision Report: float32 vs float64\n"
+        text += "═══════════════════════════════════════\n\n"
+        if report['data_dtype'] == "float32":
+            text += "Cleaned data is stored as float32, clean it as float64 for an exact baseline\n\n"
 
+        # Explained variance of each component in both precisions
+        for i, (var_64, var_32) in enumerate(zip(report['explained_variance_64'], report['explained_variance_32'])):
+            similarity = report['component_similarity'][i]
+            text += f"PC{i + 1}:\tfloat64 {var_64:.6f}\tfloat32 {var_32:.6f}\tDirection Match {similarity:.6f}\n"
+        text += "═══════════════════════════════════════\n\n"
+
+        # Summary of the differences
+        text += f"Max Explained Variance Error:\t{report['max_abs_error']:.2e} ({report['max_rel_error']:.2e} relative)\n"
+        text += f"Cumulative Variance Error:\t{report['cumulative_abs_error']:.2e}\n"
+        text += f"Memory float64:\t{report['memory_64'] / 2 ** 20:.2f} MB\n"
+        text += f"Memory float32:\t{report['memory_32'] / 2 ** 20:.2f} MB\n"
+        return text
+
+
+    #### 4. Component Suggestion ####
+
+    def suggest_components(self):
+        """
+        Suggests the number of PCA components with parallel analysis and shows it on the scree plot
+
+        Compares the eigenvalues of the cleaned data against those of copies with every column
+            shuffled. The number of PCA components is set to the suggestion, at least 2.
+        """
+        app_state = self.app_state
+        main = app_state.main
+        if not app_state.df_cleaned.get():
+            messagebox.showerror("Error", "Data must be cleaned first!")
+            return
+
+        # Ensures that pca analysis has been run on the current data
+        pca_results = main.run_analysis(app_state)
+        if pca_results is None:
+            return
+
+        try:
+            results = parallel_analysis(
+                pca_results['standardized_data'],
+                progress=lambda done: main.replace_progress_text(f"Running Parallel Analysis: {done:.0%}")
+            )
+        except Exception as e:
+            traceback.print_exc()
+            messagebox.showerror("Error", f"Parallel analysis failed: {str(e)}")
+            return
+
+        # Keeps the results with the data they describe, so the scree plot can check they still apply
+        results['version'] = app_state.dataset.current
+        results['feature_names'] = pca_results['feature_names']
+        app_state.parallel_results = results
+
+        # Sets the suggested number of components, PCA needs at least 2
+        n_components = max(results['n_suggested'], 2)
+        if n_components != app_state.num_pca_comp.get():
+            app_state.num_pca_comp.set(n_components)
+            self.last_num_pca_comp = str(n_components)
+            app_state.df_updated.set(True)
+            self._on_exit_pca_num()
+
+        main.plot_box.create_scree_plot()
+        main.replace_status_text(
+            f"Parallel Analysis Suggests {results['n_suggested']} Components: "
+            f"PCA Components Set to {n_components}"
+        )
@@ -0,0 +1,319 @@
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from source.utils.memory_budget import MemoryBudget
+
+
+# A fill is one value for a whole column or a Series of values for individual rows
+Fill = Union[float, pd.Series]
+
+
+class DatasetVersion:
+    """
+    One version of the data, described as a view over the original loaded data
+
+    A version never holds data of its own. It records which original rows and columns are
+        kept, the names the columns are given, the precision numeric columns are converted
+        to, and the values used to fill missing data in each column.
+    """
+
+    def __init__(
+            self,
+            description: str,
+            columns: np.ndarray,
+            names: List[str],
+            rows: Optional[np.ndarray] = None,
+            dtype: Optional[str] = None,
+            fills: Optional[Dict[str, Fill]] = None,
+            fill_values: Optional[Dict[str, float]] = None,
+            row_filter: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+            cleaned: bool = False
+    ):
+        """
+        Creates a version of the data
+
+        Args:
+            description (str): A short description of the step that created this version
+            columns (np.ndarray): Positions of the kept original columns
+            names (List[str]): The name of each kept column
+            rows (np.ndarray): Positions of the kept original rows. All rows are kept if None
+            dtype (str): The float type numeric columns are converted to. Unchanged if None
+            fills (Dict[str, Fill]): Values used to fill missing data, by column name. Series fills
+                are indexed by original row position
+            fill_values (Dict[str, float]): One value per column used to fill missing data in new data
+            row_filter: Function repeating the row filtering of this version on new data
+            cleaned (bool): Whether this version is ready for PCA
+        """
+        self.description = description
+        self.columns = columns
+        self.names = names
+        self.rows = rows
+        self.dtype = dtype
+        self.fills = fills if fills is not None else {}
+        self.fill_values = fill_values if fill_values is not None else {}
+        self.row_filter = row_filter
+        self.cleaned = cleaned
+
+
+class DatasetStore:
+    """
+    Keeps the original loaded data and a history of versions derived from it
+
+    The original data is never modified. Each cleaning step adds a version that only stores
+        row and column positions, so any number of steps can be undone and redone without
+        copying or reloading the data. The data of the current version is built on demand
+        and kept in the memory budget, which may evict it and rebuild it later.
+    """
+
+    def __init__(
+            self,
+            original: pd.DataFrame,
+            memory: Optional[MemoryBudget] = None,
+            profile: Optional[pd.DataFrame] = None
+    ):
+        """
+        Creates a store holding the original data as its only version
+
+        Args:
+            original (pd.DataFrame): The loaded data
+            memory (MemoryBudget): The budget holding the data. An unlimited budget is used if None
+            profile (pd.DataFrame): An optional data quality profile of the loaded data, kept so
+                cleaning steps can use it without scanning the data again
+        """
+        self.memory = memory if memory is not None else MemoryBudget(float('inf'))
+        self.memory.put("Loaded Data", original)
+        self.profile = profile
+
+        root = DatasetVersion(
+            "Loaded Data",
+            columns=np.arange(original.shape[1]),
+            names=[str(col) for col in original.columns],
+        )
+        self._versions = [root]
+        self._position = 0
+        self._update_data()
+
+    @property
+    def original(self) -> pd.DataFrame:
+        """The original loaded data"""
+        return self.memory.get("Loaded Data")
+
+    @property
+    def current(self) -> DatasetVersion:
+        """The current version"""
+        return self._versions[self._position]
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """The data of the current version"""
+        if self.current is self._versions[0]:
+            return self.original
+        return self.memory.get("Working Data")
+
+
+    def column(self, name: str) -> Optional[pd.Series]:
+        """
+        Gets a column for the rows of the current version by its name
+
+        Columns of the current data are used first. Columns that cleaning dropped are taken
+            from the original data, matching their loaded name or the stripped lowercase name
+            cleaning gives them.
+
+        Args:
+            name (str): The name of the column
+
+        Return:
+            (pd.Series): The column with a default index. None if no column has the name
+        """
+        data = self.data
+        key = name.strip().lower()
+        for candidate in (name, key):
+            if candidate in data.columns:
+                return data[candidate].reset_index(drop=True)
+
+        # Looks for a column dropped by cleaning and selects the rows kept by the current version
+        original = self.original
+        for i, col in enumerate(original.columns):
+            if str(col) == name or str(col).strip().lower() == key:
+                return original.iloc[:, i].take(self.original_positions()).reset_index(drop=True)
+        return None
+
+
+    def original_positions(self, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Finds the positions in the original data of rows of the current data
+
+        Args:
+            positions (np.ndarray): Row positions within the current data. All rows if None
+
+        Return:
+            (np.ndarray): The original row position of each row
+        """
+        rows = self.current.rows if self.current.rows is not None else np.arange(len(self.original))
+        return rows if positions is None else rows[np.asarray(positions)]
+
+
+    #### 1. Creating Versions ####
+
+    def materialize(self, version: Optional[DatasetVersion] = None) -> pd.DataFrame:
+        """
+        Builds the data of a version from the original data
+
+        Args:
+            version (DatasetVersion): The version to build. The current version if None
+
+        Return:
+            (pd.DataFrame): A new DataFrame with a default index
+        """
+        version = version if version is not None else self.current
+        original = self.original
+        if version is self._versions[0]:
+            return original
+
+        # Selects the kept rows and columns
+        if version.rows is not None:
+            df = original.take(version.rows).take(version.columns, axis=1)
+        else:
+            df = original.iloc[:, version.columns].copy()
+        df.columns = version.names
+
+        # Converts numeric columns and fills missing values, aligning row fills by original position
+        if version.dtype is not None:
+            num_cols = df.select_dtypes(include=[np.number]).columns
+            df[num_cols] = df[num_cols].astype(version.dtype)
+        if version.fills:
+            df.index = version.rows if version.rows is not None else pd.RangeIndex(len(df))
+            df = df.fillna(version.fills)
+        df.reset_index(drop=True, inplace=True)
+        return df
+
+    def derive(
+            self,
+            description: str,
+            names: List[str],
+            rows: Optional[np.ndarray] = None,
+            rename: Optional[Callable[[str], str]] = None,
+            dtype: Optional[str] = None,
+            fills: Optional[Dict[str, Fill]] = None,
+            fill_values: Optional[Dict[str, float]] = None,
+            row_filter: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+            cleaned: bool = True
+    ) -> DatasetVersion:
+        """
+        Adds a version derived from the current version and makes it current
+
+        Any undone versions are discarded.
+
+        Args:
+            description (str): A short description of the step
+            names (List[str]): The columns to keep, by their name after renaming
+            rows (np.ndarray): Positions of the rows to keep within the current data. All if None
+            rename: Function giving the new name of each current column name
+            dtype (str): The float type for numeric columns. Unchanged if None
+            fills (Dict[str, Fill]): Values to fill missing data with, by column name after renaming.
+                Series fills are indexed by row position within the current data
+            fill_values (Dict[str, float]): Values to fill missing data in new data with. Uses the
+                fills that are single values if None
+            row_filter: Function repeating the row filtering of this step on new data
+            cleaned (bool): Whether the new version is ready for PCA
+
+        Return:
+            (DatasetVersion): The new current version
+
+        Raises:
+            KeyError: If a kept column is not in the current data
+        """
+        current = self.current
+        current_names = [rename(name) for name in current.names] if rename else list(current.names)
+
+        # Finds the original columns of the kept names
+        positions = {}
+        for i, name in enumerate(current_names):
+            positions.setdefault(name, i)
+        columns = current.columns[[positions[name] for name in names]]
+
+        # Finds the original rows of the kept rows, using the smallest integer type that fits
+        if rows is not None:
+            rows = np.asarray(rows)
+            rows = current.rows[rows] if current.rows is not None else rows
+            rows = rows.astype(np.min_scalar_type(max(len(self.original) - 1, 0)))
+        else:
+            rows = current.rows
+
+        # Row fills are stored by original row position
+        fills = dict(fills or {})
+        for name, value in fills.items():
+            if isinstance(value, pd.Series) and current.rows is not None:
+                fills[name] = value.set_axis(current.rows[value.index.to_numpy()])
+        if fill_values is None:
+            fill_values = {name: value for name, value in fills.items() if not isinstance(value, pd.Series)}
+
+        # Existing fills take priority since they were applied before this step
+        merged_fills = self._merge_fills(current.fills, fills, current_names, names)
+        merged_fill_values = self._merge_fills(current.fill_values, fill_values, current_names, names)
+
+        # New data is filtered by every step in order
+        old_filter = current.row_filter
+        if old_filter is not None and row_filter is not None:
+            combined_filter = lambda data: row_filter(old_filter(data))
+        else:
+            combined_filter = row_filter if row_filter is not None else old_filter
+
+        version = DatasetVersion(
+            description,
+            columns=columns,
+            names=list(names),
+            rows=rows,
+            dtype=dtype if dtype is not None else current.dtype,
+            fills=merged_fills,
+            fill_values=merged_fill_values,
+            row_filter=combined_filter,
+            cleaned=cleaned,
+        )
+        del self._versions[self._position + 1:]
+        self._versions.append(version)
+        self._position += 1
+        self._update_data()
+        return version
+
+    def _merge_fills(self, old_fills: Dict, new_fills: Dict, current_names: List[str], names: List[str]) -> Dict:
+        """Combines the renamed fills of the current version with new fills, keeping only kept columns"""
+        old_fills = {current_names[i]: old_fills[name] for i, name in enumerate(self.current.names) if name in old_fills}
+        merged = {**new_fills, **old_fills}
+        return {name: value for name, value in merged.items() if name in names}
+
+
+    #### 2. Undo and Redo ####
+
+    def can_undo(self) -> bool:
+        """True if there is an earlier version"""
+        return self._position > 0
+
+    def can_redo(self) -> bool:
+        """True if there is an undone version"""
+        return self._position < len(self._versions) - 1
+
+    def undo(self) -> Optional[DatasetVersion]:
+        """Makes the previous version current and returns it. Returns None if there is none"""
+        if not self.can_undo():
+            return None
+        self._position -= 1
+        self._update_data()
+        return self.current
+
+    def redo(self) -> Optional[DatasetVersion]:
+        """Makes the next undone version current and returns it. Returns None if there is none"""
+        if not self.can_redo():
+            return None
+        self._position += 1
+        self._update_data()
+        return self.current
+
+    def _update_data(self):
+        """Replaces the data held in the memory budget with the data of the current version"""
+        if self.current is self._versions[0]:
+            self.memory.remove("Working Data")
+        else:
+            self.memory.put("Working Data", self.materialize(), rebuild=self.materialize)
@@ -0,0 +1,163 @@
+import math
+from typing import Any, Callable, Dict, List, Tuple
+
+from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
+
+
+# Figures kept by the pool, one is shown while the next plot is drawn on another
+FIGURE_POOL_SIZE = 2
+
+
+class FigurePool:
+    """
+    Reuses a fixed set of figures, axes and canvases for every plot
+
+    Plots are drawn on a cleared figure that isn't being shown, so a plot that fails part
+        way leaves the shown plot in place. Axes are cleared and reused when a plot asks for
+        the same layout as the figure already has. Each figure's canvas is created the first
+        time it is shown and reused after that.
+
+    Figures opened through pyplot are never shown, so any found open are closed and counted
+        as leaked.
+    """
+
+    def __init__(self, fig_size: Tuple[float, float], size: int = FIGURE_POOL_SIZE):
+        """
+        Creates the figures of the pool
+
+        Args:
+            fig_size (Tuple[float, float]): The width and height of the figures in inches
+            size (int): The number of figures in the pool, at least 2
+        """
+        self.fig_size = fig_size
+        self.figures = [Figure(fig_size) for __ in range(max(size, 2))]
+        self.canvases: Dict[int, Any] = {}
+        self.shown = None
+        self.acquired = 0
+        self.leaked = 0
+        self._layouts: Dict[int, Tuple] = {}
+        self._next = 0
+
+    def acquire(self, layout: Tuple) -> Tuple[Figure, bool]:
+        """
+        Gets the next figure that isn't shown, ready to be drawn on
+
+        Args:
+            layout (Tuple): Describes the axes the plot needs
+
+        Return:
+            (Figure): The figure
+            (bool): True if the figure already has axes in this layout, which are kept for reuse
+        """
+        self.collect_leaks()
+        self.acquired += 1
+
+        # Takes the figures in turn, skipping the one being shown
+        fig = self.figures[self._next]
+        if fig is self.shown:
+            self._next = (self._next + 1) % len(self.figures)
+            fig = self.figures[self._next]
+        self._next = (self._next + 1) % len(self.figures)
+
+        reuse = self._layouts.get(id(fig)) == layout
+        if not reuse:
+            fig.clear()
+            self._layouts[id(fig)] = layout
+        return fig, reuse
+
+    def blank_fig(self, grid: bool = True) -> Tuple[Figure, Any]:
+        """
+        Gets a figure with one blank plot
+
+        Args:
+            grid (bool): Whether the plot shows grid lines
+
+        Return:
+            The figure and its axes
+        """
+        fig, reuse = self.acquire(("single",))
+        if reuse and len(fig.axes) == 1:
+            ax = fig.axes[0]
+            self._reset_axes(ax)
+        else:
+            fig.clear()
+            ax = fig.add_subplot(111)
+        ax.grid(grid)
+        return fig, ax
+
+    def grid_fig(self, n_plots: int, grid: bool = True) -> Tuple[Figure, List[Any]]:
+        """
+        Gets a figure with a grid of small blank plots
+
+        Args:
+            n_plots (int): The number of plots in the grid
+            grid (bool): Whether each plot shows grid lines
+
+        Return:
+            The figure and a list of its n_plots axes in reading order
+        """
+        n_cols = math.ceil(math.sqrt(n_plots))
+        n_rows = math.ceil(n_plots / n_cols)
+        fig, reuse = self.acquire(("grid", n_rows, n_cols, n_plots))
+        if reuse and len(fig.axes) == n_plots:
+            axes = list(fig.axes)
+            for ax in axes:
+                self._reset_axes(ax)
+            fig.suptitle("")
+        else:
+            fig.clear()
+            axes = list(fig.subplots(n_rows, n_cols, squeeze=False).ravel())
+
+            # Removes the unused spaces in the last row
+            for ax in axes[n_plots:]:
+                fig.delaxes(ax)
+            axes = axes[:n_plots]
+        for ax in axes:
+            ax.grid(grid)
+        return fig, axes
+
+    def show(self, fig: Figure, create_canvas: Callable[[Figure], Any]) -> Any:
+        """
+        Marks a figure as shown and returns its canvas
+
+        Args:
+            fig (Figure): The figure to show
+            create_canvas: Creates the canvas of a figure the first time it is shown
+
+        Return:
+            The canvas of the figure
+        """
+        if id(fig) not in self.canvases:
+            self.canvases[id(fig)] = create_canvas(fig)
+        self.shown = fig
+        return self.canvases[id(fig)]
+
+    def collect_leaks(self) -> int:
+        """Closes figures left open through pyplot, counting them as leaked, and returns how many were closed"""
+        leaked = len(plt.get_fignums())
+        if leaked:
+            plt.close('all')
+            self.leaked += leaked
+        return leaked
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the counts of the pool
+            'figures': the number of figures in the pool,
+            'canvases': the number of canvases created,
+            'acquired': the number of times a figure was drawn on,
+            'leaked': the number of pyplot figures closed by the pool
+        """
+        return {
+            'figures': len(self.figures),
+            'canvases': len(self.canvases),
+            'acquired': self.acquired,
+            'leaked': self.leaked,
+        }
+
+    def _reset_axes(self, ax):
+        """Clears a plot, including the tick and aspect settings that clearing keeps"""
+        ax.clear()
+        ax.tick_params(which='both', reset=True)
+        ax.set_aspect('auto', adjustable='box')
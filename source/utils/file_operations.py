@@ -34,7 +34,40 @@ def load_csv_file():
         print(e.strerror)
         messagebox.showerror("File Error", f"An error occurred while opening the file: {e}")
         return None
-        
+
+def load_csv_chunks(chunk_size=100_000):
+    """
+    Asks the user for a CSV file and opens it for reading in chunks of rows
+
+    Only the start of the file is read to detect its encoding, so large files are never
+        loaded into memory all at once.
+
+    Args:
+        chunk_size: The number of rows in each chunk
+
+    Returns:
+        A pandas chunked csv reader, to be used as a context manager. None if no file was opened
+    """
+    # Asks user to select a csv file
+    file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+
+    # Ensures the user selected an appropriate file
+    if not file_path:
+        return None
+    if not file_path.lower().endswith(".csv"):
+        messagebox.showerror("File Error", f"You selected: {file_path}\nYou must select a .csv file instead!")
+        return None
+
+    # Attempts to open the user data file
+    try:
+        with open(file_path, 'rb') as file:
+            result = chardet.detect(file.read(2 ** 20))
+        return pd.read_csv(file_path, encoding=result['encoding'], chunksize=chunk_size)
+    except OSError as e:
+        print(e.strerror)
+        messagebox.showerror("File Error", f"An error occurred while opening the file: {e}")
+        return None
+
 def save_plot(fig, output_dir):
         """
         Saves a figure as a png and an svg image file.
@@ -112,13 +145,14 @@ def save_interactive_plot(fig, output_dir):
     messagebox.showinfo("Plot Saved", f"Plot Sucsessfully Saved at {save_path}")
     return save_path
 
-def save_data_csv(df: pd.DataFrame, output_dir):
+def save_data_csv(df: pd.DataFrame, output_dir, file_prefix="Program_Data"):
     """
     Saves a pandas dataframe as a csv and shows a message regaurding the save status
     
     Args:
         df: A pd.DataFrame to be saved to a file
         output_dir: The directory where the data file should be stored
+        file_prefix: The start of the file name, followed by a time stamp
 
     Returns:
         The full path to where the file is saved or None if the file doesn't save properly
@@ -129,7 +163,7 @@ def save_data_csv(df: pd.DataFrame, output_dir):
 
     # Create file_name and save_path
     time_stamp = time.strftime("%Y%m%d-%H%M%S")
-    filename = f"Program_Data_{time_stamp}.csv"
+    filename = f"{file_prefix}_{time_stamp}.csv"
     save_path = os.path.join(output_dir, filename)
 
 
@@ -0,0 +1,170 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from matplotlib.font_manager import FontProperties
+from matplotlib.textpath import TextToPath
+
+
+# Font size of placed labels, in points
+LABEL_FONT_SIZE = 8
+
+# Rings of candidate positions tried around each anchor before a label is hidden
+LABEL_MAX_RINGS = 4
+
+# Gap between an anchor and its label, and between rings of candidates, in points
+LABEL_GAP = 3
+
+# Directions of the candidate positions in each ring
+_DIRECTIONS = np.array([
+    [1, 0], [1, 1], [0, 1], [-1, 1], [-1, 0], [-1, -1], [0, -1], [1, -1]
+], dtype=np.float64)
+
+
+class LabelLayout:
+    """
+    Places text labels next to points without overlapping each other
+
+    Labels are placed one at a time in order of priority. Each label tries a bounded number of
+        candidate positions around its point, nearest first and facing away from the origin first,
+        and takes the first one that doesn't overlap a placed label or leave the axes. Placed
+        labels are kept in a grid of cells twice the height of a label, so a label's candidates
+        are only checked against the labels in the cells near its point. Labels with no free
+        candidate are hidden.
+
+    Text sizes are measured once, so placing the labels again after the view changes takes
+        milliseconds for hundreds of labels.
+    """
+
+    def __init__(
+            self,
+            ax,
+            anchors: np.ndarray,
+            texts: Sequence[str],
+            colors: Optional[Sequence] = None,
+            font_size: float = LABEL_FONT_SIZE,
+            max_rings: int = LABEL_MAX_RINGS
+    ):
+        """
+        Creates the labels of the points, hidden until they are placed
+
+        Args:
+            ax: The matplotlib axes the points are drawn on
+            anchors (np.ndarray): The x and y data coordinates of each labeled point, highest priority first
+            texts (Sequence[str]): The text of each label
+            colors (Sequence): The color of each label. None for black labels
+            font_size (float): The font size of the labels in points
+            max_rings (int): The rings of candidate positions tried for each label
+        """
+        self.ax = ax
+        self.anchors = np.asarray(anchors, dtype=np.float64).reshape(-1, 2)
+        self.max_rings = max_rings
+        self.sizes = _measure(texts, font_size)
+        self.hidden = 0
+
+        # Creates every label, placed by its offset in points from its point
+        colors = colors if colors is not None else ['black'] * len(texts)
+        self.labels = [
+            ax.annotate(
+                text, xy=anchor, xytext=(0, 0), textcoords='offset points',
+                fontsize=font_size, color=color, ha='left', va='bottom',
+                annotation_clip=True, visible=False,
+                arrowprops=dict(arrowstyle='-', color=color, lw=0.5, alpha=0.6, shrinkA=0, shrinkB=0),
+            )
+            for text, anchor, color in zip(texts, self.anchors, colors)
+        ]
+
+    def place(self) -> int:
+        """
+        Places every label for the current view of the axes
+
+        Return:
+            (int): The number of labels placed
+        """
+        ax = self.ax
+        ax.apply_aspect()
+        points_per_pixel = 72 / ax.figure.dpi
+
+        # Works in points from the lower left corner of the axes
+        box = ax.get_window_extent()
+        anchors = (ax.transData.transform(self.anchors) - (box.x0, box.y0)) * points_per_pixel
+        width, height = box.width * points_per_pixel, box.height * points_per_pixel
+        origin = (ax.transData.transform((0, 0)) - (box.x0, box.y0)) * points_per_pixel
+
+        cell = max(float(self.sizes[:, 1].max(initial=1)), 1.0) * 2
+        grid: Dict[Tuple[int, int], List[int]] = {}
+        placed = np.zeros((len(self.labels), 4))
+        count = 0
+        for i, (label, anchor, size) in enumerate(zip(self.labels, anchors, self.sizes)):
+            corner = None
+            inside = 0 <= anchor[0] <= width and 0 <= anchor[1] <= height
+            if inside:
+                corner = self._find_spot(anchor, size, origin, width, height, placed, grid, cell)
+            label.set_visible(corner is not None)
+            if corner is None:
+                continue
+
+            # Keeps the label's box in every cell it covers
+            rect = np.array([corner[0], corner[1], corner[0] + size[0], corner[1] + size[1]])
+            placed[i] = rect
+            for key in _cells(rect, cell):
+                grid.setdefault(key, []).append(i)
+            label.xyann = tuple(corner - anchor)
+            count += 1
+        self.hidden = len(self.labels) - count
+        return count
+
+    def _find_spot(self, anchor, size, origin, width, height, placed, grid, cell) -> Optional[np.ndarray]:
+        """Returns the lower left corner of the first free candidate position for a label, or None"""
+        # Orders the candidates by ring, then by direction facing away from the origin first
+        order = np.argsort(-(_DIRECTIONS @ (anchor - origin)), kind='stable')
+        rings = np.arange(1, self.max_rings + 1)[:, None, None]
+        reach = LABEL_GAP * rings + (rings - 1) * size[1]
+        directions = _DIRECTIONS[order]
+        points = (anchor + directions * reach).reshape(-1, 2)
+
+        # Aligns the label's near side or center with each candidate point, keeping those inside the axes
+        corners = points - size * (1 - np.tile(directions, (self.max_rings, 1))) / 2
+        rects = np.hstack([corners, corners + size])
+        inside = (rects[:, 0] >= 0) & (rects[:, 1] >= 0) & (rects[:, 2] <= width) & (rects[:, 3] <= height)
+        rects, corners = rects[inside], corners[inside]
+        if len(rects) == 0:
+            return None
+
+        # Tests every candidate against the placed labels in the cells any candidate covers
+        nearby = {j for key in _cells(_bounds(rects), cell) for j in grid.get(key, ())}
+        if not nearby:
+            return corners[0]
+        others = placed[list(nearby)]
+        hits = (
+            (rects[:, None, 0] < others[None, :, 2]) & (others[None, :, 0] < rects[:, None, 2])
+            & (rects[:, None, 1] < others[None, :, 3]) & (others[None, :, 1] < rects[:, None, 3])
+        ).any(axis=1)
+        free = np.flatnonzero(~hits)
+        return corners[free[0]] if len(free) else None
+
+
+def _measure(texts: Sequence[str], font_size: float) -> np.ndarray:
+    """Returns the width and height of each text in points, from the width of each of its characters"""
+    measure = TextToPath()
+    prop = FontProperties(size=font_size)
+    __, height, descent = measure.get_text_width_height_descent("Ag", prop, ismath=False)
+    widths: Dict[str, float] = {}
+    sizes = np.empty((len(texts), 2))
+    for i, text in enumerate(texts):
+        for char in text:
+            if char not in widths:
+                widths[char] = measure.get_text_width_height_descent(char, prop, ismath=False)[0]
+        sizes[i] = (sum(widths[char] for char in text), height + descent)
+    return sizes
+
+
+def _cells(rect, cell: float):
+    """Yields the grid cells a rectangle covers"""
+    for x in range(int(rect[0] // cell), int(rect[2] // cell) + 1):
+        for y in range(int(rect[1] // cell), int(rect[3] // cell) + 1):
+            yield x, y
+
+
+def _bounds(rects: np.ndarray) -> np.ndarray:
+    """Returns the rectangle bounding a set of rectangles"""
+    return np.array([rects[:, 0].min(), rects[:, 1].min(), rects[:, 2].max(), rects[:, 3].max()])
@@ -0,0 +1,136 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+# Most points drawn at once, views holding more points draw a stratified sample of them
+MAX_DRAWN_POINTS = 30_000
+
+# Cells along each side of the grid the points are binned into
+LOD_GRID_SIZE = 128
+
+
+class LevelOfDetail:
+    """
+    Draws a scatter plot of many points with only as many points as the view needs
+
+    Points are binned into a grid over their full extent, and the points of each cell are
+        kept in random order. A view holding more than max_points points draws a stratified
+        sample, the first points of each visible cell in proportion to how many the cell
+        holds, so dense areas stay dense and lone points are never dropped. Zooming in
+        until the view holds max_points or fewer draws every point in it.
+    """
+
+    def __init__(
+            self,
+            collection,
+            points: np.ndarray,
+            colors: Optional[np.ndarray] = None,
+            max_points: int = MAX_DRAWN_POINTS,
+            grid_size: int = LOD_GRID_SIZE,
+            seed: int = 0
+    ):
+        """
+        Builds the grid index of the points of a scatter plot
+
+        Args:
+            collection: The matplotlib PathCollection the points are drawn with
+            points (np.ndarray): The x and y data coordinates of every point, one row per point
+            colors (np.ndarray): The color of every point, one row per point. None if all points
+                are the same color
+            max_points (int): The most points drawn at once
+            grid_size (int): The number of cells along each side of the grid
+            seed (int): Seed of the random order of the points within each cell
+        """
+        self.collection = collection
+        self.points = np.asarray(points, dtype=np.float64)[:, :2]
+        self.colors = colors
+        self.max_points = max_points
+        self.grid_size = grid_size
+
+        # Leaves out points that can't be drawn, like those with missing scores
+        kept = np.flatnonzero(np.isfinite(self.points).all(axis=1))
+        points = self.points[kept]
+        self.low = points.min(axis=0) if len(points) else np.zeros(2)
+        self.high = points.max(axis=0) if len(points) else np.ones(2)
+        span = self.high - self.low
+        self.cell_size = np.where(span > 0, span / grid_size, 1.0)
+
+        # Sorts the points by cell, in random order within each cell
+        cells = self._cells(points)
+        cell_ids = cells[:, 1] * grid_size + cells[:, 0]
+        order = np.lexsort((np.random.default_rng(seed).random(len(points)), cell_ids))
+        self.order = kept[order]
+        counts = np.bincount(cell_ids, minlength=grid_size * grid_size)
+        self.counts = counts.reshape(grid_size, grid_size)
+        self.starts = (np.cumsum(counts) - counts).reshape(grid_size, grid_size)
+
+    @property
+    def bounds(self) -> np.ndarray:
+        """The lower left and upper right corners of the points"""
+        return np.array([self.low, self.high])
+
+    def visible(
+            self,
+            xlim: Tuple[float, float],
+            ylim: Tuple[float, float],
+            max_points: Optional[int] = None,
+            coarse: bool = False
+    ) -> np.ndarray:
+        """
+        Finds the points to draw for a view
+
+        Args:
+            xlim (Tuple[float, float]): The x limits of the view
+            ylim (Tuple[float, float]): The y limits of the view
+            max_points (int): The most points to draw. None uses the layer's max_points
+            coarse (bool): If True, cells whose share rounds down to no points are skipped, so
+                no more than max_points are drawn but lone points may be left out
+
+        Return:
+            (np.ndarray): The positions in points of the points to draw
+        """
+        (x0, y0), (x1, y1) = self._cells(np.array([[min(xlim), min(ylim)], [max(xlim), max(ylim)]]))
+        counts = self.counts[y0:y1 + 1, x0:x1 + 1].ravel()
+        starts = self.starts[y0:y1 + 1, x0:x1 + 1].ravel()
+
+        # Takes a share of every cell when the view holds too many points, at least one from each unless coarse
+        max_points = self.max_points if max_points is None else max_points
+        total = counts.sum()
+        if total > max_points:
+            share = counts * (max_points / total)
+            share = np.floor(share) if coarse else np.ceil(share)
+            counts = np.minimum(counts, share.astype(counts.dtype))
+
+        # Gathers the first points of each cell without a Python loop
+        taken = counts > 0
+        counts, starts = counts[taken], starts[taken]
+        if len(counts) == 0:
+            return np.empty(0, dtype=np.intp)
+        ends = np.cumsum(counts)
+        positions = np.repeat(starts - (ends - counts), counts) + np.arange(ends[-1])
+        return self.order[positions]
+
+    def refresh(self, max_points: Optional[int] = None, coarse: bool = False) -> int:
+        """
+        Redraws the collection with the points of its axes' current view
+
+        Args:
+            max_points (int): The most points to draw, such as fewer while the view is moving.
+                None uses the layer's max_points
+            coarse (bool): If True, lone points may be left out to stay under max_points
+
+        Return:
+            (int): The number of points drawn
+        """
+        ax = self.collection.axes
+        shown = self.visible(ax.get_xlim(), ax.get_ylim(), max_points, coarse)
+        self.collection.set_offsets(self.points[shown])
+        if self.colors is not None:
+            self.collection.set_facecolor(self.colors[shown])
+        return len(shown)
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        """Returns the x and y grid cell of each point, clipped to the grid"""
+        cells = np.floor((points - self.low) / self.cell_size)
+        return np.clip(cells, 0, self.grid_size - 1).astype(np.intp)
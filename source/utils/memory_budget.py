@@ -0,0 +1,245 @@
+import mmap
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_MEMORY_BUDGET_MB = 2048
+
+
+def is_memory_mapped(array) -> bool:
+    """Returns True if an array's data lives in a memory-mapped file"""
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def in_memory_bytes(value) -> int:
+    """
+    Estimates the bytes of RAM held by an artifact
+
+    Data backed by memory-mapped files is not counted. Dictionaries count the arrays and
+        DataFrames they hold, other objects are treated as negligible.
+    """
+    if isinstance(value, np.ndarray):
+        return 0 if is_memory_mapped(value) or value.dtype == object else value.nbytes
+    if isinstance(value, pd.DataFrame):
+        total = value.index.memory_usage(deep=True)
+        for __, column in value.items():
+            if isinstance(column.dtype, np.dtype) and column.dtype != object:
+                total += in_memory_bytes(column.to_numpy())
+            else:
+                total += column.memory_usage(index=False, deep=True)
+        return int(total)
+    if isinstance(value, MutableMapping):
+        return sum(in_memory_bytes(item) for item in value.values())
+    return 0
+
+
+class MemoryBudget:
+    """
+    Tracks the memory held by cached artifacts and keeps it under a budget
+
+    Artifacts are kept in least to most recently used order. When the budget is exceeded
+        the least recently used artifacts are freed first. Artifacts registered with a rebuild
+        function are evicted and rebuilt on their next use, all others are spilled: their
+        numeric arrays are moved into memory-mapped files and read back from disk on demand.
+    """
+
+    def __init__(self, budget_bytes: int, spill_dir: Optional[str] = None):
+        """
+        Creates an empty memory budget
+
+        Args:
+            budget_bytes (int): The most bytes of RAM cached artifacts may hold
+            spill_dir (str): Directory for memory-mapped files. A temporary directory is used if None
+        """
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir
+        self._owns_spill_dir = spill_dir is None
+        self._spill_count = 0
+
+        # Artifacts in least to most recently used order
+        self._artifacts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+    #### 1. Artifact Access ####
+
+    def put(self, name: str, value: Any, rebuild: Optional[Callable[[], Any]] = None):
+        """
+        Stores an artifact as the most recently used and enforces the budget
+
+        Args:
+            name (str): The name of the artifact. Storing None removes the artifact
+            value: The artifact, a DataFrame, array or dictionary of them
+            rebuild: Optional function that recreates the artifact, allowing it to be evicted
+        """
+        self.remove(name)
+        if value is None:
+            return
+
+        self._artifacts[name] = {
+            'value': value,
+            'rebuild': rebuild,
+            'state': "memory",
+            'bytes': in_memory_bytes(value),
+            'spilled_bytes': 0,
+            'files': [],
+        }
+        self.enforce()
+
+    def get(self, name: str) -> Any:
+        """
+        Gets an artifact and marks it as the most recently used
+
+        Evicted artifacts are rebuilt. Returns None for unknown artifacts
+        """
+        artifact = self._artifacts.get(name)
+        if artifact is None:
+            return None
+
+        self._artifacts.move_to_end(name)
+        if artifact['state'] == "evicted":
+            # Returns the rebuilt value even if the budget evicts it again right away
+            value = artifact['rebuild']()
+            self.put(name, value, artifact['rebuild'])
+            return value
+        return artifact['value']
+
+    def remove(self, name: str):
+        """Stops tracking an artifact and deletes any files it was spilled to"""
+        artifact = self._artifacts.pop(name, None)
+        if artifact is not None:
+            self._delete_files(artifact['files'])
+
+    def set_budget(self, budget_bytes: int):
+        """Changes the budget and frees artifacts until it is met"""
+        self.budget_bytes = budget_bytes
+        self.enforce()
+
+
+    #### 2. Budget Enforcement ####
+
+    def total_bytes(self) -> int:
+        """Returns the bytes of RAM held by all artifacts"""
+        return sum(artifact['bytes'] for artifact in self._artifacts.values())
+
+    def enforce(self):
+        """Evicts or spills the least recently used artifacts until the budget is met"""
+        total = self.total_bytes()
+        for name, artifact in list(self._artifacts.items()):
+            if total <= self.budget_bytes:
+                break
+            if artifact['bytes'] == 0:
+                continue
+
+            freed = artifact['bytes']
+            if artifact['rebuild'] is not None:
+                artifact['value'] = None
+                artifact['state'] = "evicted"
+                artifact['bytes'] = 0
+            else:
+                artifact['value'] = self._spill(artifact, artifact['value'])
+                artifact['state'] = "spilled"
+                artifact['bytes'] = in_memory_bytes(artifact['value'])
+                artifact['spilled_bytes'] = sum(os.path.getsize(path) for path in artifact['files'])
+            total -= freed - artifact['bytes']
+
+    def _spill(self, artifact: Dict[str, Any], value: Any) -> Any:
+        """
+        Moves the numeric arrays of a value into memory-mapped files
+
+        Returns an equivalent value backed by the files. Dictionaries are updated in place so
+            existing references to them see the spilled values.
+        """
+        if isinstance(value, np.ndarray):
+            if value.dtype == object or is_memory_mapped(value):
+                return value
+            mapped, path = self._create_memmap(artifact, value.shape, value.dtype)
+            mapped[...] = value
+            return self._reopen_memmap(mapped, path)
+
+        if isinstance(value, pd.DataFrame):
+            # Groups the numeric columns in memory by dtype, other columns stay as they are
+            dtype_groups = {}
+            for name, dtype in value.dtypes.items():
+                if isinstance(dtype, np.dtype) and dtype != object and in_memory_bytes(value[name].to_numpy()):
+                    dtype_groups.setdefault(dtype, []).append(name)
+
+            # Writes each group to one file with one contiguous row per column
+            columns = {}
+            for dtype, names in dtype_groups.items():
+                mapped, path = self._create_memmap(artifact, (len(names), len(value)), dtype)
+                for i, name in enumerate(names):
+                    mapped[i] = value[name].to_numpy()
+                columns.update(zip(names, self._reopen_memmap(mapped, path)))
+
+            data = {name: columns.get(name, value[name]) for name in value.columns}
+            return pd.DataFrame(data, index=value.index, columns=value.columns, copy=False)
+
+        if isinstance(value, MutableMapping):
+            for key, item in value.items():
+                value[key] = self._spill(artifact, item)
+            return value
+
+        return value
+
+    def _create_memmap(self, artifact: Dict[str, Any], shape, dtype):
+        """Creates a new .npy file for an artifact and returns a writable memory map of it with its path"""
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="pca_visualizer_")
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        self._spill_count += 1
+        path = os.path.join(self.spill_dir, f"spill_{self._spill_count}.npy")
+        artifact['files'].append(path)
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape), path
+
+    def _reopen_memmap(self, mapped: np.memmap, path: str) -> np.ndarray:
+        """Flushes a written memory map and reopens it copy-on-write, so edits never reach the file"""
+        mapped.flush()
+        del mapped
+        return np.load(path, mmap_mode='c')
+
+    def _delete_files(self, paths):
+        """Deletes spill files, skipping any still held open by another reference"""
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+    #### 3. Reporting and Cleanup ####
+
+    def usage(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the memory breakdown of every artifact in least to most recently used order
+
+        Each artifact maps to a dictionary with its 'state' ("memory", "spilled" or "evicted"),
+            the 'bytes' of RAM it holds, and the 'spilled_bytes' written to disk
+        """
+        return {
+            name: {
+                'state': artifact['state'],
+                'bytes': artifact['bytes'],
+                'spilled_bytes': artifact['spilled_bytes'],
+            }
+            for name, artifact in self._artifacts.items()
+        }
+
+    def close(self):
+        """Removes all artifacts and the temporary spill directory"""
+        for name in list(self._artifacts):
+            self.remove(name)
+        if self._owns_spill_dir and self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
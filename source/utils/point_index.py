@@ -0,0 +1,142 @@
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+from matplotlib.path import Path
+from scipy.spatial import cKDTree
+
+
+# How far the ratio of the axes' x and y scales may drift from when the tree was built before it is rebuilt
+MAX_SCALE_DRIFT = 4.0
+
+
+class PointIndex:
+    """
+    Finds the plotted points nearest to the mouse or inside a selected area
+
+    Points are indexed by a KD-tree of their data coordinates, each axis scaled by its pixels
+        per data unit when the tree is built, so lookups take microseconds for any number of
+        points. Zooming and panning change only the scale and offset of the axes, so the
+        mouse position and search radius are converted into the tree's coordinates instead of
+        building the tree again. The tree is only rebuilt if the ratio of the x and y scales
+        changes by more than MAX_SCALE_DRIFT. The axes must have linear scales.
+    """
+
+    def __init__(self, ax, points: np.ndarray, describe: Callable[[int], str]):
+        """
+        Creates an index of the points drawn on a plot
+
+        Args:
+            ax: The matplotlib axes the points are drawn on
+            points (np.ndarray): The x and y data coordinates of each point, one row per point
+            describe: Returns the tooltip text of a point from its position in points
+        """
+        self.ax = ax
+        self.points = np.asarray(points, dtype=np.float64)[:, :2]
+        self.describe = describe
+        self.tooltip = None
+        self.shown = None
+        self.highlight = None
+        self._tree = None
+        self._kept = None
+        self._scale = None
+
+    def nearest(self, x: float, y: float, radius: float) -> Optional[int]:
+        """
+        Finds the point nearest to a position on screen
+
+        Args:
+            x (float): The x position in pixels
+            y (float): The y position in pixels
+            radius (float): The farthest a point can be from the position, in pixels
+
+        Return:
+            (int): The position of the nearest point in points, or None if no point is within the radius
+        """
+        tree, scale, offset = self._build()
+        if tree.n == 0:
+            return None
+
+        # Converts the position to the tree's coordinates, where distances are pixels at the tree's scale
+        ratio = scale / self._scale
+        target = (np.array([x, y]) - offset) / ratio
+        stretch = np.abs(ratio)
+        if np.isclose(stretch[0], stretch[1]):
+            distance, i = tree.query(target, distance_upper_bound=radius / stretch[0])
+            return None if np.isinf(distance) else int(self._kept[i])
+
+        # Searches a circle covering every point within the radius, then measures each in pixels
+        found = np.asarray(tree.query_ball_point(target, r=radius / stretch.min()), dtype=np.intp)
+        if len(found) == 0:
+            return None
+        distances = np.hypot(*((tree.data[found] - target) * stretch).T)
+        closest = np.argmin(distances)
+        return int(self._kept[found[closest]]) if distances[closest] <= radius else None
+
+    def within_box(self, corner: Tuple[float, float], opposite: Tuple[float, float]) -> np.ndarray:
+        """
+        Finds the points inside a rectangle
+
+        Args:
+            corner (Tuple[float, float]): One corner of the rectangle in data coordinates
+            opposite (Tuple[float, float]): The opposite corner in data coordinates
+
+        Return:
+            (np.ndarray): The positions in points of the points inside, in order
+        """
+        corners = np.array([corner, opposite], dtype=np.float64)
+        found = self._within_data_box(corners.min(axis=0), corners.max(axis=0))
+        return np.sort(self._kept[found])
+
+    def within_polygon(self, vertices: np.ndarray) -> np.ndarray:
+        """
+        Finds the points inside a polygon, such as the path of a lasso
+
+        Only the points inside the polygon's bounding box, found with the KD-tree, are tested
+            against the polygon.
+
+        Args:
+            vertices (np.ndarray): The x and y data coordinates of the polygon's vertices
+
+        Return:
+            (np.ndarray): The positions in points of the points inside, in order
+        """
+        vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+        if len(vertices) < 3:
+            return np.empty(0, dtype=np.intp)
+        found = self._within_data_box(vertices.min(axis=0), vertices.max(axis=0))
+        inside = Path(vertices).contains_points(self.points[self._kept[found]])
+        return np.sort(self._kept[found[inside]])
+
+    def _within_data_box(self, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+        """Returns the tree positions of the points inside a rectangle given by its corners in data coordinates"""
+        tree = self._build()[0]
+        if tree.n == 0:
+            return np.empty(0, dtype=np.intp)
+
+        # Finds the points within a square around the rectangle, then keeps those in the rectangle
+        corners = np.array([low, high]) * self._scale
+        low, high = corners.min(axis=0), corners.max(axis=0)
+        found = np.asarray(
+            tree.query_ball_point((low + high) / 2, r=np.max(high - low) / 2, p=np.inf, return_sorted=False),
+            dtype=np.intp
+        )
+        scaled = tree.data[found]
+        return found[((scaled >= low) & (scaled <= high)).all(axis=1)]
+
+    def _build(self) -> Tuple[cKDTree, np.ndarray, np.ndarray]:
+        """
+        Returns the tree with the current pixels per data unit and pixel offset of each axis
+
+        The tree is built on first use and rebuilt when the ratio of the x and y scales drifts
+            too far from when it was built.
+        """
+        transform = self.ax.transData
+        offset = transform.transform((0.0, 0.0))
+        scale = transform.transform((1.0, 1.0)) - offset
+        drift = 1.0 if self._scale is None else abs((scale[0] / scale[1]) / (self._scale[0] / self._scale[1]))
+        if self._tree is None or not 1 / MAX_SCALE_DRIFT <= drift <= MAX_SCALE_DRIFT:
+            # Leaves out points that can't be drawn, like those with missing scores
+            self._kept = np.flatnonzero(np.isfinite(self.points).all(axis=1))
+            self._scale = scale
+            self._tree = cKDTree(self.points[self._kept] * scale)
+        return self._tree, scale, offset
@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+
+
+# Data shared with the worker processes, attached once per worker
+_worker_memory = None
+_worker_data = None
+
+
+def _attach_shared_data(name: str, shape, dtype):
+    """Attaches a worker process to the data held in shared memory"""
+    global _worker_memory, _worker_data
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_data = np.ndarray(shape, dtype=dtype, buffer=_worker_memory.buf)
+    _worker_data.flags.writeable = False
+
+
+def _call_with_shared_data(func: Callable, task: Any) -> Any:
+    """Calls a task function with the data shared with this worker process"""
+    return func(task, _worker_data)
+
+
+def map_shared(
+        func: Callable[[Any, np.ndarray], Any],
+        data: np.ndarray,
+        tasks: Sequence[Any],
+        n_jobs: Optional[int] = None,
+        progress: Optional[Callable[[float], None]] = None
+) -> List[Any]:
+    """
+    Calls func(task, data) for every task in a pool of worker processes that share the data
+
+    The data is copied into shared memory once and every worker reads that copy, so it is
+        never pickled or copied per worker or per task. The data is read-only in the workers.
+        With one worker the tasks run in this process without a pool.
+
+    Args:
+        func: A module level function taking a task and the data. Extra arguments can be
+            bound with functools.partial
+        data (np.ndarray): The array shared with every task
+        tasks (Sequence): The tasks, such as seeds, to call func with
+        n_jobs (int): The number of worker processes. All cores if None
+        progress: Optional function called with the fraction of tasks completed
+
+    Return:
+        (List): The result of each task in the order of the tasks
+    """
+    data = np.ascontiguousarray(data)
+    workers = min(n_jobs if n_jobs is not None else (os.cpu_count() or 1), len(tasks))
+    results = []
+    if workers <= 1:
+        for task in tasks:
+            results.append(func(task, data))
+            if progress is not None:
+                progress(len(results) / len(tasks))
+        return results
+
+    memory = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    try:
+        np.ndarray(data.shape, dtype=data.dtype, buffer=memory.buf)[...] = data
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_attach_shared_data,
+                initargs=(memory.name, data.shape, data.dtype)
+        ) as pool:
+            chunksize = max(1, len(tasks) // (4 * workers))
+            for result in pool.map(partial(_call_with_shared_data, func), tasks, chunksize=chunksize):
+                results.append(result)
+                if progress is not None:
+                    progress(len(results) / len(tasks))
+    finally:
+        memory.close()
+        memory.unlink()
+    return results
@@ -0,0 +1,34 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from source.analysis.diagnostics import outlier_scores
+from source.analysis.pca import PCAAnalyzer
+
+
+def test_outlier_scores_rank_deficient():
+    """A column that is the sum of two others leaves a component with no variance out of T²"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200, 3)), columns=["a", "b", "c"])
+    df["d"] = df["a"] + df["b"]
+    results = PCAAnalyzer().analyze(df, 4)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        diagnostics = outlier_scores(results)
+
+    assert diagnostics['t2_components'] == 3
+    assert np.isfinite(diagnostics['t2']).all()
+    assert np.isfinite(diagnostics['t2_limit'])
+    assert diagnostics['flagged'].mean() < 0.2
+
+
+def test_outlier_scores_full_rank():
+    """Full rank data keeps every component in T²"""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.normal(size=(200, 4)), columns=["a", "b", "c", "d"])
+    diagnostics = outlier_scores(PCAAnalyzer().analyze(df, 3))
+
+    assert diagnostics['t2_components'] == 3
+    assert np.isfinite(diagnostics['t2']).all()